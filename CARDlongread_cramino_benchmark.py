@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# long read sequencing cramino QC parser and dashboard benchmark
+# generate synthetic cramino reports and time each stage of parser and dashboard
+# command line wrapper; benchmark in cardlongread_cramino package
+from cardlongread_cramino.benchmark import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# long read sequencing cramino QC watch mode
+# keep summary table and dashboard up to date while cramino reports are written
+# command line wrapper; watch loop in cardlongread_cramino package
+from cardlongread_cramino.watch import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+# NIA CARD long read sequencing cramino QC parser and dashboard generator
+# importable library so pipelines can parse reports, summarize and render dashboards in one process, e.g.
+#   cramino_report_df = make_cramino_report_data_frame(list_cramino_reports(cramino_dir), 'mapped_bam')
+#   cramino_extract, grouped = load_cramino_summary_tables([cramino_report_df])
+#   make_dashboard(cramino_extract, 'dashboard.xlsx', grouped)
+# matplotlib, seaborn and xlsxwriter are imported only when figures and workbooks are made
+from cardlongread_cramino.report import list_cramino_reports, make_cramino_report_data_frame, write_cramino_report_data_frame
+from cardlongread_cramino.summary import read_cramino_summary_table, load_cramino_summary_tables, make_grouped_summary_statistics_data_frames, make_long_summary_statistics_data_frame, make_summary_statistics_data_frame
+from cardlongread_cramino.dashboard import make_dashboard
@@ -0,0 +1,62 @@
+# read cramino reports directly from tar and zip archives
+# archives are read member by member in one sequential pass and reports are parsed in memory,
+# so archived projects need not be extracted (no temporary files, one sequential read instead of many small ones)
+import gzip
+import tarfile
+import zipfile
+from cardlongread_cramino.report import cramino_report_extensions, parse_cramino_report_text, parse_cramino_arrow_reports, make_cramino_report_data_frame_from_rows
+
+# check whether archive member is report of given input format (by extension, as when listing directory)
+def is_cramino_report_member(member_name, input_format='text'):
+    return member_name.lower().endswith(tuple('.' + x for x in cramino_report_extensions[input_format]))
+
+# iterate over reports in tar (any compression) or zip archive in archive order
+# yields member name and contents (bytes, gzip-compressed members decompressed)
+def iter_cramino_archive_reports(archive_path, input_format='text'):
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            # members in order of position in archive, so archive is read sequentially
+            members = sorted((x for x in archive.infolist() if (not x.is_dir()) and is_cramino_report_member(x.filename, input_format)), key=lambda x: x.header_offset)
+            for member in members:
+                yield member.filename, decompress_cramino_report(member.filename, archive.read(member))
+    else:
+        try:
+            # stream mode reads tar archive front to back without seeking (compression detected automatically)
+            with tarfile.open(archive_path, mode='r|*') as archive:
+                for member in archive:
+                    if member.isfile() and is_cramino_report_member(member.name, input_format):
+                        yield member.name, decompress_cramino_report(member.name, archive.extractfile(member).read())
+        except tarfile.ReadError as e:
+            raise ValueError(f'{archive_path} is not a tar or zip archive ({e})')
+
+# decompress gzip-compressed archive member
+def decompress_cramino_report(member_name, contents):
+    if member_name.lower().endswith('.gz'):
+        return gzip.decompress(contents)
+    return contents
+
+# parse reports in archives, yielding rows (or errors) in archive order
+# text and JSON reports are parsed as they are read; Arrow records are combined in one batch as for files
+def parse_cramino_archive_reports(archive_paths, bam_type, input_format='text'):
+    if input_format == 'arrow':
+        # pyarrow is only needed for Arrow input
+        try:
+            import pyarrow
+        except ImportError:
+            quit('ERROR: Arrow input requires the pyarrow module.')
+        buffers = [pyarrow.BufferReader(contents) for archive_path in archive_paths for member_name, contents in iter_cramino_archive_reports(archive_path, input_format)]
+        yield from parse_cramino_arrow_reports(buffers, bam_type)
+        return
+    for archive_path in archive_paths:
+        for member_name, contents in iter_cramino_archive_reports(archive_path, input_format):
+            try:
+                cramino_text = contents.decode()
+            # undecodable report
+            except ValueError as e:
+                yield e
+                continue
+            yield parse_cramino_report_text(cramino_text, bam_type, input_format, member_name)
+
+# build summary table from reports in archives
+def make_cramino_report_data_frame_from_archives(archive_paths, bam_type, input_format='text'):
+    return make_cramino_report_data_frame_from_rows(parse_cramino_archive_reports(archive_paths, bam_type, input_format))
@@ -0,0 +1,157 @@
+# long read sequencing cramino QC parser and dashboard benchmark
+# generate synthetic cramino reports and time each stage of parser and dashboard
+# results written as JSON so runs can be compared across versions
+# HTML report of same tables and figures written too, and its size checked against workbook size
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import numpy as np
+import pandas as pd
+from io import BytesIO
+from cardlongread_cramino import report, summary, plots, workbook, html_report
+
+# write synthetic cramino report in same format as cramino output (see example at top of report module)
+# unmapped BAM reports (cramino --ubam) have no identity lines
+def write_synthetic_cramino_report(cramino_path, sample_name, bam_type, rng):
+    bam_name = sample_name + '.sorted_meth.bam'
+    yield_gb = rng.uniform(0.5, 160)
+    n50 = int(rng.normal(20000, 4000))
+    report_lines = [('File name', bam_name),
+                    ('Number of alignments', str(int(yield_gb * 1e9 / max(n50, 1000) * 0.9))),
+                    ('% from total reads', f'{rng.uniform(60, 95):.2f}'),
+                    ('Yield [Gb]', f'{yield_gb:.2f}'),
+                    ('Mean coverage', f'{yield_gb / 3.1:.2f}'),
+                    ('Yield [Gb] (>25kb)', f'{yield_gb * rng.uniform(0.1, 0.5):.2f}'),
+                    ('N50', str(n50)),
+                    ('N75', str(int(n50 * rng.uniform(0.6, 0.8)))),
+                    ('Median length', f'{n50 * rng.uniform(0.6, 0.9):.2f}'),
+                    ('Mean length', str(int(n50 * rng.uniform(0.7, 0.95))))]
+    if bam_type == 'mapped_bam':
+        median_identity = rng.uniform(97, 99.8)
+        report_lines += [('Median identity', f'{median_identity:.2f}'),
+                         ('Mean identity', f'{median_identity - rng.uniform(0.5, 2):.2f}')]
+    report_lines += [('Path', '/data/synthetic/' + bam_name),
+                     ('Creation time', 'NA')]
+    with open(cramino_path, 'w') as outfile:
+        outfile.write(''.join(f'{key}\t{value}\n' for key, value in report_lines))
+
+# generate synthetic cohort of cramino reports in directory
+# returns list of report paths
+def make_synthetic_cohort(cohort_dir, number_of_samples, bam_type, seed=0):
+    os.makedirs(cohort_dir, exist_ok=True)
+    # fixed seed so every benchmark run uses same cohort
+    rng = np.random.default_rng(seed)
+    files = []
+    for idx in range(number_of_samples):
+        sample_name = 'Sample_' + str(idx)
+        cramino_path = os.path.join(cohort_dir, sample_name + '_cramino_QC.txt')
+        write_synthetic_cramino_report(cramino_path, sample_name, bam_type, rng)
+        files.append(cramino_path)
+    return files
+
+# time single stage, storing elapsed wall time (seconds) in stage timings
+def time_stage(stage_timings, stage_name, stage_function, *stage_args, **stage_kwargs):
+    start_time = time.perf_counter()
+    stage_result = stage_function(*stage_args, **stage_kwargs)
+    stage_timings[stage_name] = round(time.perf_counter() - start_time, 4)
+    print(f'  {stage_name}: {stage_timings[stage_name]:.3f} s', file=sys.stderr)
+    return stage_result
+
+# run all benchmark stages for one synthetic cohort
+def run_benchmark(work_dir, number_of_samples, bam_type, number_of_groups=1, workers=1, run_cutoff=1, output_profile='standard', include_plots=True):
+    stage_timings = {}
+    cohort_dir = os.path.join(work_dir, bam_type + '_' + str(number_of_samples))
+    files = time_stage(stage_timings, 'generate reports', make_synthetic_cohort, cohort_dir, number_of_samples, bam_type)
+    # parser stages
+    cramino_report_df = time_stage(stage_timings, 'parse reports', report.make_cramino_report_data_frame, files, bam_type, workers)
+    summary_file = os.path.join(work_dir, bam_type + '_' + str(number_of_samples) + '_summary.tsv')
+    time_stage(stage_timings, 'write summary table', report.write_cramino_report_data_frame, cramino_report_df, summary_file)
+    # dashboard stages
+    cramino_extract = time_stage(stage_timings, 'read summary table', summary.read_cramino_summary_table, summary_file)
+    # filter and add columns as dashboard does
+    cramino_extract = cramino_extract[cramino_extract['Yield (Gb)'] > run_cutoff].reset_index(drop=True)
+    cramino_extract['N50 (kb)'] = round(cramino_extract['N50']/1000,3)
+    property_names = summary.cramino_summary_statistics_property_names
+    if number_of_groups > 1:
+        cramino_extract['Group'] = ['Group ' + str(idx % number_of_groups + 1) for idx in range(len(cramino_extract))]
+        group_variable = 'Group'
+    else:
+        group_variable = None
+    summary_statistics_dfs = time_stage(stage_timings, 'summary statistics', summary.make_grouped_summary_statistics_data_frames, cramino_extract, property_names, group_variable)
+    table_sheet_names = ['Summary statistics report' if x is None else x + ' statistics' for x in summary_statistics_dfs]
+    tables = list(summary_statistics_dfs.values())
+    figure_specs = []
+    figure_images = []
+    figure_names = []
+    if include_plots is True:
+        output_profile_settings = plots.dashboard_output_profiles[output_profile]
+        violin_group_variable = None if group_variable is None else cramino_extract[group_variable]
+        # one figure of each plot type
+        figure_specs.append((plots.render_violinswarmplot, (cramino_extract, 'Yield (Gb)', violin_group_variable, None, None, False, None, 90, None, 1000), dict(dpi=output_profile_settings['violin_dpi'], figsize=output_profile_settings['figsize'])))
+        figure_images.append(time_stage(stage_timings, 'violin plot', plots.render_figure, figure_specs[-1], output_profile_settings))
+        figure_names.append('Yield plot')
+        figure_specs.append((plots.render_scatterplot, (cramino_extract, group_variable, None, None, False), dict(x_variable='Yield (Gb)', y_variable='Mean identity Q score', dpi=output_profile_settings['scatter_dpi'], figsize=output_profile_settings['figsize'])))
+        figure_images.append(time_stage(stage_timings, 'scatterplot', plots.render_figure, figure_specs[-1], output_profile_settings))
+        figure_names.append('Yield (Gb) vs. avg. Q score')
+    workbook_file = os.path.join(work_dir, bam_type + '_' + str(number_of_samples) + '_dashboard.xlsx')
+    time_stage(stage_timings, 'workbook save', workbook.write_dashboard_workbook, workbook_file, table_sheet_names, tables, figure_names, [BytesIO(x) for x in figure_images], [None] * len(figure_images))
+    # HTML report of same tables and figures, which should stay smaller than workbook
+    html_file = os.path.join(work_dir, bam_type + '_' + str(number_of_samples) + '_dashboard.html')
+    report_html = time_stage(stage_timings, 'HTML report', html_report.make_html_report, table_sheet_names, tables, figure_specs, figure_names, [None] * len(figure_specs))
+    html_report.write_html_report(html_file, report_html)
+    output_sizes = {'workbook': os.path.getsize(workbook_file), 'html': os.path.getsize(html_file)}
+    print(f"  HTML report size: {output_sizes['html']} bytes ({output_sizes['html'] / output_sizes['workbook']:.0%} of workbook)", file=sys.stderr)
+    if output_sizes['html'] > output_sizes['workbook']:
+        print('WARNING: HTML report is larger than workbook.', file=sys.stderr)
+    return {'bam_type': bam_type, 'samples': number_of_samples, 'groups': number_of_groups, 'workers': workers, 'output_profile': output_profile, 'stages': stage_timings, 'output_sizes': output_sizes}
+
+# command line interface
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark cramino parser and dashboard stages on synthetic cramino report cohorts.')
+    parser.add_argument('-sizes', action="store", default=[1000, 10000, 100000], type=int, nargs="+", dest="sizes", help="Number of synthetic samples per cohort (optional; default 1000 10000 100000)")
+    parser.add_argument('-bam_types', action="store", default=['mapped_bam', 'unmapped_bam'], choices=['mapped_bam', 'unmapped_bam'], nargs="+", dest="bam_types", help="cramino report types to benchmark (optional; default both)")
+    parser.add_argument('-groups', action="store", default=1, type=int, dest="groups", help="Number of groups to split each cohort into for grouped statistics and plots (optional; default 1)")
+    parser.add_argument('-workers', action="store", default=1, type=int, dest="workers", help="Number of parser threads (optional; default 1)")
+    parser.add_argument('-output_profile', action="store", default='standard', choices=['draft', 'standard', 'publication'], dest="output_profile", help="Dashboard figure output profile (optional; default standard)")
+    parser.add_argument('--plots', action=argparse.BooleanOptionalAction, default=True, dest="plots", help="Time figure rendering (optional; default true; --no-plots to skip)")
+    parser.add_argument('-work_dir', action="store", default=None, dest="work_dir", help="Directory for synthetic reports and outputs (optional; temporary directory removed after run by default)")
+    parser.add_argument('-output', action="store", default='cramino_benchmark.json', dest="output_file", help="Output JSON file with benchmark results (optional; default cramino_benchmark.json)")
+    results = parser.parse_args(argv)
+    # use temporary working directory unless specified
+    if results.work_dir is None:
+        work_dir = tempfile.mkdtemp(prefix='cramino_benchmark_')
+    else:
+        work_dir = results.work_dir
+        os.makedirs(work_dir, exist_ok=True)
+    benchmark_results = []
+    try:
+        for bam_type in results.bam_types:
+            for number_of_samples in results.sizes:
+                print(f'{bam_type}, {number_of_samples} samples', file=sys.stderr)
+                benchmark_results.append(run_benchmark(work_dir, number_of_samples, bam_type, results.groups, results.workers, output_profile=results.output_profile, include_plots=results.plots))
+    finally:
+        if results.work_dir is None:
+            shutil.rmtree(work_dir)
+    # record environment so results can be compared across versions and machines
+    import matplotlib
+    import seaborn as sb
+    benchmark_output = {'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'cpu_count': os.cpu_count(),
+                        'modules': {'numpy': np.__version__, 'pandas': pd.__version__, 'seaborn': sb.__version__, 'matplotlib': matplotlib.__version__},
+                        'results': benchmark_results}
+    with open(results.output_file, 'w') as outfile:
+        json.dump(benchmark_output, outfile, indent=2)
+    # print summary table
+    stage_names = list(benchmark_results[0]['stages']) if len(benchmark_results) > 0 else []
+    print('\t'.join(['BAM type', 'Samples'] + stage_names + ['Workbook bytes', 'HTML bytes']))
+    for x in benchmark_results:
+        print('\t'.join([x['bam_type'], str(x['samples'])] + [f"{x['stages'][y]:.3f}" for y in stage_names] + [str(x['output_sizes']['workbook']), str(x['output_sizes']['html'])]))
+
+if __name__ == '__main__':
+    main()
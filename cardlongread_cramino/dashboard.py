@@ -0,0 +1,322 @@
+# long read sequencing cramino QC dashboard generator
+# generate summary statistics, violin plots and scatterplots from cramino QC summary table
+# summary table generated by cramino report parser
+import os
+import sys
+import argparse
+from cardlongread_cramino.summary import load_cramino_summary_tables, make_summary_statistics_tables, combine_summary_statistics_tables
+from cardlongread_cramino.plots import make_legend_patches, make_dashboard_figure_specs, make_grid_figure_specs, make_trend_figure_specs, make_distribution_figure_specs, make_regression_fits_table, render_figures, dashboard_output_profiles
+from cardlongread_cramino.trends import make_trend_aggregates, cramino_trend_periods
+from cardlongread_cramino.histograms import make_cramino_distribution_tables
+from cardlongread_cramino.qc import make_default_qc_rules, read_qc_rules, evaluate_qc_rules
+from cardlongread_cramino.workbook import write_dashboard_workbook
+from cardlongread_cramino.html_report import make_html_report, write_html_report, get_svg_group_colors
+from cardlongread_cramino.streaming import stream_cramino_summary_tables
+# stage timing and memory profiling
+from cardlongread_cramino.profiler import StageProfiler
+
+# make dashboard workbook from loaded summary table (see load_cramino_summary_tables)
+# in streaming mode, summary table is plot sample and summary statistics tables are provided (see stream_cramino_summary_tables)
+# summary statistics tables, then violin plots and scatterplots rendered (in parallel if threads set) and written in single pass
+# run date trend tables and plots added for each trend period if summary table has creation times
+# QC flags and failure index sheets added if QC rules provided (failure index also written to qc_output_file if set)
+# HTML report written to html_output_file if set (at most html_max_points points per figure); workbook left out if output_file is None
+# if grid set, violin plots and scatterplots also drawn as one grid figure each on overview worksheets,
+# and separate property worksheets only included if property_sheets set (default: included unless grid set)
+# read length and identity distribution tables and curves added if distribution tables provided (see make_cramino_distribution_tables)
+# many groups: summary statistics of all groups on one long-format sheet if long_statistics set, and violin plots and
+# scatterplots split into pages of at most groups_per_page groups (stacked on each plot worksheet) if groups_per_page set
+def make_dashboard(cramino_extract,output_file,grouped=False,names=None,show_group_count=False,plot_title=None,plot_cutoff=True,strip_plot=False,colors=None,legend_patches=None,threads=1,output_profile='standard',figure_cache=None,max_swarm_points=1000,reg_line=False,summary_tables=None,sample_note=None,profiler=None,trend_periods=('weekly','monthly'),qc_rules=None,qc_output_file=None,html_output_file=None,html_max_points=300,grid=False,grid_columns=4,property_sheets=None,distribution_tables=None,groups_per_page=None,long_statistics=False):
+    # profiling off unless profiler provided
+    if profiler is None:
+        profiler=StageProfiler('cramino_dashboard')
+    # summary statistics on all samples or each group
+    # (precomputed tables used instead if provided, e.g., from streaming mode)
+    profiler.start_stage('summary statistics')
+    # group names from group categories if not provided (e.g., groups read from group column)
+    if (grouped is True) and (names is None):
+        names=list(cramino_extract['Group'].cat.categories)
+    if summary_tables is None:
+        table_sheet_names, tables = make_summary_statistics_tables(cramino_extract, grouped, names, long_format=long_statistics)
+    elif (grouped is True) and (long_statistics is True):
+        table_sheet_names, tables = ['Group statistics'], [combine_summary_statistics_tables(names, summary_tables[1])]
+    else:
+        table_sheet_names, tables = list(summary_tables[0]), list(summary_tables[1])
+    # include group variable if necessary
+    if grouped is False:
+        group_variable=None
+    elif show_group_count is True:
+        group_variable='Group and count'
+    else:
+        group_variable='Group'
+    # list figures in worksheet order
+    figure_specs, figure_worksheet_names, figure_notes = make_dashboard_figure_specs(cramino_extract,group_variable,legend_patches=legend_patches,colors=colors,strip_plot=strip_plot,plot_title=plot_title,plot_cutoff=plot_cutoff,max_swarm_points=max_swarm_points,output_profile=output_profile,reg_line=reg_line,sample_note=sample_note,groups_per_page=groups_per_page)
+    # regression fit table (slope, intercept, r squared and n for each scatterplot and group) if reg_line set
+    regression_fits_table = make_regression_fits_table(figure_specs,figure_worksheet_names)
+    if regression_fits_table is not None:
+        table_sheet_names.append('Regression fits')
+        tables.append(regression_fits_table)
+    # QC pass/fail flags per sample and index of failing samples by rule
+    if qc_rules is not None:
+        profiler.start_stage('QC flags')
+        qc_flags, qc_failures = evaluate_qc_rules(cramino_extract,qc_rules,'Group' if grouped is True else None)
+        table_sheet_names+=['QC flags','QC failures']
+        tables+=[qc_flags,qc_failures]
+        if qc_output_file is not None:
+            qc_failures.to_csv(qc_output_file,sep='\t',index=False)
+    # weekly/monthly aggregates per group by creation time and trend plots drawn from them
+    trend_tables={}
+    for period in trend_periods:
+        trend_table=make_trend_aggregates(cramino_extract,period,'Group' if grouped is True else None)
+        if trend_table is not None:
+            trend_tables[period]=trend_table
+            table_sheet_names.append(cramino_trend_periods[period]['label'] + ' trends')
+            tables.append(trend_table)
+    trend_figure_specs, trend_figure_worksheet_names, trend_figure_notes = make_trend_figure_specs(trend_tables,'Group' if grouped is True else None,legend_patches=legend_patches,colors=colors,strip_plot=strip_plot,plot_title=plot_title,output_profile=output_profile,sample_note=sample_note)
+    # cohort read length and identity distributions from summed cramino histograms, drawn after trend figures
+    if distribution_tables is None:
+        distribution_tables={}
+    for histogram_name, distribution_table in distribution_tables.items():
+        table_sheet_names.append(histogram_name + ' histogram')
+        tables.append(distribution_table)
+    distribution_figure_specs, distribution_figure_worksheet_names, distribution_figure_notes = make_distribution_figure_specs(distribution_tables,legend_patches=legend_patches,colors=colors,plot_title=plot_title,output_profile=output_profile)
+    trend_figure_specs+=distribution_figure_specs
+    trend_figure_worksheet_names+=distribution_figure_worksheet_names
+    trend_figure_notes+=distribution_figure_notes
+    # workbook figures: grid overviews and/or separate property figures, then trend and distribution figures
+    if property_sheets is None:
+        property_sheets=not grid
+    workbook_figure_specs, workbook_figure_worksheet_names, workbook_figure_notes = [], [], []
+    if grid is True:
+        workbook_figure_specs, workbook_figure_worksheet_names, workbook_figure_notes = make_grid_figure_specs(figure_specs,figure_notes,output_profile,grid_columns)
+    if property_sheets is True:
+        workbook_figure_specs+=figure_specs
+        workbook_figure_worksheet_names+=figure_worksheet_names
+        workbook_figure_notes+=figure_notes
+    workbook_figure_specs+=trend_figure_specs
+    workbook_figure_worksheet_names+=trend_figure_worksheet_names
+    workbook_figure_notes+=trend_figure_notes
+    figure_specs+=trend_figure_specs
+    figure_worksheet_names+=trend_figure_worksheet_names
+    figure_notes+=trend_figure_notes
+    # HTML report with same tables and figures drawn as SVG from aggregated data (no figure rendering)
+    if html_output_file is not None:
+        profiler.start_stage('write HTML report')
+        group_colors=get_svg_group_colors(None if group_variable is None else cramino_extract[group_variable],colors)
+        # QC failures (one row per failing sample and rule) linked to QC output file relative to report instead of inlined
+        linked_tables=None
+        if (qc_rules is not None) and (qc_output_file is not None):
+            linked_tables={'QC failures': os.path.relpath(os.path.abspath(qc_output_file),os.path.dirname(os.path.abspath(html_output_file)))}
+        report_html=make_html_report(table_sheet_names,tables,figure_specs,figure_worksheet_names,figure_notes,title=plot_title or 'Long read cramino QC dashboard',legend_patches=legend_patches,group_colors=group_colors,max_points=html_max_points,linked_tables=linked_tables)
+        write_html_report(html_output_file,report_html)
+    # workbook left out if no output file (HTML report only)
+    if output_file is not None:
+        # render figures (in parallel if threads set)
+        # reuse cached figures if figure_cache set
+        profiler.start_stage('render figures')
+        figure_images=render_figures(workbook_figure_specs,threads,dashboard_output_profiles[output_profile],figure_cache,profiler,workbook_figure_worksheet_names)
+        # write tables and figures into workbook in single pass when done
+        profiler.start_stage('write workbook')
+        write_dashboard_workbook(output_file,table_sheet_names,tables,workbook_figure_worksheet_names,figure_images,workbook_figure_notes)
+    profiler.stop_stage()
+
+# command line interface
+def main(argv=None):
+    # set up command line argument parser
+    parser = argparse.ArgumentParser(description='This program gets summary statistics from long read sequencing report data.')
+
+    # get input and output arguments
+    parser.add_argument('-input', action="store", dest="input_file", nargs="+", help="Input tab-delimited tsv (or parquet/feather) file containing features extracted from long read sequencing reports.")
+    # if multiple inputs, require input names
+    parser.add_argument('-names', action="store", default=None, dest="names", nargs="*", help="Names corresponding to input tsv file(s); required if more than one tsv provided.")
+    parser.add_argument('-output', action="store", dest="output_file", help="Output long read sequencing summary statistics XLSX")
+    parser.add_argument('-plot_title', action="store", default=None, dest="plot_title", help="Title for each plot in output XLSX (optional)")
+    # add boolean --plot_cutoff argument
+    parser.add_argument('--plot_cutoff', action=argparse.BooleanOptionalAction, default=True, dest="plot_cutoff", help="Include cutoff lines in violin plots (optional; default true; --no-plot_cutoff to override)")
+    # include failed run cutoff to exclude as well
+    parser.add_argument('-run_cutoff', action="store", default=1, type=float, dest="run_cutoff", help="Minimum data output per flow cell run to include (optional, 1 Gb default)")
+    # add option for stripplot instead of swarmplot (in case of excessive data points)
+    parser.add_argument('--strip_plot', action=argparse.BooleanOptionalAction, default=False, dest="strip_plot", help="Show strip plots instead of swarm plots inside violin plots (optional; default false)")
+    # add option for color palette
+    parser.add_argument('-colors', action="store", default=None, dest="colors", nargs="*", help="Color palette corresponding to sequential groups displayed (e.g., 'blue', 'red', 'blue'); optional and used only if more than one tsv provided.")
+    # add option for custom legend colors
+    parser.add_argument('-legend_colors', action="store", default=None, dest="legend_colors", nargs="*", help="Colors shown in the legend (e.g., 'blue', 'red'); optional and used only if more color palette included above. Must be palette subset.")
+    # add option for custom legend labels
+    parser.add_argument('-legend_labels', action="store", default=None, dest="legend_labels", nargs="*", help="Labels for each color in legend in order specified in -legend_colors.")
+    # add option to show sample size for groups in grouped violinplots
+    parser.add_argument('--group_count', action=argparse.BooleanOptionalAction, default=False, dest="show_group_count", help="Show group count in x-axis labels (optional; default false)")
+    # add option to render figures in parallel
+    parser.add_argument('-threads', action="store", default=1, type=int, dest="threads", help="Number of processes used to render figures in parallel (optional; default 1)")
+    # add option for output profile (figure resolution, size and compression)
+    parser.add_argument('-output_profile', action="store", default='standard', choices=['draft','standard','publication'], dest="output_profile", help="Figure output profile: draft (low dpi, compressed 256 color PNGs), standard (200/150 dpi), or publication (300 dpi, larger figures) (optional; default standard)")
+    # add option for figure cache
+    parser.add_argument('-figure_cache', action="store", default=None, dest="figure_cache", help="Directory for cache of rendered figures of one dashboard; figures with unchanged plotted columns and plot options are reused, and figures not used by current run are removed (optional)")
+    # add options for stage timing and memory profiling
+    parser.add_argument('--profile', action="store", nargs="?", const='', default=None, dest="profile_report", help="Record wall time, CPU time and peak memory of each stage and figure and write JSON report (optional; default report file <output>.profile.json)")
+    parser.add_argument('--cprofile', action="store", default=None, dest="cprofile_file", help="Write cProfile statistics of whole run to file (optional)")
+    # add option for large cohort point downsampling
+    parser.add_argument('-max_swarm_points', action="store", default=1000, type=int, dest="max_swarm_points", help="Maximum points per group overlaid on violin plots; larger groups are deterministically downsampled and shown as strip plots (optional; default 1000; 0 to disable)")
+    # add options for bounded memory streaming mode
+    parser.add_argument('--streaming', action=argparse.BooleanOptionalAction, default=False, dest="streaming", help="Read inputs in chunks with bounded memory: exact count, mean, standard deviation, min and max, approximate median (KLL sketch) and mode (Misra-Gries counters), and plots from random sample per group (optional; default false)")
+    parser.add_argument('-chunk_size', action="store", default=100000, type=int, dest="chunk_size", help="Rows read per chunk in streaming mode (optional; default 100000)")
+    parser.add_argument('-plot_sample_size', action="store", default=100000, type=int, dest="plot_sample_size", help="Maximum samples per group kept for plots in streaming mode (optional; default 100000)")
+    parser.add_argument('-sketch_size', action="store", default=200, type=int, dest="sketch_size", help="KLL sketch size k for streaming median; rank error about 1.7%% at k=200, falling in proportion to 1/k (optional; default 200)")
+    parser.add_argument('-mode_counters', action="store", default=1000, type=int, dest="mode_counters", help="Misra-Gries counters for streaming mode; mode exact if property has at most this many distinct values (optional; default 1000)")
+    # add option for analytic regression lines in scatterplots
+    parser.add_argument('--reg_line', action=argparse.BooleanOptionalAction, default=False, dest="reg_line", help="Show least squares regression line and 95%% confidence band for each group in scatterplots and add regression fit table (optional; default false)")
+
+    # add option for run date trend sheets
+    parser.add_argument('-trend_periods', action="store", default=['weekly','monthly'], choices=list(cramino_trend_periods), dest="trend_periods", nargs="*", help="Periods of run date trend tables and plots (median, mean and rolling mean of yield, N50 and median identity Q score per group by report creation time), added if summary table has creation times (optional; default weekly monthly; no values to disable)")
+
+    # add options for QC pass/fail flags
+    parser.add_argument('--qc', action=argparse.BooleanOptionalAction, default=False, dest="qc", help="Add QC flags sheet (pass/fail of every rule for each sample) and QC failures sheet (failing samples by rule); default rules are yield and mean coverage plot cutoff thresholds and robust z-score outliers of each property within group (optional; default false)")
+    parser.add_argument('-qc_rules', action="store", default=None, dest="qc_rules_file", help="Tab-delimited QC rules file with columns Rule, Property, Type (min, max or robust_z) and Threshold, used instead of default rules (optional; implies --qc)")
+    parser.add_argument('-qc_robust_z', action="store", default=3.5, type=float, dest="qc_robust_z", help="Absolute robust z-score (0.6745 (x - median) / MAD within group) above which default QC rules flag outliers (optional; default 3.5)")
+    parser.add_argument('-qc_output', action="store", default=None, dest="qc_output_file", help="Output tab-delimited QC failures table (optional; default <output>_qc_failures.tsv if QC flags added)")
+
+    # add options for self-contained HTML report
+    parser.add_argument('-html_output', action="store", default=None, dest="html_output_file", help="Output self-contained HTML report with summary statistics tables and violin plots/scatterplots drawn as SVG from kernel density curves and downsampled points (at most -html_max_points per figure); QC failures linked to -qc_output file (optional)")
+    parser.add_argument('-html_max_points', action="store", default=300, type=int, dest="html_max_points", help="Maximum points per HTML report figure, shared by groups of figure (optional; default 300; 0 for all points)")
+    parser.add_argument('--xlsx', action=argparse.BooleanOptionalAction, default=True, dest="xlsx", help="Write XLSX dashboard (optional; default true; --no-xlsx with -html_output for HTML report only, skipping figure rendering)")
+
+    # add options for grid overview figures
+    parser.add_argument('--grid', action=argparse.BooleanOptionalAction, default=False, dest="grid", help="Draw all violin plots and all scatterplots as one grid figure each on Violin plots and Scatterplots worksheets, with one layout and PNG encode per grid instead of per figure; separate property worksheets left out unless --property_sheets set (optional; default false)")
+    parser.add_argument('-grid_columns', action="store", default=4, type=int, dest="grid_columns", help="Panels per row in grid figures (optional; default 4)")
+    parser.add_argument('--property_sheets', action=argparse.BooleanOptionalAction, default=None, dest="property_sheets", help="Include separate worksheet for each violin plot and scatterplot (optional; default true, or false with --grid)")
+
+    # add option for cohort read length and identity distributions
+    parser.add_argument('-histograms', action="store", default=None, dest="histogram_files", nargs="+", help="Histogram tables written by parser (--histograms), one per input in -input order; adds read length and identity Q score distribution tables and curves per group (optional)")
+
+    # add options for many groups (e.g., hundreds of sites or batches)
+    parser.add_argument('-group_column', action="store", default=None, dest="group_column", help="Column of single combined input table holding group of each sample, instead of one input per group; groups named by column values in order of first appearance (optional)")
+    parser.add_argument('-groups_per_page', action="store", default=None, type=int, dest="groups_per_page", help="Maximum groups per violin plot and scatterplot; more groups are split into pages of groups rendered as separate figures and stacked on each plot worksheet (optional; default all groups in one figure)")
+    parser.add_argument('--long_statistics', action=argparse.BooleanOptionalAction, default=None, dest="long_statistics", help="Write summary statistics of all groups to one long-format Group statistics sheet (one row per group and property) instead of one sheet per group (optional; default true with -group_column, otherwise false)")
+
+    # parse arguments
+    results = parser.parse_args(argv)
+
+    # throw error if no input file provided
+    if results.input_file is None:
+        quit('ERROR: No input file (-input) provided!')
+
+    # groups from group column of single input
+    if results.group_column is not None:
+        if len(results.input_file) > 1:
+            quit('ERROR: Group column (-group_column) needs single combined input table.')
+        if results.streaming is True:
+            quit('ERROR: Group column (-group_column) is not available in streaming mode; use one input per group.')
+    # throw error if no names provided if multiple input files provided
+    elif len(results.input_file)>1:
+        if len(results.names)<=1:
+            quit('ERROR: Multiple input files provided but not multiple names (-names).')
+        elif len(results.names) != len(results.input_file):
+            quit('ERROR: Number of names is different from number of input files.')
+        # test if number of colors different from input files and names
+        elif (results.colors is not None) and (len(results.colors) != len(results.names)):
+            quit("ERROR: Color palette provided, but number of colors doesnt match number of group names.")
+
+    # test number of figure rendering processes
+    if results.threads < 1:
+        quit('ERROR: Number of threads (-threads) must be at least 1.')
+
+    # set legend_patches to None by default
+    legend_patches=None
+    # test if legend colors and labels have proper length
+    if (results.legend_colors is not None) or (results.legend_labels is not None):
+        if len(results.legend_colors) != len(results.legend_labels):
+            quit('ERROR: Number of legend colors does not match number of legend labels.')
+        else:
+            # prepare legend patches
+            legend_patches = make_legend_patches(results.legend_colors, results.legend_labels)
+
+    # test if legend colors provided but not labels or vice versa
+    if ((results.legend_colors is not None) and (results.legend_labels is None)) or ((results.legend_colors is None) and (results.legend_labels is not None)):
+        quit('ERROR: Either legend colors or legend labels provided but not both.')
+
+    # set default output filename
+    if results.output_file is None:
+        results.output_file='output_summary_statistics.xlsx'
+
+    # test number of groups per page
+    if (results.groups_per_page is not None) and (results.groups_per_page < 1):
+        quit('ERROR: Number of groups per page (-groups_per_page) must be at least 1.')
+    # long-format group statistics by default with group column
+    if results.long_statistics is None:
+        results.long_statistics=results.group_column is not None
+
+    # test number of grid columns
+    if results.grid_columns < 1:
+        quit('ERROR: Number of grid columns (-grid_columns) must be at least 1.')
+
+    # HTML report only if requested
+    if (results.xlsx is False) and (results.html_output_file is None):
+        quit('ERROR: No output: --no-xlsx set but no HTML report (-html_output) requested.')
+
+    # set up QC rules if requested (all samples needed, so not in streaming mode)
+    qc_rules=None
+    if (results.qc is True) or (results.qc_rules_file is not None):
+        if results.streaming is True:
+            quit('ERROR: QC flags (--qc) need all samples and are not available in streaming mode.')
+        if results.qc_rules_file is not None:
+            try:
+                qc_rules=read_qc_rules(results.qc_rules_file)
+            except (OSError, ValueError) as e:
+                quit('ERROR: Could not read QC rules file (' + str(e) + ').')
+        else:
+            qc_rules=make_default_qc_rules(results.qc_robust_z)
+        if results.qc_output_file is None:
+            results.qc_output_file=os.path.splitext(results.output_file)[0] + '_qc_failures.tsv'
+
+    # read histogram tables (one per input, named as inputs)
+    distribution_tables=None
+    if results.histogram_files is not None:
+        if len(results.histogram_files) != len(results.input_file):
+            quit('ERROR: Number of histogram tables (-histograms) is different from number of input files.')
+        try:
+            distribution_tables=make_cramino_distribution_tables(results.histogram_files,results.names if len(results.input_file) > 1 else None)
+        except (OSError, ValueError) as e:
+            quit('ERROR: Could not read histogram table (' + str(e) + ').')
+
+    # set up profiling if requested
+    if results.profile_report == '':
+        results.profile_report=results.output_file + '.profile.json'
+    profiler=StageProfiler('CARDlongread_cramino_dashboard',results.profile_report,results.cprofile_file)
+    profiler.start_stage('read input')
+    if results.streaming is True:
+        # read summary tables in chunks, keeping streaming summary statistics and plot sample per group
+        for option_name, option_value in [('-chunk_size',results.chunk_size),('-plot_sample_size',results.plot_sample_size),('-sketch_size',results.sketch_size),('-mode_counters',results.mode_counters)]:
+            if option_value < 1:
+                quit('ERROR: ' + option_name + ' must be at least 1.')
+        cramino_extract, grouped, table_sheet_names, tables, group_totals, uncertain_modes = stream_cramino_summary_tables(results.input_file,names=results.names,run_cutoff=results.run_cutoff,show_group_count=results.show_group_count,chunk_size=results.chunk_size,sample_size=results.plot_sample_size,sketch_size=results.sketch_size,mode_counters=results.mode_counters)
+        summary_tables=(table_sheet_names,tables)
+        # note properties whose streamed mode is not certain (left blank instead of arbitrary counter value)
+        if len(uncertain_modes) > 0:
+            print('NOTE: Streaming mode: Mode left blank for ' + ', '.join(x[1] if x[0] is None else x[1] + ' (' + x[0] + ')' for x in uncertain_modes) + '; more distinct values than mode counters (-mode_counters ' + str(results.mode_counters) + ') and no value frequent enough to be certain of mode.', file=sys.stderr)
+        if len(cramino_extract) < sum(group_totals.values()):
+            sample_note='Streaming mode: plots drawn from fixed-seed random sample of ' + str(len(cramino_extract)) + ' of ' + str(sum(group_totals.values())) + ' samples (at most ' + str(results.plot_sample_size) + ' per group).'
+        else:
+            sample_note=None
+    else:
+        # read tab delimited (or parquet/feather) summary tables, filter out low output runs and combine groups
+        cramino_extract, grouped = load_cramino_summary_tables(results.input_file,names=results.names,run_cutoff=results.run_cutoff,show_group_count=results.show_group_count,group_column=results.group_column)
+        summary_tables=None
+        sample_note=None
+        # group names from group column
+        if results.group_column is not None:
+            results.names=list(cramino_extract['Group'].cat.categories)
+            if (results.colors is not None) and (len(results.colors) != len(results.names)):
+                quit('ERROR: Color palette provided, but number of colors (' + str(len(results.colors)) + ') doesnt match number of groups in group column (' + str(len(results.names)) + ').')
+    # summary statistics, figures and workbook
+    # options passed by name, so adding or reordering make_dashboard parameters cannot swap them
+    make_dashboard(cramino_extract,results.output_file if results.xlsx is True else None,grouped,
+                   names=results.names,show_group_count=results.show_group_count,plot_title=results.plot_title,
+                   plot_cutoff=results.plot_cutoff,strip_plot=results.strip_plot,colors=results.colors,legend_patches=legend_patches,
+                   threads=results.threads,output_profile=results.output_profile,figure_cache=results.figure_cache,
+                   max_swarm_points=results.max_swarm_points,reg_line=results.reg_line,summary_tables=summary_tables,
+                   sample_note=sample_note,profiler=profiler,trend_periods=results.trend_periods,qc_rules=qc_rules,
+                   qc_output_file=results.qc_output_file,html_output_file=results.html_output_file,html_max_points=results.html_max_points,grid=results.grid,
+                   grid_columns=results.grid_columns,property_sheets=results.property_sheets,distribution_tables=distribution_tables,
+                   groups_per_page=results.groups_per_page,long_statistics=results.long_statistics)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+# shared output file helpers
+import os
+import tempfile
+
+# write output file atomically: writer(temporary_file) writes hidden temporary file in output directory,
+# which is then moved into place, so readers and failed runs never see partial output
+# suffix is temporary file extension (for writers that check file extension)
+# returns writer return value
+def write_file_atomically(output_file, writer, suffix=''):
+    output_directory = os.path.dirname(os.path.abspath(output_file))
+    temporary_fd, temporary_file = tempfile.mkstemp(dir=output_directory, prefix='.' + os.path.basename(output_file) + '.', suffix=suffix)
+    try:
+        # temporary files are private, so give output usual permissions (from umask)
+        current_umask = os.umask(0)
+        os.umask(current_umask)
+        os.fchmod(temporary_fd, 0o666 & ~current_umask)
+        os.close(temporary_fd)
+        writer_output = writer(temporary_file)
+        os.replace(temporary_file, output_file)
+    except BaseException:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        raise
+    return writer_output
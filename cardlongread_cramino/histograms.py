@@ -0,0 +1,150 @@
+# cohort read length and identity distributions from cramino histogram sections
+# cramino reports with histograms (cramino --hist) have sections after the summary fields, e.g.
+# # Histogram for read lengths:
+# 0-2000	1523
+# 2000-4000	8712
+# # Histogram for Phred-scaled accuracy:
+# 0-1	12
+# each line is a bin range and read count (bar characters between range and count are ignored)
+# counts of each report bin are spread over overlapping fixed bins (reads assumed uniform within report bin), so
+# histograms of any number of reports are summed in constant memory and different cramino bin layouts can be combined
+import re
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import read_cramino_report_file
+
+# fixed histogram bins (edges, last bin open ended) and axis labels
+cramino_histogram_bins = {
+    'Read length': {'edges': np.r_[np.arange(0, 200001, 1000), np.inf], 'label': 'Read length (bp)'},
+    'Identity Q score': {'edges': np.r_[np.arange(0, 61, 1), np.inf], 'label': 'Phred-scaled identity (Q)'},
+}
+# histogram table columns
+cramino_histogram_columns = ['Histogram','Bin start','Bin end','Count']
+# histogram section header and bin line
+cramino_histogram_header_pattern = re.compile(r'^#\s*Histogram for (.+?):?\s*$', re.IGNORECASE)
+cramino_histogram_bin_pattern = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)(.*)$')
+
+# convert percent identity to Phred scale (100% identity into open ended last bin)
+def convert_percent_identity_to_q_score(percent_identity):
+    with np.errstate(divide='ignore'):
+        return -10 * np.log10(np.maximum(100 - percent_identity, 0) / 100)
+
+# get fixed histogram and bin value conversion for section heading
+# read lengths as is; Phred-scaled accuracy as is; percent identity converted to Phred scale
+# returns histogram name and conversion function, or None for unknown sections
+def get_cramino_histogram_type(heading):
+    heading = heading.lower()
+    if 'length' in heading:
+        return 'Read length', lambda x: x
+    elif ('phred' in heading) or ('accuracy' in heading) or ('q score' in heading):
+        return 'Identity Q score', lambda x: x
+    elif 'identity' in heading:
+        return 'Identity Q score', convert_percent_identity_to_q_score
+    return None
+
+# make empty count arrays of fixed histograms (fractional counts from spread report bins, rounded in histogram table)
+def make_empty_cramino_histograms():
+    return {name: np.zeros(len(settings['edges']) - 1) for name, settings in cramino_histogram_bins.items()}
+
+# spread counts of report bins over fixed bins in proportion to overlap
+# fraction of each report bin below each fixed edge, differenced over edges (last fixed bin open ended, so no reads lost)
+def rebin_histogram_counts(bin_starts, bin_ends, counts, edges):
+    bin_starts, bin_ends = bin_starts[:, None], bin_ends[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction_below = np.where(edges >= bin_ends, 1.0, np.where(edges <= bin_starts, 0.0, (edges - bin_starts) / (bin_ends - bin_starts)))
+    return counts @ np.diff(fraction_below, axis=1)
+
+# add histogram sections of cramino report text to fixed-bin count arrays (in place)
+# returns number of histogram sections found
+def add_cramino_report_histograms(cramino_text, histograms):
+    sections = 0
+    histogram_type = None
+    section_bins = []
+    section_counts = []
+    # close section: add bins to fixed histogram in one vectorized pass
+    def add_section():
+        if (histogram_type is not None) and (len(section_counts) > 0):
+            name, convert = histogram_type
+            bin_edges = convert(np.array(section_bins, dtype=float))
+            histograms[name] += rebin_histogram_counts(bin_edges.min(axis=1), bin_edges.max(axis=1), np.array(section_counts, dtype=float), cramino_histogram_bins[name]['edges'])
+    for line in cramino_text.splitlines():
+        header = cramino_histogram_header_pattern.match(line)
+        if header is not None:
+            add_section()
+            histogram_type = get_cramino_histogram_type(header.group(1))
+            section_bins, section_counts = [], []
+            sections += 1
+            continue
+        if histogram_type is None:
+            continue
+        bin_line = cramino_histogram_bin_pattern.match(line)
+        if bin_line is None:
+            continue
+        # count is last number on line (lines without count, e.g., bars only, cannot be summed and are skipped)
+        counts = re.findall(r'\d+', bin_line.group(3))
+        if len(counts) == 0:
+            continue
+        section_bins.append((float(bin_line.group(1)), float(bin_line.group(2))))
+        section_counts.append(int(counts[-1]))
+    add_section()
+    return sections
+
+# sum histograms of cramino report files (text reports, optionally gzip-compressed) or report texts
+# reports are read one at a time, so memory does not grow with number of reports
+# returns fixed-bin count arrays and number of reports with histograms
+def sum_cramino_report_histograms(reports, report_texts=False):
+    histograms = make_empty_cramino_histograms()
+    reports_with_histograms = 0
+    for report in reports:
+        try:
+            cramino_text = report if report_texts is True else read_cramino_report_file(report)
+        # unreadable reports are reported by summary table parser
+        except (OSError, ValueError):
+            continue
+        if add_cramino_report_histograms(cramino_text, histograms) > 0:
+            reports_with_histograms += 1
+    return histograms, reports_with_histograms
+
+# make histogram table (one row per fixed bin) from count arrays
+def make_cramino_histogram_table(histograms):
+    histogram_tables = []
+    for name, counts in histograms.items():
+        edges = cramino_histogram_bins[name]['edges']
+        histogram_tables.append(pd.DataFrame({'Histogram': name, 'Bin start': edges[:-1], 'Bin end': edges[1:], 'Count': np.rint(counts).astype(np.int64)}))
+    return pd.concat(histogram_tables, ignore_index=True)
+
+# read histogram table written by parser into count arrays
+def read_cramino_histogram_table(input_file):
+    histogram_table = pd.read_csv(input_file, sep='\t')
+    missing_columns = [x for x in cramino_histogram_columns if x not in histogram_table.columns]
+    if len(missing_columns) > 0:
+        raise ValueError(f"{input_file} is missing histogram columns: {', '.join(missing_columns)}")
+    histograms = make_empty_cramino_histograms()
+    for name in histograms:
+        counts = histogram_table.loc[histogram_table['Histogram'] == name, 'Count'].to_numpy(dtype=np.int64)
+        if len(counts) != len(histograms[name]):
+            raise ValueError(f'{input_file} has {len(counts)} {name} bins, expected {len(histograms[name])}')
+        histograms[name] = counts
+    return histograms
+
+# make cohort distribution tables from histograms of each group (one histogram table file per group)
+# columns: Bin start, Bin end, read count of each group, and of all groups if more than one
+# bins after last non-empty bin of all groups left out
+# returns dictionary of distribution tables keyed by histogram name (histograms without reads left out)
+def make_cramino_distribution_tables(histogram_files, names=None):
+    group_histograms = [read_cramino_histogram_table(x) for x in histogram_files]
+    if names is None:
+        names = ['All samples']
+    distribution_tables = {}
+    for name, settings in cramino_histogram_bins.items():
+        counts = np.array([x[name] for x in group_histograms])
+        if counts.sum() == 0:
+            continue
+        last_bin = np.nonzero(counts.sum(axis=0))[0].max() + 1
+        distribution_table = pd.DataFrame({'Bin start': settings['edges'][:last_bin], 'Bin end': settings['edges'][1:last_bin + 1]})
+        for group_name, group_counts in zip(names, counts):
+            distribution_table[group_name] = group_counts[:last_bin]
+        if len(names) > 1:
+            distribution_table['All groups'] = counts.sum(axis=0)[:last_bin]
+        distribution_tables[name] = distribution_table
+    return distribution_tables
@@ -0,0 +1,390 @@
+# long read sequencing cramino QC dashboard as single self-contained HTML report
+# summary statistics tables and the same violin plots and scatterplots as dashboard workbook, drawn as inline SVG
+# from aggregated data (binned kernel density curves, quartiles and downsampled points) instead of embedded PNGs,
+# so report is small, fast to build (no figure rendering) and opens in any browser without scripts or external files
+# points are capped per figure (not per group as in workbook figures) and long per-sample tables are linked, not inlined,
+# so report stays smaller than workbook for large cohorts
+import html
+import re
+import inspect
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import get_cramino_property_values
+from cardlongread_cramino.summary import get_t_quantile_95
+from cardlongread_cramino.files import write_file_atomically
+from cardlongread_cramino.plots import render_violinswarmplot, render_scatterplot, render_distribution_curves, get_group_colors, get_point_sample_mask, get_distribution_fractions
+
+# SVG figure size and plot area margins (pixels)
+html_figure_width = 600
+html_figure_height = 400
+html_figure_margins = {'left': 70, 'right': 20, 'top': 35, 'bottom': 70}
+# kernel density: grid points per violin and bins for binned density estimate
+html_kde_grid_points = 50
+html_kde_bins = 512
+# grid points of regression confidence bands
+html_band_grid_points = 20
+# default maximum points per figure (all groups of figure together)
+html_max_points = 300
+# tables left out of report (one row per sample, so in workbook only)
+html_excluded_tables = ['QC flags']
+
+# report style (inline, no external files)
+html_report_style = '''body{font-family:sans-serif;margin:20px;color:#222}
+h1{font-size:1.5em}h2{font-size:1.2em;margin-top:2em}h3{font-size:1em;margin-bottom:.3em}
+table{border-collapse:collapse;font-size:.8em;margin-bottom:1em}
+th,td{border:1px solid #ccc;padding:2px 6px;text-align:right}th{background:#eee}
+td:first-child,th:first-child{text-align:left}
+.figures{display:flex;flex-wrap:wrap;gap:10px}
+figure{margin:0;width:600px;max-width:100%}figcaption{font-size:.8em;color:#555}
+svg{width:100%;height:auto}svg text{font-size:11px;font-family:sans-serif}
+.legend span{display:inline-block;margin-right:1em}.legend i{display:inline-block;width:.8em;height:.8em;margin-right:.3em}
+'''
+
+# format number for SVG coordinates
+def format_svg_number(value):
+    return f'{value:.1f}'
+
+# format tick label with number of decimals of tick step
+def format_tick_label(value, step):
+    decimals = max(0, -int(np.floor(np.log10(step))))
+    # adding zero turns negative zero (rounding error around zero tick) into zero
+    return f'{round(value, decimals) + 0.0:.{decimals}f}'
+
+# get round axis ticks (steps of 1, 2 or 5 times power of ten) covering range
+def get_axis_ticks(lower, upper, number_of_ticks=5):
+    raw_step = (upper - lower) / number_of_ticks
+    magnitude = 10 ** np.floor(np.log10(raw_step))
+    step = magnitude * min(x for x in [1, 2, 5, 10] if x >= raw_step / magnitude)
+    ticks = np.arange(np.ceil(lower / step) * step, upper + step * 1e-9, step)
+    return ticks, step
+
+# get axis range of values with margin (one unit if all values are equal)
+def get_axis_range(values, margin=0.05):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return 0.0, 1.0
+    lower, upper = values.min(), values.max()
+    if upper == lower:
+        return lower - 1, upper + 1
+    return lower - (upper - lower) * margin, upper + (upper - lower) * margin
+
+# map values from data range onto pixel range
+def scale_values(values, data_range, pixel_range):
+    return pixel_range[0] + (np.asarray(values, dtype=float) - data_range[0]) / (data_range[1] - data_range[0]) * (pixel_range[1] - pixel_range[0])
+
+# kernel density of values on grid spanning data range plus two bandwidths (Scott's rule, as seaborn violins)
+# values are binned into fine histogram first, so cost does not grow with number of samples
+# returns grid and density, or None if fewer than two distinct values
+def get_binned_kde(values, grid_points=html_kde_grid_points, bins=html_kde_bins):
+    values = values[np.isfinite(values)]
+    if (len(values) < 2) or (values.min() == values.max()):
+        return None
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    counts, bin_edges = np.histogram(values, bins=bins)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, grid_points)
+    density = np.exp(-0.5 * ((grid[:, None] - bin_centers[None, :]) / bandwidth) ** 2) @ counts / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
+# get SVG colors (hex) of groups as in dashboard figures; group values as column values (or None for all samples)
+def get_svg_group_colors(group_values, user_palette=None):
+    from matplotlib.colors import to_hex
+    if group_values is None:
+        group_colors = get_group_colors(None, None, user_palette)
+    else:
+        group_colors = get_group_colors(pd.DataFrame({'Group': group_values}), 'Group', user_palette)
+    return {name: to_hex(color) for name, color in group_colors.items()}
+
+# SVG text element (multi-line labels, e.g., group and count, split into lines)
+def make_svg_text(x, y, text, anchor='middle', rotate=False, bold=False):
+    lines = str(text).split('\n')
+    attributes = f'x="{format_svg_number(x)}" y="{format_svg_number(y)}" text-anchor="{anchor}"'
+    if rotate is True:
+        attributes += f' transform="rotate(-90 {format_svg_number(x)} {format_svg_number(y)})"'
+    if bold is True:
+        attributes += ' font-weight="bold"'
+    if len(lines) == 1:
+        return f'<text {attributes}>{html.escape(lines[0])}</text>'
+    return f'<text {attributes}>' + ''.join(f'<tspan x="{format_svg_number(x)}" dy="{0 if idx == 0 else 1.1}em">{html.escape(line)}</tspan>' for idx, line in enumerate(lines)) + '</text>'
+
+# SVG points as one path per color (zero-length segments with round caps, much smaller than one circle per point)
+def make_svg_points(x_pixels, y_pixels, color, radius=2.0, opacity=0.7):
+    complete = np.isfinite(x_pixels) & np.isfinite(y_pixels)
+    if not complete.any():
+        return ''
+    path = ''.join(f'M{format_svg_number(x)} {format_svg_number(y)}h0' for x, y in zip(x_pixels[complete], y_pixels[complete]))
+    return f'<path d="{path}" stroke="{color}" stroke-width="{2 * radius:g}" stroke-linecap="round" stroke-opacity="{opacity:g}" fill="none"/>'
+
+# SVG points with radius per point (e.g., sized by runs), as one path per radius rounded to half pixel
+def make_svg_sized_points(x_pixels, y_pixels, radii, color):
+    radii = np.round(np.asarray(radii, dtype=float) * 2) / 2
+    return ''.join(make_svg_points(x_pixels[radii == radius], y_pixels[radii == radius], color, radius) for radius in np.unique(radii[np.isfinite(radii)]))
+
+# sample of at most max_points points of figure, shared evenly by groups (groups with fewer points leave rest to others)
+# points are those with lowest random keys in each group as in dashboard figures (see get_point_sample_mask),
+# so report shows subset of points of workbook figures
+# returns boolean mask of points (all points if max_points not set)
+def get_figure_point_sample_mask(data, group_values, max_points):
+    if (max_points is None) or (max_points <= 0) or (len(data) == 0):
+        return np.ones(len(data), dtype=bool)
+    if group_values is None:
+        group_counts = np.array([len(data)])
+    else:
+        group_counts = np.sort(pd.Series(np.asarray(group_values)).value_counts().to_numpy())
+    for idx, count in enumerate(group_counts):
+        # points per group: budget left by smaller groups shared by this and larger groups (at least one point per group)
+        group_limit = max(1, (max_points - group_counts[:idx].sum()) // (len(group_counts) - idx))
+        if count > group_limit:
+            return get_point_sample_mask(data, group_values, group_limit)
+    return np.ones(len(data), dtype=bool)
+
+# SVG polyline or polygon path through points
+def make_svg_path(x_pixels, y_pixels, closed=False):
+    path = 'M' + 'L'.join(f'{format_svg_number(x)} {format_svg_number(y)}' for x, y in zip(x_pixels, y_pixels))
+    return path + ('Z' if closed is True else '')
+
+# SVG axes (frame, ticks, tick labels and axis titles); x ticks as dates if x_dates set (days since epoch)
+def make_svg_axes(x_range, y_range, x_title, y_title, title=None, x_ticks=None, x_dates=False):
+    left, top = html_figure_margins['left'], html_figure_margins['top']
+    right, bottom = html_figure_width - html_figure_margins['right'], html_figure_height - html_figure_margins['bottom']
+    elements = [f'<rect x="{left}" y="{top}" width="{right - left}" height="{bottom - top}" fill="none" stroke="#333"/>']
+    y_ticks, y_step = get_axis_ticks(*y_range)
+    for tick, pixel in zip(y_ticks, scale_values(y_ticks, y_range, (bottom, top))):
+        elements.append(f'<path d="M{left - 4} {format_svg_number(pixel)}h4" stroke="#333"/>')
+        elements.append(make_svg_text(left - 6, pixel + 4, format_tick_label(tick, y_step), anchor='end'))
+    # numeric x ticks (categorical axes pass own tick labels)
+    if x_ticks is None:
+        x_tick_values, x_step = get_axis_ticks(*x_range, number_of_ticks=4 if x_dates is True else 6)
+        x_ticks = []
+        for tick in x_tick_values:
+            if x_dates is True:
+                label = (pd.Timestamp(0) + pd.to_timedelta(tick, unit='D')).strftime('%Y-%m-%d')
+            else:
+                label = format_tick_label(tick, x_step)
+            x_ticks.append((scale_values(tick, x_range, (left, right)), label))
+    for pixel, label in x_ticks:
+        elements.append(f'<path d="M{format_svg_number(pixel)} {bottom}v4" stroke="#333"/>')
+        elements.append(make_svg_text(pixel, bottom + 16, label))
+    elements.append(make_svg_text((left + right) / 2, html_figure_height - 12, x_title))
+    elements.append(make_svg_text(16, (top + bottom) / 2, y_title, rotate=True))
+    if title is not None:
+        elements.append(make_svg_text((left + right) / 2, 20, title, bold=True))
+    return elements
+
+# SVG cutoff lines (horizontal for y values, vertical for x values) inside axis ranges
+def make_svg_cutoff_lines(cutoffs, cutoff_colors, data_range, pixel_range, horizontal=True):
+    left, top = html_figure_margins['left'], html_figure_margins['top']
+    right, bottom = html_figure_width - html_figure_margins['right'], html_figure_height - html_figure_margins['bottom']
+    elements = []
+    for cutoff, color in zip(cutoffs, cutoff_colors):
+        if not (data_range[0] <= cutoff <= data_range[1]):
+            continue
+        pixel = format_svg_number(scale_values(cutoff, data_range, pixel_range))
+        if horizontal is True:
+            elements.append(f'<path d="M{left} {pixel}H{right}" stroke="{color}"/>')
+        else:
+            elements.append(f'<path d="M{pixel} {top}V{bottom}" stroke="{color}"/>')
+    return elements
+
+# violin plot as SVG (same view as render_violinswarmplot)
+# violins are kernel density curves of all samples in each group (equal area) with quartile lines,
+# overlaid with jittered points (at most max_points in figure and swarm_max_points per group as in workbook figure, deterministic sample)
+def make_violin_svg(data, input_variable, group_variable=None, user_palette=None, cutoff=None, title=None, max_points=html_max_points, swarm_max_points=None):
+    values = get_cramino_property_values(data, [input_variable])[:, 0]
+    if group_variable is None:
+        group_values = None
+        group_names = ['All samples']
+        group_codes = np.zeros(len(values), dtype=np.int64)
+    else:
+        group_values = pd.Series(np.asarray(group_variable), index=data.index)
+        group_names = list(pd.unique(group_values.dropna()))
+        group_codes = pd.Categorical(group_values, categories=group_names).codes
+    group_colors = get_svg_group_colors(group_values, user_palette)
+    kdes = [get_binned_kde(values[group_codes == idx]) for idx in range(len(group_names))]
+    y_range = get_axis_range(np.concatenate([values] + [x[0] for x in kdes if x is not None]))
+    left, top = html_figure_margins['left'], html_figure_margins['top']
+    right, bottom = html_figure_width - html_figure_margins['right'], html_figure_height - html_figure_margins['bottom']
+    slot_width = (right - left) / len(group_names)
+    slot_centers = left + slot_width * (np.arange(len(group_names)) + 0.5)
+    # equal area violins: common density scale, widest violin fills 80% of its slot
+    max_density = max([x[1].max() for x in kdes if x is not None], default=1)
+    elements = make_svg_axes((0, 1), y_range, '', input_variable, title, x_ticks=list(zip(slot_centers, group_names)))
+    for idx, kde in enumerate(kdes):
+        group_data = values[(group_codes == idx) & np.isfinite(values)]
+        if kde is None:
+            # single value: horizontal line
+            if len(group_data) > 0:
+                pixel = format_svg_number(scale_values(group_data[0], y_range, (bottom, top)))
+                elements.append(f'<path d="M{format_svg_number(slot_centers[idx] - slot_width * 0.4)} {pixel}h{format_svg_number(slot_width * 0.8)}" stroke="#333"/>')
+            continue
+        grid, density = kde
+        half_widths = density / max_density * slot_width * 0.4
+        grid_pixels = scale_values(grid, y_range, (bottom, top))
+        elements.append(f'<path d="{make_svg_path(np.r_[slot_centers[idx] - half_widths, (slot_centers[idx] + half_widths)[::-1]], np.r_[grid_pixels, grid_pixels[::-1]], closed=True)}" fill="white" stroke="#333"/>')
+        # quartile lines (median solid, other quartiles dashed) across violin
+        for quartile, dash in zip(np.percentile(group_data, [25, 50, 75]), [' stroke-dasharray="4 3"', '', ' stroke-dasharray="4 3"']):
+            half_width = np.interp(quartile, grid, half_widths)
+            elements.append(f'<path d="M{format_svg_number(slot_centers[idx] - half_width)} {format_svg_number(scale_values(quartile, y_range, (bottom, top)))}h{format_svg_number(2 * half_width)}" stroke="#333"{dash}/>')
+    # jittered points (black if no groups, group colors otherwise)
+    point_sample_mask = get_figure_point_sample_mask(data, group_values, max_points)
+    swarm_sample_mask = get_point_sample_mask(data, group_values, swarm_max_points)
+    if swarm_sample_mask is not None:
+        point_sample_mask &= swarm_sample_mask
+    # jitter from other seed than point sample (sampled points have lowest random keys of seed 0)
+    jitter = (np.random.default_rng(1).random(len(values)) - 0.5) * slot_width * 0.3
+    for idx, name in enumerate(group_names):
+        points = point_sample_mask & (group_codes == idx)
+        elements.append(make_svg_points(slot_centers[idx] + jitter[points], scale_values(values[points], y_range, (bottom, top)), 'black' if group_variable is None else group_colors[name]))
+    if cutoff is not None:
+        elements += make_svg_cutoff_lines([cutoff], ['red'], y_range, (bottom, top))
+    return make_svg(elements)
+
+# scatterplot as SVG (same view as render_scatterplot)
+# points colored by group (at most max_points in figure, deterministic sample), with precomputed regression fits
+# (line and 95% confidence band), trend lines, point sizes and date x axis as in dashboard figures
+# trend lines drawn through all precomputed period values (see make_trend_aggregates), whatever points are sampled
+def make_scatter_svg(data, group_variable=None, user_palette=None, title=None, x_cutoffs=None, x_cutoff_colors=None, y_cutoffs=None, y_cutoff_colors=None, x_variable=None, y_variable=None, size_column=None, has_date_time=False, reg_line_fits=None, trend_line_column=None, max_points=html_max_points):
+    if has_date_time is True:
+        # dates as days since epoch
+        x_values = (pd.to_datetime(data[x_variable]) - pd.Timestamp(0)).dt.total_seconds().to_numpy() / 86400
+    else:
+        x_values = get_cramino_property_values(data, [x_variable])[:, 0]
+    y_values = get_cramino_property_values(data, [y_variable])[:, 0]
+    if group_variable is None:
+        group_values = None
+        group_codes = np.zeros(len(data), dtype=np.int64)
+    else:
+        group_values = data[group_variable]
+    group_colors = get_svg_group_colors(group_values, user_palette)
+    group_names = list(group_colors)
+    if group_values is not None:
+        group_codes = pd.Categorical(np.asarray(group_values), categories=group_names).codes
+    y_range_values = [y_values]
+    if trend_line_column is not None:
+        trend_values = get_cramino_property_values(data, [trend_line_column])[:, 0]
+        y_range_values.append(trend_values)
+    x_range = get_axis_range(x_values, 0.03)
+    y_range = get_axis_range(np.concatenate(y_range_values))
+    left, top = html_figure_margins['left'], html_figure_margins['top']
+    right, bottom = html_figure_width - html_figure_margins['right'], html_figure_height - html_figure_margins['bottom']
+    elements = make_svg_axes(x_range, y_range, x_variable, y_variable, title, x_dates=has_date_time)
+    # regression fit lines and confidence bands
+    if reg_line_fits is not None:
+        for fit in reg_line_fits.to_dict('records'):
+            if (not np.isfinite(fit['Slope'])) or (fit['Group'] not in group_colors):
+                continue
+            x_grid = np.linspace(fit['X min'], fit['X max'], html_band_grid_points)
+            y_fit = fit['Intercept'] + fit['Slope'] * x_grid
+            x_pixels = scale_values(x_grid, x_range, (left, right))
+            if fit['n'] > 2:
+                band_half_width = get_t_quantile_95(fit['n'] - 2) * fit['Residual standard error'] * np.sqrt(1/fit['n'] + (x_grid - fit['X mean'])**2 / fit['X sum of squares'])
+                elements.append(f'<path d="{make_svg_path(np.r_[x_pixels, x_pixels[::-1]], scale_values(np.r_[y_fit - band_half_width, (y_fit + band_half_width)[::-1]], y_range, (bottom, top)), closed=True)}" fill="{group_colors[fit["Group"]]}" fill-opacity="0.15"/>')
+            # fit line is straight, so end points only
+            elements.append(f'<path d="{make_svg_path(x_pixels[[0, -1]], scale_values(y_fit[[0, -1]], y_range, (bottom, top)))}" stroke="{group_colors[fit["Group"]]}" stroke-width="1.5" fill="none"/>')
+    # points of each group (radius by size column if set, as area proportional to value)
+    point_sample_mask = get_figure_point_sample_mask(data, group_values, max_points)
+    x_pixels = scale_values(x_values, x_range, (left, right))
+    y_pixels = scale_values(y_values, y_range, (bottom, top))
+    if size_column is not None:
+        sizes = get_cramino_property_values(data, [size_column])[:, 0]
+        radii = 2 + 4 * np.sqrt(sizes / np.nanmax(sizes))
+    for idx, name in enumerate(group_names):
+        points = point_sample_mask & (group_codes == idx)
+        if size_column is None:
+            elements.append(make_svg_points(x_pixels[points], y_pixels[points], group_colors[name]))
+        else:
+            elements.append(make_svg_sized_points(x_pixels[points], y_pixels[points], radii[points], group_colors[name]))
+        # trend line through precomputed values in x order
+        if trend_line_column is not None:
+            line_points = (group_codes == idx) & np.isfinite(x_pixels) & np.isfinite(trend_values)
+            line_order = np.argsort(x_values[line_points], kind='stable')
+            if line_points.any():
+                elements.append(f'<path d="{make_svg_path(x_pixels[line_points][line_order], scale_values(trend_values[line_points][line_order], y_range, (bottom, top)))}" stroke="{group_colors[name]}" stroke-width="1.5" fill="none"/>')
+    if x_cutoffs is not None:
+        elements += make_svg_cutoff_lines(x_cutoffs, x_cutoff_colors, x_range, (left, right), horizontal=False)
+    if y_cutoffs is not None:
+        elements += make_svg_cutoff_lines(y_cutoffs, y_cutoff_colors, y_range, (bottom, top))
+    return make_svg(elements)
+
+# read distribution curves as SVG (same view as render_distribution_curves)
+# fraction of reads per bin of each group, and of all groups as black dashed line
+def make_distribution_svg(distribution_table, group_names, x_label, user_palette=None, title=None):
+    column_names = list(group_names) + (['All groups'] if 'All groups' in distribution_table.columns else [])
+    bin_midpoints, fractions = get_distribution_fractions(distribution_table, column_names)
+    group_colors = get_svg_group_colors(pd.Categorical(group_names, categories=group_names) if len(group_names) > 1 else None, user_palette)
+    group_colors['All groups'] = '#000000'
+    x_range = get_axis_range(bin_midpoints, 0.03)
+    y_range = (0, get_axis_range(fractions)[1])
+    left, top = html_figure_margins['left'], html_figure_margins['top']
+    right, bottom = html_figure_width - html_figure_margins['right'], html_figure_height - html_figure_margins['bottom']
+    elements = make_svg_axes(x_range, y_range, x_label, 'Fraction of reads', title)
+    x_pixels = scale_values(bin_midpoints, x_range, (left, right))
+    for idx, name in enumerate(column_names):
+        line_points = np.isfinite(fractions[:, idx])
+        if not line_points.any():
+            continue
+        color = group_colors.get(name, group_colors.get('All samples', '#000000'))
+        dashes = ' stroke-dasharray="6 4"' if name == 'All groups' else ''
+        elements.append(f'<path d="{make_svg_path(x_pixels[line_points], scale_values(fractions[line_points, idx], y_range, (bottom, top)))}" stroke="{color}" stroke-width="1.5" fill="none"{dashes}/>')
+    return make_svg(elements)
+
+# SVG document from elements
+def make_svg(elements):
+    return f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {html_figure_width} {html_figure_height}">' + ''.join(elements) + '</svg>'
+
+# SVG figure for dashboard figure specification (see make_dashboard_figure_specs, make_trend_figure_specs and make_distribution_figure_specs)
+# points limited to max_points per figure (violin plots also to their max_points per group)
+def make_figure_svg(figure_spec, max_points=html_max_points):
+    render_function, render_args, render_kwargs = figure_spec
+    arguments = inspect.signature(render_function).bind(*render_args, **render_kwargs)
+    arguments.apply_defaults()
+    arguments = arguments.arguments
+    if render_function is render_violinswarmplot:
+        return make_violin_svg(arguments['data'], arguments['input_variable'], arguments['group_variable'], arguments['user_palette'], arguments['cutoff'], arguments['title'], max_points, arguments['max_points'])
+    elif render_function is render_scatterplot:
+        return make_scatter_svg(arguments['data'], arguments['group_variable'], arguments['user_palette'], arguments['title'], arguments['x_cutoffs'], arguments['x_cutoff_colors'], arguments['y_cutoffs'], arguments['y_cutoff_colors'], arguments['x_variable'], arguments['y_variable'], arguments['size_column'], arguments['has_date_time'], arguments['reg_line_fits'], arguments['trend_line_column'], max_points)
+    elif render_function is render_distribution_curves:
+        return make_distribution_svg(arguments['distribution_table'], arguments['group_names'], arguments['x_label'], arguments['user_palette'], arguments['title'])
+    raise ValueError(f'No SVG view for {render_function.__name__}')
+
+# HTML legend from legend patches (custom legend colors and labels) or group colors
+def make_html_legend(legend_patches=None, group_colors=None):
+    from matplotlib.colors import to_hex
+    if legend_patches is not None:
+        entries = [(patch.get_label(), to_hex(patch.get_facecolor())) for patch in legend_patches]
+    elif (group_colors is not None) and (len(group_colors) > 1):
+        entries = list(group_colors.items())
+    else:
+        return ''
+    return '<p class="legend">' + ''.join(f'<span><i style="background:{color}"></i>{html.escape(str(label))}</span>' for label, color in entries) + '</p>'
+
+# make HTML report: tables (per-sample tables excluded), then figures in worksheet order with worksheet notes
+# tables in linked_tables (table name: file path or URL, e.g., QC failures written to -qc_output) replaced by link to file
+def make_html_report(table_sheet_names, tables, figure_specs, figure_names, figure_notes, title='Long read cramino QC dashboard', legend_patches=None, group_colors=None, max_points=html_max_points, linked_tables=None):
+    sections = [f'<h1>{html.escape(title)}</h1>']
+    sections.append('<h2>Tables</h2>')
+    for table_name, table in zip(table_sheet_names, tables):
+        if table_name in html_excluded_tables:
+            continue
+        sections.append(f'<h3>{html.escape(table_name)}</h3>')
+        if (linked_tables is not None) and (table_name in linked_tables):
+            sections.append(f'<p>{len(table)} rows in <a href="{html.escape(linked_tables[table_name])}">{html.escape(linked_tables[table_name])}</a></p>')
+            continue
+        # indentation between tags dropped (about half of pandas table markup)
+        sections.append(re.sub(r'>\s+<', '><', table.to_html(index=False, na_rep='', float_format='{:.10g}'.format, border=0)))
+    sections.append('<h2>Figures</h2>')
+    sections.append(make_html_legend(legend_patches, group_colors))
+    sections.append('<div class="figures">')
+    for figure_spec, figure_name, figure_note in zip(figure_specs, figure_names, figure_notes):
+        caption = html.escape(figure_name) + ('' if figure_note is None else ': ' + html.escape(figure_note))
+        sections.append(f'<figure>{make_figure_svg(figure_spec, max_points)}<figcaption>{caption}</figcaption></figure>')
+    sections.append('</div>')
+    return f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title><style>{html_report_style}</style></head><body>\n' + '\n'.join(sections) + '\n</body></html>\n'
+
+# write HTML report atomically, so failed run never leaves partial report
+def write_html_report(output_file, report_html):
+    def write_report(temporary_file):
+        with open(temporary_file, 'w', encoding='utf-8') as output:
+            output.write(report_html)
+    write_file_atomically(output_file, write_report, '.html')
@@ -0,0 +1,122 @@
+# long read sequencing cramino QC parser command line interface
+# convert cramino reports into single summary table per cohort
+import os
+import sys
+import argparse
+import tarfile
+from cardlongread_cramino.report import list_cramino_reports, make_cramino_report_data_frame, write_cramino_report_data_frame, get_output_format
+from cardlongread_cramino.archives import make_cramino_report_data_frame_from_archives, iter_cramino_archive_reports
+from cardlongread_cramino.histograms import sum_cramino_report_histograms, make_cramino_histogram_table
+from cardlongread_cramino.shards import parse_shard_spec, get_shard_files, write_cramino_report_shard, merge_cramino_report_shards
+# stage timing and memory profiling
+from cardlongread_cramino.profiler import StageProfiler
+
+# handle command line arguments
+def main(argv=None):
+    # user input
+    inparser = argparse.ArgumentParser(description = 'Extract data from long read cramino mapping QC reports into summary table')
+    inparser.add_argument('--bam_type', default=None, choices=['mapped_bam','unmapped_bam'], type=str, help = 'cramino report type (mapped BAM report includes identity values); required unless merging shards.')
+    inparser.add_argument('--cramino_dir', default=None, type=str, help = 'path to directory containing cramino files, if converting whole directory')
+    inparser.add_argument('--filelist', default=None, type=str, help = 'text file containing list of all cramino reports to parse')
+    inparser.add_argument('--archive', default=None, nargs='+', type=str, help = 'tar (optionally compressed) or zip archive(s) of cramino reports, read in one sequential pass without extracting (optional)')
+    inparser.add_argument('--input_format', default='text', choices=['text','json','arrow'], type=str, help = 'cramino report format: text (default cramino output), json (cramino --format json), or arrow (Arrow IPC/feather summary record per file); json and arrow fields are mapped by name (optional; default text)')
+    inparser.add_argument('--output', action="store", type=str, dest="output_file", help="Output long read cramino report summary table in tab-delimited format")
+    inparser.add_argument('--format', default=None, choices=['tsv','parquet','feather'], type=str, dest="output_format", help = 'output summary table format (optional; default based on --output extension, .parquet/.pq for parquet, .feather/.arrow for feather, otherwise tsv)')
+    inparser.add_argument('--workers', default=1, type=int, help = 'number of threads used to read cramino reports in parallel (optional; default 1)')
+    inparser.add_argument('--cache', default=None, type=str, help = 'SQLite cache file for incremental mode; only new or changed reports are parsed (optional)')
+    inparser.add_argument('--shard', default=None, type=str, help = 'parse only shard i of N (e.g., 2/8), a contiguous slice of the report list, and write shard summary table plus mergeable aggregates (<output>.shard.json) (optional)')
+    inparser.add_argument('--merge_shards', default=None, nargs='+', type=str, help = 'merge shard summary tables written with --shard into final summary table (--output) and summary statistics, without parsing reports again (optional)')
+    inparser.add_argument('--run_cutoff', default=1, type=float, help = 'minimum yield (Gb) of runs included in shard summary statistics, as in dashboard -run_cutoff; summary table keeps all runs (optional; default 1)')
+    inparser.add_argument('--summary_statistics', default=None, type=str, dest="summary_statistics_file", help = 'summary statistics output file when merging shards (optional; default <output without extension>_summary_statistics.tsv)')
+    inparser.add_argument('--histograms', default=None, type=str, dest="histogram_file", help = 'also sum read length and identity histograms of reports (cramino --hist sections) into fixed bins and write histogram table for dashboard -histograms; text reports only (optional)')
+    inparser.add_argument('--profile', nargs='?', const='', default=None, type=str, dest="profile_report", help = 'record wall time, CPU time and peak memory of each stage and write JSON report (optional; default report file <output>.profile.json)')
+    inparser.add_argument('--cprofile', default=None, type=str, dest="cprofile_file", help = 'write cProfile statistics of whole run to file (optional)')
+    args = inparser.parse_args(argv)
+    # set up profiling if requested
+    if args.profile_report == '':
+        args.profile_report = (args.output_file if args.output_file is not None else 'cramino_parser') + '.profile.json'
+    profiler = StageProfiler('CARDlongread_cramino_parser', args.profile_report, args.cprofile_file)
+    # merge shards written by earlier --shard runs
+    if args.merge_shards is not None:
+        if args.output_file is None:
+            quit('ERROR: Merged summary table file (--output) required when merging shards.')
+        if args.histogram_file is not None:
+            quit('ERROR: Histograms (--histograms) are summed from reports, not merged from shards.')
+        if args.summary_statistics_file is None:
+            args.summary_statistics_file = os.path.splitext(args.output_file)[0] + '_summary_statistics.tsv'
+        profiler.start_stage('merge shards')
+        try:
+            summary_statistics_df, uncertain_modes = merge_cramino_report_shards(args.merge_shards, args.output_file)
+        except (ValueError, OSError) as e:
+            quit(f'ERROR: Could not merge shards: {e}')
+        # note properties whose merged mode is not certain (left blank instead of arbitrary counter value)
+        if len(uncertain_modes) > 0:
+            print('NOTE: Mode left blank for ' + ', '.join(uncertain_modes) + '; more distinct values than mode counters and no value frequent enough to be certain of mode.', file=sys.stderr)
+        summary_statistics_df.to_csv(args.summary_statistics_file, sep='\t', index=False)
+        profiler.stop_stage()
+        return
+    # report type needed to parse reports
+    if args.bam_type is None:
+        quit('ERROR: Report type (--bam_type) required.')
+    # histograms only in text reports, and summed per run (not merged from shards)
+    if (args.histogram_file is not None) and (args.input_format != 'text'):
+        quit('ERROR: Histograms (--histograms) are only read from text reports (--input_format text).')
+    profiler.start_stage('list reports')
+    # check number of workers
+    if args.workers < 1:
+        quit('ERROR: Number of workers (--workers) must be at least 1.')
+    # read reports straight from archives (reports only listed while reading, so no cache or shards)
+    if args.archive is not None:
+        if (args.cache is not None) or (args.shard is not None):
+            quit('ERROR: Cache (--cache) and shard (--shard) modes need report files, not archives (--archive).')
+        profiler.start_stage('parse reports')
+        try:
+            cramino_report_df = make_cramino_report_data_frame_from_archives(args.archive, args.bam_type, args.input_format)
+        except (ValueError, OSError, EOFError, tarfile.TarError) as e:
+            quit(f'ERROR: Could not read archive: {e}')
+        profiler.start_stage('write summary table')
+        write_cramino_report_data_frame(cramino_report_df, args.output_file, args.output_format)
+        # sum histograms in second sequential pass over archives
+        if args.histogram_file is not None:
+            profiler.start_stage('sum histograms')
+            try:
+                histograms, _ = sum_cramino_report_histograms((contents.decode() for archive_path in args.archive for _, contents in iter_cramino_archive_reports(archive_path, args.input_format)), report_texts=True)
+            except (ValueError, OSError, EOFError, UnicodeDecodeError, tarfile.TarError) as e:
+                quit(f'ERROR: Could not read archive: {e}')
+            make_cramino_histogram_table(histograms).to_csv(args.histogram_file, sep='\t', index=False)
+        profiler.stop_stage()
+        return
+    # get list of files
+    if (args.cramino_dir is None) and (args.filelist is None):
+        quit('ERROR: No directory (--cramino_dir), file list (--filelist) or archive (--archive) provided!')
+    files = list_cramino_reports(args.cramino_dir, args.filelist, args.input_format)
+    # parse only slice of report list in shard mode
+    if args.shard is not None:
+        try:
+            shard_index, shard_count = parse_shard_spec(args.shard)
+        except ValueError as e:
+            quit(f'ERROR: {e}')
+        if args.output_file is None:
+            quit('ERROR: Shard summary table file (--output) required in shard mode.')
+        if get_output_format(args.output_file, args.output_format) != 'tsv':
+            quit('ERROR: Shard summary tables are tab-delimited; use tsv format in shard mode.')
+        number_of_files = len(files)
+        files = get_shard_files(files, shard_index, shard_count)
+    # create output data frame
+    profiler.start_stage('parse reports')
+    cramino_report_df = make_cramino_report_data_frame(files, args.bam_type, args.workers, args.cache, args.input_format)
+    # write output summary table
+    profiler.start_stage('write summary table')
+    if args.shard is not None:
+        write_cramino_report_shard(cramino_report_df, args.output_file, shard_index, shard_count, args.bam_type, number_of_files, args.run_cutoff)
+    else:
+        write_cramino_report_data_frame(cramino_report_df, args.output_file, args.output_format)
+    # sum histograms of reports (one report in memory at a time)
+    if args.histogram_file is not None:
+        profiler.start_stage('sum histograms')
+        histograms, _ = sum_cramino_report_histograms(files)
+        make_cramino_histogram_table(histograms).to_csv(args.histogram_file, sep='\t', index=False)
+    profiler.stop_stage()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,748 @@
+# long read sequencing cramino QC dashboard figures
+# violin/swarm plots and scatterplots rendered into PNG buffers, optionally in parallel and cached
+# matplotlib and seaborn are imported only when figures are rendered
+import os
+import time
+import inspect
+import hashlib
+import pandas as pd
+import numpy as np
+# for image saving
+from io import BytesIO
+# for parallel figure rendering
+from concurrent.futures import ProcessPoolExecutor
+from cardlongread_cramino.profiler import reset_peak_rss, get_stage_peak_rss_mb
+from cardlongread_cramino.report import restore_cramino_property_columns
+from cardlongread_cramino.summary import cramino_summary_statistics_property_names, make_regression_fits, get_t_quantile_95
+from cardlongread_cramino.trends import cramino_trend_periods
+from cardlongread_cramino.files import write_file_atomically
+
+# dashboard output profiles
+# figure resolution (violin/swarm plots, scatterplots and grid overview figures), figure size (inches; None for matplotlib default),
+# lossless PNG optimization, and palette quantization (256 colors) of rendered figures
+dashboard_output_profiles = {
+    'draft': {'violin_dpi': 100, 'scatter_dpi': 75, 'grid_dpi': 75, 'figsize': None, 'optimize_png': True, 'quantize_png': True},
+    'standard': {'violin_dpi': 200, 'scatter_dpi': 150, 'grid_dpi': 100, 'figsize': None, 'optimize_png': False, 'quantize_png': False},
+    'publication': {'violin_dpi': 300, 'scatter_dpi': 300, 'grid_dpi': 200, 'figsize': (8, 6), 'optimize_png': True, 'quantize_png': False},
+}
+
+# deterministic sample of plotted points with at most max_points per group
+# returns boolean row mask, or None if no group has more than max_points (or max_points not set)
+def get_point_sample_mask(data,group_variable,max_points):
+    if (max_points is None) or (max_points <= 0) or (len(data) == 0):
+        return None
+    if group_variable is None:
+        group_values = pd.Series(0, index=data.index)
+    else:
+        group_values = pd.Series(np.asarray(group_variable), index=data.index)
+    if group_values.value_counts().max() <= max_points:
+        return None
+    # rank rows within each group by random keys from fixed seed, so every run draws same points
+    random_ranks = pd.Series(np.random.default_rng(0).random(len(data)), index=data.index).groupby(group_values).rank(method='first')
+    return (random_ranks <= max_points).to_numpy()
+
+# render violinplot/swarmplot figure into PNG buffer
+def render_violinswarmplot(data,input_variable,group_variable,legend_patches,user_palette,strip_plot_set,x_axis_title=None,cutoff=None,title=None,max_points=None,dpi=200,figsize=None):
+    # plotting modules imported on first use (slow to import)
+    import matplotlib.pyplot as plt
+    # initialize raw data buffer for image
+    imgdata=BytesIO()
+    # initialize plot overall
+    fig, ax = plt.subplots(figsize=figsize)
+    draw_violinswarmplot(ax,data,input_variable,group_variable,legend_patches,user_palette,strip_plot_set,x_axis_title,cutoff,title,max_points)
+    # put figure in variable to prep for saving into buffer
+    # fig = swarmplot.get_figure()
+    # save figure as PNG into buffer (200 dpi by default)
+    # tight layout to prevent titles from being cut off
+    fig.savefig(imgdata, format='png', dpi=dpi, bbox_inches='tight')
+    # close figure
+    fig.clf()
+    # close figure with matplotlib plt close
+    plt.close()
+    # return PNG buffer
+    return imgdata
+
+# draw violinplot/swarmplot into axes (single figure or grid panel)
+def draw_violinswarmplot(ax,data,input_variable,group_variable,legend_patches,user_palette,strip_plot_set,x_axis_title=None,cutoff=None,title=None,max_points=None):
+    import seaborn as sb
+    # compact (float32) plotted property restored to exact values, so figures do not depend on storage type
+    data = restore_cramino_property_columns(data,[input_variable])
+    # large cohort mode
+    # swarm layout cost grows quadratically with points per group, so above max_points per group
+    # overlay deterministic sample of points as strip plot (violins still drawn from all data)
+    point_data = data
+    point_group_variable = group_variable
+    category_order = None
+    point_sample_mask = get_point_sample_mask(data,group_variable,max_points)
+    if point_sample_mask is not None:
+        point_data = data[point_sample_mask]
+        strip_plot_set = True
+        if group_variable is not None:
+            point_group_variable = pd.Series(np.asarray(group_variable), index=data.index)[point_sample_mask]
+            # keep same category order for sampled points and violins
+            category_order = list(pd.unique(np.asarray(group_variable)))
+    # set up plots differently depending on whether group variable is set
+    if (group_variable is None):
+        # make swarm plot to show how data points overlap with distribution
+        # replace color='black'
+        if strip_plot_set is False:
+            ax = sb.swarmplot(data=point_data,x=input_variable,color='black',ax=ax)
+        elif strip_plot_set is True:
+            ax = sb.stripplot(data=point_data,x=input_variable,color='black',ax=ax)
+        # add violin plot using seaborn (sb.violinplot)
+        # increase transparency to improve swarmplot visibility
+        # use boxplot since only one "group" shown
+        ax = sb.violinplot(data=data,x=input_variable,color='white',ax=ax)
+    else:
+        # make swarm plot to show how data points overlap with distribution
+        # input variable on y axis and group on x axis
+        # thus vertical swarm/violinplots instead of horizontal ones when no group specified
+        # replace color='black' with hue set to group variable
+        if strip_plot_set is False:
+            # allow user set palette
+            if user_palette is None:
+                ax = sb.swarmplot(data=data,x=group_variable,y=input_variable,hue=group_variable,legend=False,ax=ax)
+            else:
+                ax = sb.swarmplot(data=data,x=group_variable,y=input_variable,hue=group_variable,palette=user_palette,legend=False,ax=ax)
+        elif strip_plot_set is True:
+            # allow user set palette
+            if user_palette is None:
+                ax = sb.stripplot(data=point_data,x=point_group_variable,y=input_variable,hue=point_group_variable,order=category_order,hue_order=category_order,legend=False,ax=ax)
+            else:
+                ax = sb.stripplot(data=point_data,x=point_group_variable,y=input_variable,hue=point_group_variable,order=category_order,hue_order=category_order,palette=user_palette,legend=False,ax=ax)
+        # add violin plot using seaborn (sb.violinplot)
+        # increase transparency to improve swarmplot visibility
+        # include quartile lines in this context (for easily, visually comparing between groups)
+        ax = sb.violinplot(data=data,x=group_variable,y=input_variable,color='white',inner="quartile",order=category_order,ax=ax)
+    # vertical one-line group labels if many groups (e.g., pages of groups), so that labels do not overlap
+    if (group_variable is not None) and (len(ax.get_xticks()) > 10):
+        ax.set_xticks(ax.get_xticks(),[x.get_text().replace('\n',' ') for x in ax.get_xticklabels()],rotation=90)
+    # add x axis title if specified 
+    if x_axis_title is not None:
+        ax.set(xlabel=x_axis_title)
+    # add title if specified
+    if title is not None:
+        ax.set_title(title)
+    # add red line for 90GB/30X cutoff or whatever necessary for specific plots
+    # cutoff line defined by x value
+    if cutoff is not None:
+        # vertical line if non-grouped
+        if (group_variable is None):
+            ax.axvline(x=cutoff,color='red')
+        # horizontal line if grouped (group variable on x-axis)
+        else:
+            ax.axhline(y=cutoff,color='red')
+    # add legend with colors if requested
+    if legend_patches is not None:
+        ax.legend(handles=legend_patches)
+
+def render_scatterplot(data,group_variable,legend_patches,user_palette,strip_plot_set,title=None,x_cutoffs=None,x_cutoff_colors=None,y_cutoffs=None,y_cutoff_colors=None,show_run_colors=True,show_reg_line=False,x_variable=None,y_variable=None,prop_point_size=False,size_column=None,has_date_time=False,dpi=150,figsize=None,reg_line_fits=None,trend_line_column=None):
+    # plotting modules imported on first use (slow to import)
+    import matplotlib.pyplot as plt
+    # initialize raw data buffer for image
+    imgdata=BytesIO()
+    # initialize plot overall
+    fig, ax = plt.subplots(figsize=figsize)
+    draw_scatterplot(ax,data,group_variable,legend_patches,user_palette,strip_plot_set,title,x_cutoffs,x_cutoff_colors,y_cutoffs,y_cutoff_colors,show_run_colors,show_reg_line,x_variable,y_variable,prop_point_size,size_column,has_date_time,reg_line_fits,trend_line_column)
+    # put figure in variable to prep for saving into buffer
+    # fig = swarmplot.get_figure()
+    # save figure as PNG into buffer (150 dpi by default)
+    fig.savefig(imgdata, format='png', dpi=dpi, bbox_inches='tight')
+    # close figure
+    fig.clf()
+    # close figure with matplotlib plt close
+    plt.close()
+    # return PNG buffer
+    return imgdata
+
+# draw scatterplot into axes (single figure or grid panel)
+def draw_scatterplot(ax,data,group_variable,legend_patches,user_palette,strip_plot_set,title=None,x_cutoffs=None,x_cutoff_colors=None,y_cutoffs=None,y_cutoff_colors=None,show_run_colors=True,show_reg_line=False,x_variable=None,y_variable=None,prop_point_size=False,size_column=None,has_date_time=False,reg_line_fits=None,trend_line_column=None):
+    import seaborn as sb
+    # compact (float32) plotted properties restored to exact values, so figures do not depend on storage type
+    data = restore_cramino_property_columns(data,[x_variable,y_variable,size_column])
+    # make scatterplot of active pores vs. per flow cell data output
+    # include regression by using sb.regplot() function if show_reg_line=True
+    # had to remove regression to use hue keyword
+    # color points by topup/not topup run if show_run_colors is True
+    if show_run_colors is True and prop_point_size is False:
+        # show top up colors if no group variable included
+        if group_variable is None:
+            # rearranged_color_palette = [sb.color_palette()[0],'firebrick',sb.color_palette()[1],sb.color_palette()[4],sb.color_palette()[5]]
+            # ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue="Run type",hue_order=['Standard run','Interrupted','Top up','Reconnection','Recovery'],palette=rearranged_color_palette)
+            ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,ax=ax)
+        # override top up colors if group variable included
+        else:
+            # default palette if no palette specified
+            if user_palette is None:
+                ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue=group_variable,ax=ax)
+            # otherwise use user specified palette
+            else:
+                ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue=group_variable,palette=user_palette,ax=ax)
+    # add point size if specified (prop_point_size is True)
+    # note use of data[size_column] as point size
+    elif show_run_colors is True and prop_point_size is True:
+        # ignore top up run colors for cramino dashboard
+        # show top up colors if no group variable included
+        if group_variable is None:
+            # rearranged_color_palette = [sb.color_palette()[0],'firebrick',sb.color_palette()[1],sb.color_palette()[4],sb.color_palette()[5]]
+            # ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue="Run type",hue_order=['Standard run','Interrupted','Top up','Reconnection','Recovery'],palette=rearranged_color_palette,size=data[size_column])
+            ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,size=data[size_column],ax=ax)
+        # override top up colors if no group variable included
+        else:
+            # default palette if no palette specified
+            if user_palette is None:
+                ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue=group_variable,size=data[size_column],ax=ax)
+            # otherwise use user specified palette
+            else:
+                ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,hue=group_variable,palette=user_palette,size=data[size_column],ax=ax)
+    elif show_run_colors is False and prop_point_size is False:
+        ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,ax=ax)
+    # add point size if specified (prop_point_size is True)
+    elif show_run_colors is False and prop_point_size is True:
+        ax = sb.scatterplot(data=data,x=x_variable,y=y_variable,size=data[size_column],ax=ax)
+    # show regression line if specified (show_reg_line is True)
+    if show_reg_line is True and prop_point_size is False:
+        ax = sb.regplot(data=data,x=x_variable,y=y_variable,ax=ax)
+    # add point size if specified (prop_point_size is True)
+    elif show_reg_line is True and prop_point_size is True:
+        ax = sb.regplot(data=data,x=x_variable,y=y_variable,size=data[size_column],ax=ax)
+    # draw precomputed least squares fits (see make_regression_fits) instead if provided
+    if reg_line_fits is not None:
+        draw_regression_fits(ax,reg_line_fits,get_group_colors(data,group_variable,user_palette))
+    # draw precomputed trend line (e.g., rolling mean per period, see make_trend_aggregates) for each group if provided
+    if trend_line_column is not None:
+        draw_trend_lines(ax,data,x_variable,trend_line_column,group_variable,get_group_colors(data,group_variable,user_palette))
+    # add title if specified
+    if title is not None:
+        ax.set_title(title)
+    # set minimum y and x to zero
+    # ax.set_xlim(left=0)
+    # ax.set_ylim(bottom=0)
+    if x_cutoffs is not None:
+        for idx, i in enumerate(x_cutoffs):
+            # add vertical x cutoffs sequentially
+            ax.axvline(x=i,color=x_cutoff_colors[idx])
+    if y_cutoffs is not None:
+        for idx, i in enumerate(y_cutoffs):
+            # add horizontal y cutoffs sequentially
+            ax.axhline(y=i,color=y_cutoff_colors[idx])
+    # add legend with colors if requested
+    if legend_patches is not None:
+        ax.legend(handles=legend_patches)
+    # handling datetime based x axis
+    if has_date_time is True:
+        # small margin so points at first and last date are not cut off (one day if single date)
+        x_min=data[x_variable].min()
+        x_max=data[x_variable].max()
+        x_margin=(x_max-x_min)*0.03 if x_max > x_min else pd.Timedelta(days=1)
+        ax.set_xlim(x_min-x_margin,x_max+x_margin)
+        ax.tick_params(axis='x', rotation=45)
+
+# set up grid figure with panels in rows of given number of columns (unused panels hidden)
+# returns figure and list of panel axes
+def make_figure_grid(number_of_panels,columns=4,panel_size=None):
+    import matplotlib.pyplot as plt
+    # matplotlib default figure size per panel unless set
+    if panel_size is None:
+        panel_size=tuple(plt.rcParams['figure.figsize'])
+    columns=max(1,min(columns,number_of_panels))
+    rows=-(-number_of_panels // columns)
+    fig, axes = plt.subplots(rows, columns, figsize=(panel_size[0]*columns, panel_size[1]*rows), squeeze=False)
+    axes=list(axes.ravel())
+    for ax in axes[number_of_panels:]:
+        ax.set_visible(False)
+    return fig, axes[:number_of_panels]
+
+# save grid figure into PNG buffer in single layout pass and encode (title above grid if set)
+# tight layout of whole grid instead of tight bounding box (which draws figure once more)
+def save_figure_grid(fig,title=None,dpi=200):
+    import matplotlib.pyplot as plt
+    imgdata=BytesIO()
+    if title is not None:
+        fig.suptitle(title)
+    fig.tight_layout()
+    fig.savefig(imgdata, format='png', dpi=dpi)
+    fig.clf()
+    plt.close(fig)
+    return imgdata
+
+# render violinplot/swarmplot panels of several properties into one grid figure (see render_violinswarmplot)
+# legend (if requested) shown in first panel only
+def render_violinswarmplot_grid(data,input_variables,group_variable,legend_patches,user_palette,strip_plot_set,cutoffs=None,title=None,max_points=None,columns=4,dpi=200,panel_size=None):
+    fig, axes = make_figure_grid(len(input_variables),columns,panel_size)
+    for idx, (ax, input_variable) in enumerate(zip(axes, input_variables)):
+        # swarm layout draws whole figure, so only current panel visible while drawing (otherwise cost grows with panels)
+        for other_ax in axes:
+            other_ax.set_visible(other_ax is ax)
+        draw_violinswarmplot(ax,data,input_variable,group_variable,legend_patches if idx == 0 else None,user_palette,strip_plot_set,None,None if cutoffs is None else cutoffs[idx],None,max_points)
+    for ax in axes:
+        ax.set_visible(True)
+    return save_figure_grid(fig,title,dpi)
+
+# render scatterplot panels into one grid figure (see render_scatterplot)
+# panels are keyword arguments of draw_scatterplot for each panel (e.g., x and y variables, cutoffs, regression fits)
+def render_scatterplot_grid(data,group_variable,legend_patches,user_palette,strip_plot_set,panels,title=None,columns=4,dpi=150,panel_size=None):
+    fig, axes = make_figure_grid(len(panels),columns,panel_size)
+    for idx, (ax, panel) in enumerate(zip(axes, panels)):
+        draw_scatterplot(ax,data,group_variable,legend_patches if idx == 0 else None,user_palette,strip_plot_set,**panel)
+    return save_figure_grid(fig,title,dpi)
+
+# get plot color of each group as assigned by seaborn hue (groups in order of appearance, or categories if categorical)
+# first default color if no group variable
+def get_group_colors(data,group_variable,user_palette=None):
+    import seaborn as sb
+    if group_variable is None:
+        return {'All samples': sb.color_palette()[0]}
+    if isinstance(data[group_variable].dtype, pd.CategoricalDtype):
+        group_names = list(data[group_variable].cat.categories)
+    else:
+        group_names = list(pd.unique(data[group_variable].dropna()))
+    if user_palette is not None:
+        group_palette = [user_palette[idx % len(user_palette)] for idx in range(len(group_names))]
+    # seaborn uses current palette if it has enough colors, otherwise evenly spaced husl colors
+    elif len(group_names) <= len(sb.color_palette()):
+        group_palette = sb.color_palette(n_colors=len(group_names))
+    else:
+        group_palette = sb.color_palette('husl', len(group_names))
+    return dict(zip(group_names, group_palette))
+
+# draw least squares fit lines with analytic 95% confidence bands for mean response
+# band half width is t(n-2) * residual standard error * sqrt(1/n + (x - x mean)^2 / x sum of squares)
+def draw_regression_fits(ax,reg_line_fits,group_colors):
+    for fit in reg_line_fits.to_dict('records'):
+        # skip groups without a defined slope (fewer than two distinct x values)
+        if not np.isfinite(fit['Slope']):
+            continue
+        color = group_colors.get(fit['Group'], 'black')
+        x_grid = np.linspace(fit['X min'], fit['X max'], 100)
+        y_fit = fit['Intercept'] + fit['Slope'] * x_grid
+        ax.plot(x_grid, y_fit, color=color, linewidth=1.5)
+        # confidence band needs at least three samples
+        if fit['n'] > 2:
+            band_half_width = get_t_quantile_95(fit['n'] - 2) * fit['Residual standard error'] * np.sqrt(1/fit['n'] + (x_grid - fit['X mean'])**2 / fit['X sum of squares'])
+            ax.fill_between(x_grid, y_fit - band_half_width, y_fit + band_half_width, color=color, alpha=0.15, linewidth=0)
+
+# draw line through precomputed values of each group in x order (group colors as in scatterplot)
+def draw_trend_lines(ax,data,x_variable,y_variable,group_variable,group_colors):
+    if group_variable is None:
+        group_lines = [('All samples', data)]
+    else:
+        group_lines = [(name, data[data[group_variable] == name]) for name in group_colors]
+    for name, group_data in group_lines:
+        group_data = group_data.sort_values(x_variable)
+        if len(group_data) > 0:
+            ax.plot(group_data[x_variable], group_data[y_variable], color=group_colors[name], linewidth=1.5)
+
+# make legend patches from legend colors and labels (same length)
+def make_legend_patches(legend_colors, legend_labels):
+    import matplotlib.patches as mpatches
+    return [mpatches.Patch(color=i, label=legend_labels[idx]) for idx, i in enumerate(legend_colors)]
+
+# figure rendering worker setup
+# headless backend in each worker process
+def initialize_render_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+# compress rendered PNG (optionally reducing to 256 color palette), keeping stored resolution
+def compress_png(png, quantize=False):
+    # pillow is installed with matplotlib
+    from PIL import Image
+    img = Image.open(BytesIO(png))
+    png_dpi = img.info.get('dpi')
+    if quantize is True:
+        img = img.convert('RGB').quantize(colors=256)
+    compressed = BytesIO()
+    if png_dpi is not None:
+        img.save(compressed, format='png', optimize=True, dpi=png_dpi)
+    else:
+        img.save(compressed, format='png', optimize=True)
+    return compressed.getvalue()
+
+# render single figure from specification (rendering function, positional and keyword arguments)
+# returns PNG bytes so that results can be passed back from worker processes
+def render_figure(figure_spec,output_profile=None):
+    render_function, render_args, render_kwargs = figure_spec
+    png = render_function(*render_args, **render_kwargs).getvalue()
+    if (output_profile is not None) and (output_profile['optimize_png'] is True):
+        png = compress_png(png, output_profile['quantize_png'])
+    return png
+
+# render single figure and measure wall time, CPU time and peak memory of rendering process during figure
+# (process peak reset before figure; peak None if reset not supported, see reset_peak_rss)
+def render_figure_profiled(figure_spec,output_profile=None):
+    peak_rss_supported = reset_peak_rss()
+    start_wall_time = time.perf_counter()
+    start_cpu_time = time.process_time()
+    png = render_figure(figure_spec,output_profile)
+    return (png, time.perf_counter() - start_wall_time, time.process_time() - start_cpu_time, get_stage_peak_rss_mb() if peak_rss_supported is True else None)
+
+# add figure argument to figure cache key hash
+# data frames are hashed by content, so same input data gives same key in every run
+def hash_figure_argument(hasher,value):
+    import matplotlib.patches as mpatches
+    hasher.update(type(value).__name__.encode())
+    if isinstance(value, pd.DataFrame):
+        hasher.update(repr(list(value.columns)).encode())
+        # column types (e.g., category order) as well as values
+        hasher.update(repr(list(value.dtypes)).encode())
+        hasher.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        hasher.update(repr((value.name, value.dtype)).encode())
+        hasher.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        hasher.update(str(len(value)).encode())
+        for x in value:
+            hash_figure_argument(hasher, x)
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            hash_figure_argument(hasher, key)
+            hash_figure_argument(hasher, value[key])
+    elif callable(value):
+        hasher.update(value.__name__.encode())
+    elif isinstance(value, mpatches.Patch):
+        hasher.update(repr((value.get_label(), value.get_facecolor())).encode())
+    else:
+        hasher.update(repr(value).encode())
+    hasher.update(b'|')
+
+# collect text values of figure arguments (column names passed to rendering function, also inside lists and panels)
+def collect_figure_argument_strings(value,strings):
+    if isinstance(value, str):
+        strings.add(value)
+    elif isinstance(value, (list, tuple)):
+        for x in value:
+            collect_figure_argument_strings(x, strings)
+    elif isinstance(value, dict):
+        for x in value.values():
+            collect_figure_argument_strings(x, strings)
+
+# get figure arguments for cache key
+# plotted data frame (data argument) limited to columns named in other arguments (e.g., x, y, size and group columns),
+# so figure keeps its key when only columns it does not plot change (e.g., filenames, paths or other properties)
+def get_figure_key_arguments(figure_spec):
+    render_function, render_args, render_kwargs = figure_spec
+    arguments = dict(inspect.signature(render_function).bind(*render_args, **render_kwargs).arguments)
+    if isinstance(arguments.get('data'), pd.DataFrame):
+        referenced_names = set()
+        collect_figure_argument_strings([x for name, x in arguments.items() if name != 'data'], referenced_names)
+        arguments['data'] = arguments['data'][[x for x in arguments['data'].columns if x in referenced_names]]
+    return arguments
+
+# get figure cache key (SHA-256 hex digest) from rendering function, arguments, output profile and plotting module versions
+def get_figure_cache_key(figure_spec,output_profile=None):
+    import matplotlib
+    import seaborn as sb
+    hasher = hashlib.sha256()
+    hash_figure_argument(hasher, [figure_spec[0].__name__, get_figure_key_arguments(figure_spec), output_profile, sb.__version__, matplotlib.__version__])
+    return hasher.hexdigest()
+
+# remove cached figures not used by current run (figure cache holds figures of one dashboard), so cache does not grow
+# without bound as data changes; temporary files of runs in progress are left alone
+def prune_figure_cache(figure_cache,used_cache_files):
+    used_names = {os.path.basename(x) for x in used_cache_files}
+    for name in os.listdir(figure_cache):
+        if name.endswith('.png') and (len(name) == 68) and (name not in used_names):
+            try:
+                os.remove(os.path.join(figure_cache, name))
+            except FileNotFoundError:
+                continue
+
+# render all figures in order, in parallel if more than one process requested
+# figures found in figure cache directory (if set) are reused instead of rendered again, and cached figures not used
+# by this run are removed afterwards
+# each rendered figure recorded by profiler (if set) under its figure name
+# returns list of PNG buffers in same order as figure specifications
+def render_figures(figure_specs,processes=1,output_profile=None,figure_cache=None,profiler=None,figure_names=None):
+    figure_images = [None] * len(figure_specs)
+    # look up cached figures
+    if figure_cache is not None:
+        os.makedirs(figure_cache, exist_ok=True)
+        figure_cache_files = [os.path.join(figure_cache, get_figure_cache_key(x, output_profile) + '.png') for x in figure_specs]
+        for idx, cache_file in enumerate(figure_cache_files):
+            if os.path.exists(cache_file):
+                with open(cache_file, 'rb') as infile:
+                    figure_images[idx] = infile.read()
+    # render remaining figures
+    render_indices = [idx for idx, x in enumerate(figure_images) if x is None]
+    render_specs = [figure_specs[idx] for idx in render_indices]
+    if (profiler is not None) and (profiler.enabled is True):
+        figure_render_function = render_figure_profiled
+    else:
+        figure_render_function = render_figure
+    rendered_in_process = not ((processes > 1) and (len(render_specs) > 1))
+    if rendered_in_process is False:
+        with ProcessPoolExecutor(max_workers=processes, initializer=initialize_render_worker) as executor:
+            rendered_images = list(executor.map(figure_render_function, render_specs, [output_profile] * len(render_specs)))
+    else:
+        rendered_images = [figure_render_function(x, output_profile) for x in render_specs]
+    # record per-figure timings and peak memory (of worker process, or of this process if rendered here)
+    if figure_render_function is render_figure_profiled:
+        for idx, (png, wall_time, cpu_time, peak_rss_mb) in zip(render_indices, rendered_images):
+            figure_name = figure_names[idx] if figure_names is not None else 'Figure ' + str(idx + 1)
+            profiler.add_record(figure_name, wall_time, cpu_time, peak_rss_mb, 'render figures', rendered_in_process)
+        rendered_images = [x[0] for x in rendered_images]
+    for idx, png in zip(render_indices, rendered_images):
+        figure_images[idx] = png
+        # store newly rendered figure in cache (written atomically, so concurrent runs never read partial files)
+        if figure_cache is not None:
+            write_file_atomically(figure_cache_files[idx], lambda temporary_file: write_figure_cache_file(temporary_file, png), '.tmp')
+    if figure_cache is not None:
+        prune_figure_cache(figure_cache, figure_cache_files)
+    return [BytesIO(x) for x in figure_images]
+
+# write rendered figure (PNG bytes) to figure cache file
+def write_figure_cache_file(output_file, png):
+    with open(output_file, 'wb') as outfile:
+        outfile.write(png)
+
+# sequential violin/swarm plots for each property
+# plots that don't need cutoff included below to maintain order of spreadsheets (and order of figures)
+cramino_plot_worksheet_names = ['Number of alignments plot','Percent of total reads plot','Yield plot','Mean coverage plot','Yield over 25 kb plot','N50 plot','N50 (kb) plot','N75 plot','Median length plot','Mean length plot','Median identity plot','Mean identity plot','Median identity Q score plot','Mean identity Q score plot']
+# cutoff lines in violin plots (same order as properties)
+cramino_plot_cutoffs = [None,None,90,30,90,None,None,None,None,None,None,None,None,None]
+# add scatterplots to match what Melissa suggested in RUSH cohort analysis
+# median/mean identity and identity Q score vs. yield (Gb), read N50 (kb), and percent of total reads
+# (worksheet name, y variable, x variable)
+cramino_scatterplots = [("Yield (Gb) vs. med. idy",'Median identity','Yield (Gb)'),
+                        ("N50 (kb) vs. med. idy",'Median identity','N50 (kb)'),
+                        ("Pct. total vs. med. idy",'Median identity','Percent of total reads'),
+                        ("Yield (Gb) vs. med. Q score",'Median identity Q score','Yield (Gb)'),
+                        ("N50 (kb) vs. med. Q score",'Median identity Q score','N50 (kb)'),
+                        ("Pct. total vs. med. Q score",'Median identity Q score','Percent of total reads'),
+                        ("Yield (Gb) vs. avg. idy",'Mean identity','Yield (Gb)'),
+                        ("N50 (kb) vs. avg. idy",'Mean identity','N50 (kb)'),
+                        ("Pct. total vs. avg. idy",'Mean identity','Percent of total reads'),
+                        ("Yield (Gb) vs. avg. Q score",'Mean identity Q score','Yield (Gb)'),
+                        ("N50 (kb) vs. avg. Q score",'Mean identity Q score','N50 (kb)'),
+                        ("Pct. total vs. avg. Q score",'Mean identity Q score','Percent of total reads')]
+
+# split samples into pages of at most groups_per_page groups (in group order) for plots of many groups
+# rows are sorted into pages in one pass instead of masking data once per group; group categories not on page dropped
+# returns list of page data, page color palette (slice of user palette) and page note
+# (single page with all data if not grouped, groups_per_page not set, or all groups fit on one page)
+def get_group_pages(cramino_extract,group_variable=None,colors=None,groups_per_page=None):
+    if (group_variable is None) or (groups_per_page is None):
+        return [(cramino_extract,colors,None)]
+    if isinstance(cramino_extract[group_variable].dtype, pd.CategoricalDtype):
+        group_names=list(cramino_extract[group_variable].cat.categories)
+    else:
+        group_names=list(pd.unique(cramino_extract[group_variable].dropna()))
+    if len(group_names) <= groups_per_page:
+        return [(cramino_extract,colors,None)]
+    page_numbers=pd.Categorical(np.asarray(cramino_extract[group_variable]),categories=group_names).codes // groups_per_page
+    number_of_pages=(len(group_names) + groups_per_page - 1) // groups_per_page
+    page_order=np.argsort(page_numbers,kind='stable')
+    page_ends=np.cumsum(np.bincount(page_numbers[page_numbers >= 0],minlength=number_of_pages))
+    # rows without group (negative page number) sorted first and left out
+    page_offset=np.count_nonzero(page_numbers < 0)
+    group_pages=[]
+    for page in range(number_of_pages):
+        page_data=cramino_extract.iloc[page_order[page_offset + (page_ends[page - 1] if page > 0 else 0):page_offset + page_ends[page]]].reset_index(drop=True)
+        for column_name in ['Group','Group and count']:
+            if (column_name in page_data.columns) and isinstance(page_data[column_name].dtype, pd.CategoricalDtype):
+                page_data[column_name]=page_data[column_name].cat.remove_unused_categories()
+        first_group=page * groups_per_page
+        last_group=min(first_group + groups_per_page, len(group_names))
+        page_colors=None if colors is None else colors[first_group:last_group]
+        page_note='Groups ' + str(first_group + 1) + '-' + str(last_group) + ' of ' + str(len(group_names)) + ' (page ' + str(page + 1) + ' of ' + str(number_of_pages) + ').'
+        group_pages.append((page_data,page_colors,page_note))
+    return group_pages
+
+# join worksheet notes (None if no notes)
+def join_figure_notes(*notes):
+    notes=[x for x in notes if x is not None]
+    return ' '.join(notes) if len(notes) > 0 else None
+
+# list dashboard figures to render as (rendering function, arguments, keyword arguments) in worksheet order
+# if groups_per_page set, violin plots and scatterplots of many groups are split into pages of groups
+# (separate figures with same worksheet name, stacked on worksheet)
+# returns figure specifications, worksheet names and worksheet notes
+def make_dashboard_figure_specs(cramino_extract,group_variable=None,legend_patches=None,colors=None,strip_plot=False,plot_title=None,plot_cutoff=True,max_swarm_points=1000,output_profile='standard',reg_line=False,sample_note=None,groups_per_page=None):
+    # cutoff lines only if plot_cutoff set
+    if plot_cutoff is True:
+        cramino_plot_cutoff_array=cramino_plot_cutoffs
+    else:
+        cramino_plot_cutoff_array=[None] * len(cramino_summary_statistics_property_names)
+    # figure resolution and size from output profile
+    output_profile_settings=dashboard_output_profiles[output_profile]
+    figure_specs=[]
+    figure_worksheet_names=[]
+    figure_notes=[]
+    # note violin plot worksheets if overlaid points downsampled for large cohorts (same for every property)
+    if group_variable is None:
+        violin_group_variable=None
+    else:
+        violin_group_variable=cramino_extract[group_variable]
+    if get_point_sample_mask(cramino_extract,violin_group_variable,max_swarm_points) is not None:
+        violin_note='Large cohort mode: overlaid points downsampled to ' + str(max_swarm_points) + ' per group and shown as strip plot; violins drawn from all ' + str(len(cramino_extract)) + ' samples.'
+    else:
+        violin_note=None
+    # note on every figure if plotted samples are themselves a sample (streaming mode)
+    if sample_note is not None:
+        violin_note=sample_note if violin_note is None else sample_note + ' ' + violin_note.replace('all ', '', 1)
+    group_pages=get_group_pages(cramino_extract,group_variable,colors,groups_per_page)
+    for idx, i in enumerate(cramino_summary_statistics_property_names):
+        for page_data, page_colors, page_note in group_pages:
+            page_group_variable=None if group_variable is None else page_data[group_variable]
+            figure_specs.append((render_violinswarmplot,(page_data,i,page_group_variable,legend_patches,page_colors,strip_plot,None,cramino_plot_cutoff_array[idx],plot_title,max_swarm_points),dict(dpi=output_profile_settings['violin_dpi'],figsize=output_profile_settings['figsize'])))
+            figure_worksheet_names.append(cramino_plot_worksheet_names[idx])
+            figure_notes.append(join_figure_notes(page_note,violin_note))
+    for worksheet_name, y_variable, x_variable in cramino_scatterplots:
+        # gray 90 Gb cutoff line in yield scatterplots if plot_cutoff set
+        if (plot_cutoff is True) and (x_variable == 'Yield (Gb)'):
+            x_cutoffs=[90]
+            x_cutoff_colors=['gray']
+        else:
+            x_cutoffs=None
+            x_cutoff_colors=None
+        scatterplot_kwargs=dict(title=plot_title,x_cutoffs=x_cutoffs,x_cutoff_colors=x_cutoff_colors,y_cutoffs=None,y_cutoff_colors=None,show_run_colors=True,show_reg_line=False,y_variable=y_variable,x_variable=x_variable,prop_point_size=False,size_column=None,dpi=output_profile_settings['scatter_dpi'],figsize=output_profile_settings['figsize'])
+        for page_data, page_colors, page_note in group_pages:
+            page_kwargs=dict(scatterplot_kwargs)
+            # analytic least squares fit per group if reg_line set
+            if reg_line is True:
+                page_kwargs['reg_line_fits']=make_regression_fits(page_data,x_variable,y_variable,group_variable)
+            figure_specs.append((render_scatterplot,(page_data,group_variable,legend_patches,page_colors,strip_plot),page_kwargs))
+            figure_worksheet_names.append(worksheet_name)
+            figure_notes.append(join_figure_notes(page_note,sample_note))
+    return figure_specs, figure_worksheet_names, figure_notes
+
+# grid overview worksheet names (violin plots and scatterplots)
+cramino_grid_worksheet_names = ['Violin plots','Scatterplots']
+
+# combine violin plot and scatterplot figure specifications (see make_dashboard_figure_specs) into one grid figure each
+# panels drawn with same arguments as separate figures; figure title shown once above grid
+# pages of groups (figures of different data, see get_group_pages) drawn as one grid figure per page
+# returns figure specifications, worksheet names and worksheet notes (note of first figure of each kind and page)
+def make_grid_figure_specs(figure_specs,figure_notes,output_profile='standard',columns=4):
+    output_profile_settings=dashboard_output_profiles[output_profile]
+    # panels of each page keyed by page data, in page order
+    violin_pages={}
+    scatter_pages={}
+    for (render_function, render_args, render_kwargs), figure_note in zip(figure_specs,figure_notes):
+        arguments=inspect.signature(render_function).bind(*render_args,**render_kwargs)
+        arguments.apply_defaults()
+        arguments=dict(arguments.arguments)
+        for name in ['dpi','figsize']:
+            del arguments[name]
+        if render_function is render_violinswarmplot:
+            violin_pages.setdefault(id(arguments['data']),[]).append((arguments,figure_note))
+        elif render_function is render_scatterplot:
+            scatter_pages.setdefault(id(arguments['data']),[]).append((arguments,figure_note))
+    grid_figure_specs=[]
+    grid_worksheet_names=[]
+    grid_notes=[]
+    for violin_panels in violin_pages.values():
+        arguments=violin_panels[0][0]
+        grid_figure_specs.append((render_violinswarmplot_grid,(arguments['data'],[x['input_variable'] for x, y in violin_panels],arguments['group_variable'],arguments['legend_patches'],arguments['user_palette'],arguments['strip_plot_set'],[x['cutoff'] for x, y in violin_panels],arguments['title'],arguments['max_points']),dict(columns=columns,dpi=output_profile_settings['grid_dpi'],panel_size=output_profile_settings['figsize'])))
+        grid_worksheet_names.append(cramino_grid_worksheet_names[0])
+        grid_notes.append(violin_panels[0][1])
+    for scatter_panels in scatter_pages.values():
+        arguments=scatter_panels[0][0]
+        shared_names=['data','group_variable','legend_patches','user_palette','strip_plot_set','title']
+        panels=[{name: value for name, value in x.items() if name not in shared_names} for x, y in scatter_panels]
+        grid_figure_specs.append((render_scatterplot_grid,(arguments['data'],arguments['group_variable'],arguments['legend_patches'],arguments['user_palette'],arguments['strip_plot_set'],panels),dict(title=arguments['title'],columns=columns,dpi=output_profile_settings['grid_dpi'],panel_size=output_profile_settings['figsize'])))
+        grid_worksheet_names.append(cramino_grid_worksheet_names[1])
+        grid_notes.append(scatter_panels[0][1])
+    return grid_figure_specs, grid_worksheet_names, grid_notes
+
+# trend plots (worksheet name prefix, property)
+cramino_trend_plots = [('Yield','Yield (Gb)'),
+                       ('N50 (kb)','N50 (kb)'),
+                       ('Med. Q score','Median identity Q score')]
+
+# list trend figures for precomputed period aggregates (see make_trend_aggregates), keyed by period
+# points are period medians sized by number of runs, lines are rolling means
+# returns figure specifications, worksheet names and worksheet notes
+def make_trend_figure_specs(trend_tables,group_variable=None,legend_patches=None,colors=None,strip_plot=False,plot_title=None,output_profile='standard',sample_note=None):
+    output_profile_settings=dashboard_output_profiles[output_profile]
+    figure_specs=[]
+    figure_worksheet_names=[]
+    figure_notes=[]
+    for period, trend_table in trend_tables.items():
+        period_settings=cramino_trend_periods[period]
+        trend_note=period_settings['label'] + ' median of runs by report creation time (point size: runs); line: ' + str(period_settings['rolling_window']) + ' period rolling mean.'
+        if sample_note is not None:
+            trend_note=sample_note + ' ' + trend_note
+        for worksheet_prefix, property_name in cramino_trend_plots:
+            scatterplot_kwargs=dict(title=plot_title,show_run_colors=True,show_reg_line=False,x_variable='Period start',y_variable=property_name + ' median',prop_point_size=True,size_column='Runs',has_date_time=True,dpi=output_profile_settings['scatter_dpi'],figsize=output_profile_settings['figsize'],trend_line_column=property_name + ' rolling mean')
+            figure_specs.append((render_scatterplot,(trend_table,group_variable,legend_patches,colors,strip_plot),scatterplot_kwargs))
+            figure_worksheet_names.append(worksheet_prefix + ' ' + period + ' trend')
+            figure_notes.append(trend_note)
+    return figure_specs, figure_worksheet_names, figure_notes
+
+# get bin midpoints and fraction of reads per bin of each column of distribution table (see make_cramino_distribution_tables)
+# open ended last bin drawn at width of previous bin
+def get_distribution_fractions(distribution_table,column_names):
+    bin_starts=distribution_table['Bin start'].to_numpy(dtype=float)
+    bin_ends=distribution_table['Bin end'].to_numpy(dtype=float)
+    bin_widths=np.where(np.isfinite(bin_ends),bin_ends-bin_starts,np.nan)
+    bin_widths[~np.isfinite(bin_widths)]=np.nanmedian(bin_widths) if np.isfinite(bin_widths).any() else 1
+    counts=distribution_table[column_names].to_numpy(dtype=float)
+    with np.errstate(divide='ignore',invalid='ignore'):
+        fractions=counts/counts.sum(axis=0)
+    return bin_starts+bin_widths/2, fractions
+
+# render read distribution curves (fraction of reads in each bin) of each group from summed histogram bins
+# cohort curve (all groups) drawn as black dashed line if more than one group
+def render_distribution_curves(distribution_table,group_names,x_label,user_palette=None,legend_patches=None,title=None,dpi=150,figsize=None):
+    import matplotlib.pyplot as plt
+    imgdata=BytesIO()
+    fig, ax = plt.subplots(figsize=figsize)
+    column_names=list(group_names) + (['All groups'] if 'All groups' in distribution_table.columns else [])
+    bin_midpoints, fractions=get_distribution_fractions(distribution_table,column_names)
+    # same group colors as violin plots and scatterplots
+    group_colors=get_group_colors(pd.DataFrame({'Group': pd.Categorical(group_names,categories=group_names)}),'Group' if len(group_names) > 1 else None,user_palette)
+    group_colors['All groups']='black'
+    for idx, name in enumerate(column_names):
+        ax.plot(bin_midpoints,fractions[:,idx],color=group_colors.get(name,group_colors['All samples'] if 'All samples' in group_colors else 'black'),linestyle='--' if name == 'All groups' else '-',linewidth=1.5,label=name)
+    ax.set(xlabel=x_label,ylabel='Fraction of reads')
+    ax.set_ylim(bottom=0)
+    if title is not None:
+        ax.set_title(title)
+    if legend_patches is not None:
+        ax.legend(handles=legend_patches)
+    elif len(column_names) > 1:
+        ax.legend()
+    fig.savefig(imgdata, format='png', dpi=dpi, bbox_inches='tight')
+    fig.clf()
+    plt.close()
+    return imgdata
+
+# list read distribution figures for distribution tables keyed by histogram name (see make_cramino_distribution_tables)
+# groups are count columns of distribution tables (one per histogram table, which need not match dashboard groups,
+# e.g., single histogram table for groups from group column)
+# returns figure specifications, worksheet names and worksheet notes
+def make_distribution_figure_specs(distribution_tables,legend_patches=None,colors=None,plot_title=None,output_profile='standard'):
+    from cardlongread_cramino.histograms import cramino_histogram_bins
+    output_profile_settings=dashboard_output_profiles[output_profile]
+    figure_specs=[]
+    figure_worksheet_names=[]
+    figure_notes=[]
+    for name, distribution_table in distribution_tables.items():
+        group_names=[x for x in distribution_table.columns if x not in ['Bin start','Bin end','All groups']]
+        figure_specs.append((render_distribution_curves,(distribution_table,group_names,cramino_histogram_bins[name]['label'],colors,legend_patches,plot_title),dict(dpi=output_profile_settings['scatter_dpi'],figsize=output_profile_settings['figsize'])))
+        figure_worksheet_names.append(name + ' distribution')
+        figure_notes.append('Summed cramino histograms of all reports in each input (run cutoff not applied); fraction of reads per bin.')
+    return figure_specs, figure_worksheet_names, figure_notes
+
+# combine regression fits of scatterplot figures into one table for workbook (one row per plot and group)
+# returns None if no figure has regression fits
+def make_regression_fits_table(figure_specs,figure_worksheet_names):
+    regression_fits_tables=[]
+    for (render_function, render_args, render_kwargs), worksheet_name in zip(figure_specs,figure_worksheet_names):
+        if render_kwargs.get('reg_line_fits') is not None:
+            regression_fits_table=render_kwargs['reg_line_fits'][['Group','n','Slope','Intercept','R squared','Residual standard error']].copy()
+            # fits of plots grouped by 'Group and count' (plot labels with newline) listed under plain group names
+            data, group_variable = render_args[0], render_args[1]
+            if (group_variable is not None) and (group_variable != 'Group') and ('Group' in data.columns):
+                group_names = data[[group_variable,'Group']].drop_duplicates(subset=group_variable)
+                group_names = dict(zip(group_names[group_variable].astype(str),group_names['Group'].astype(str)))
+                regression_fits_table['Group'] = regression_fits_table['Group'].astype(str).map(group_names)
+            regression_fits_table.insert(0,'Plot',worksheet_name)
+            regression_fits_table.insert(2,'X variable',render_kwargs['x_variable'])
+            regression_fits_table.insert(3,'Y variable',render_kwargs['y_variable'])
+            regression_fits_tables.append(regression_fits_table)
+    if len(regression_fits_tables) == 0:
+        return None
+    return pd.concat(regression_fits_tables,ignore_index=True)
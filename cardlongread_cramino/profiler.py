@@ -0,0 +1,163 @@
+# stage-level timing and memory profiling for cramino parser and dashboard
+# records wall time, CPU time and peak resident set size (RSS) for each stage and figure
+# report written at exit as JSON plus human-readable table (standard error)
+import sys
+import json
+import time
+import atexit
+import cProfile
+# resource module not available on Windows (peak RSS reported as None)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# get peak resident set size (MB) of this process, or of finished child processes
+def get_peak_rss_mb(children=False):
+    if resource is None:
+        return None
+    if children is True:
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    else:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss in bytes on macOS, kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return round(peak_rss / 1048576, 1)
+    return round(peak_rss / 1024, 1)
+
+# reset peak RSS of this process (Linux: writing 5 to /proc/self/clear_refs resets VmHWM, and ru_maxrss with it),
+# so that get_stage_peak_rss_mb() gives peak since reset
+# returns whether reset is supported
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as outfile:
+            outfile.write('5')
+        return True
+    except OSError:
+        return False
+
+# get peak resident set size (MB) of this process since last reset_peak_rss() (Linux VmHWM), or None if not available
+def get_stage_peak_rss_mb():
+    try:
+        with open('/proc/self/status', 'r') as infile:
+            for line in infile:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+# stage profiler
+# stages are sequential: start_stage() ends any running stage
+# peak RSS of each stage measured by resetting process peak at stage start (Linux only; None elsewhere),
+# while peak RSS of whole run is kept as maximum of all readings
+# does nothing unless report file set, so calls can stay in place when profiling is off
+class StageProfiler:
+    def __init__(self, program_name, report_file=None, cprofile_file=None):
+        self.program_name = program_name
+        self.report_file = report_file
+        self.cprofile_file = cprofile_file
+        self.enabled = report_file is not None
+        self.records = []
+        self.current_stage = None
+        self.stage_peak_rss_mb = None
+        self.peak_rss_mb = None
+        self.children_peak_rss_mb = None
+        self.start_wall_time = time.perf_counter()
+        self.start_cpu_time = time.process_time()
+        self.cprofile = None
+        # optional cProfile of whole run (main process)
+        if cprofile_file is not None:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        # write report at exit, including runs that stop early
+        if (self.enabled is True) or (self.cprofile is not None):
+            atexit.register(self.write_report)
+
+    # start timing stage
+    def start_stage(self, stage_name):
+        if self.enabled is False:
+            return
+        self.stop_stage()
+        # keep peak reached before stage, then measure stage peak from current RSS
+        self.update_peak_rss()
+        self.stage_peak_rss_mb = 0.0 if reset_peak_rss() is True else None
+        self.current_stage = (stage_name, time.perf_counter(), time.process_time())
+
+    # stop timing current stage and record it
+    def stop_stage(self):
+        if (self.enabled is False) or (self.current_stage is None):
+            return
+        stage_name, stage_wall_time, stage_cpu_time = self.current_stage
+        stage_wall_time = time.perf_counter() - stage_wall_time
+        stage_cpu_time = time.process_time() - stage_cpu_time
+        # stage peak since reset, including peaks of figures rendered in this process during stage (which reset peak again)
+        if self.stage_peak_rss_mb is not None:
+            self.stage_peak_rss_mb = max(self.stage_peak_rss_mb, get_stage_peak_rss_mb() or 0.0)
+        self.update_peak_rss(self.stage_peak_rss_mb)
+        self.add_record(stage_name, stage_wall_time, stage_cpu_time, self.stage_peak_rss_mb)
+        self.current_stage = None
+        self.stage_peak_rss_mb = None
+
+    # keep maximum of peak RSS readings of this process (peak is reset at each stage start)
+    def update_peak_rss(self, peak_rss_mb=None):
+        for x in [peak_rss_mb, get_peak_rss_mb()]:
+            if x is not None:
+                self.peak_rss_mb = x if self.peak_rss_mb is None else max(self.peak_rss_mb, x)
+
+    # add record measured elsewhere (e.g., figure rendered in worker process, or in this process if in_process set)
+    # peak_rss_mb is peak RSS of measuring process during stage (None if not available)
+    def add_record(self, stage_name, wall_time, cpu_time, peak_rss_mb, parent_stage=None, in_process=False):
+        if self.enabled is False:
+            return
+        if peak_rss_mb is not None:
+            if in_process is True:
+                # stage measured in this process reset peak, so fold its peak into running stage
+                if self.stage_peak_rss_mb is not None:
+                    self.stage_peak_rss_mb = max(self.stage_peak_rss_mb, peak_rss_mb)
+                self.update_peak_rss(peak_rss_mb)
+            else:
+                self.children_peak_rss_mb = peak_rss_mb if self.children_peak_rss_mb is None else max(self.children_peak_rss_mb, peak_rss_mb)
+        self.records.append({'stage': stage_name,
+                             'parent': parent_stage,
+                             'wall_time_s': round(wall_time, 4),
+                             'cpu_time_s': round(cpu_time, 4),
+                             'peak_rss_mb': peak_rss_mb})
+
+    # peak RSS of finished child processes (figure workers), including per-figure peaks
+    # (workers reset their peak for each figure, so their exit peak only covers last figure)
+    def get_children_peak_rss_mb(self):
+        children_peak_rss_mb = get_peak_rss_mb(children=True)
+        if self.children_peak_rss_mb is None:
+            return children_peak_rss_mb
+        if children_peak_rss_mb is None:
+            return self.children_peak_rss_mb
+        return max(children_peak_rss_mb, self.children_peak_rss_mb)
+
+    # write JSON report and print table
+    def write_report(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_file)
+            self.cprofile = None
+        if self.enabled is False:
+            return
+        self.stop_stage()
+        self.update_peak_rss()
+        profile_report = {'program': self.program_name,
+                          'command': sys.argv,
+                          'total_wall_time_s': round(time.perf_counter() - self.start_wall_time, 4),
+                          'total_cpu_time_s': round(time.process_time() - self.start_cpu_time, 4),
+                          'peak_rss_mb': self.peak_rss_mb,
+                          'children_peak_rss_mb': self.get_children_peak_rss_mb(),
+                          'stages': self.records}
+        with open(self.report_file, 'w') as outfile:
+            json.dump(profile_report, outfile, indent=2)
+        # human-readable table
+        print(f"{'Stage':<48}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak RSS (MB)':>15}", file=sys.stderr)
+        for x in self.records:
+            stage_label = x['stage'] if x['parent'] is None else '  ' + x['stage']
+            print(f"{stage_label[:47]:<48}{x['wall_time_s']:>10.3f}{x['cpu_time_s']:>10.3f}{str(x['peak_rss_mb']):>15}", file=sys.stderr)
+        print(f"{'Total':<48}{profile_report['total_wall_time_s']:>10.3f}{profile_report['total_cpu_time_s']:>10.3f}{str(profile_report['peak_rss_mb']):>15}", file=sys.stderr)
+        print(f'Profile report written to {self.report_file}', file=sys.stderr)
+        self.enabled = False
@@ -0,0 +1,103 @@
+# QC pass/fail flags for cramino QC dashboard
+# rules are thresholds (min/max) or robust outlier scores (modified z-score from median and MAD within each group),
+# evaluated for all samples, rules and groups in one vectorized pass
+# rules file is tab-delimited with columns Rule, Property, Type (min, max or robust_z) and Threshold, e.g.
+# Rule	Property	Type	Threshold
+# Low yield	Yield (Gb)	min	90
+# Yield outlier	Yield (Gb)	robust_z	3.5
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import get_cramino_property_values
+from cardlongread_cramino.summary import cramino_summary_statistics_property_names
+
+# rules file columns and rule types
+cramino_qc_rule_columns = ['Rule','Property','Type','Threshold']
+cramino_qc_rule_types = ['min','max','robust_z']
+# default minimum thresholds (yield and mean coverage cutoff lines in violin plots)
+# 90 Gb cutoff line in yield over 25 kb violin plot is left out: few samples reach it, so it would fail almost every sample
+cramino_qc_default_thresholds = [('Yield (Gb)',90),('Mean Coverage',30)]
+# default outlier rule properties (N50 (kb) left out as duplicate of N50)
+cramino_qc_default_outlier_properties = [x for x in cramino_summary_statistics_property_names if x != 'N50 (kb)']
+
+# make default QC rules: yield and coverage cutoff thresholds, and robust z-score outliers of every property
+def make_default_qc_rules(robust_z_threshold=3.5):
+    qc_rules = [(x + ' below ' + str(y), x, 'min', y) for x, y in cramino_qc_default_thresholds]
+    qc_rules += [(x + ' outlier', x, 'robust_z', robust_z_threshold) for x in cramino_qc_default_outlier_properties]
+    return pd.DataFrame(qc_rules, columns=cramino_qc_rule_columns)
+
+# read and check QC rules file (tab-delimited)
+def read_qc_rules(rules_file):
+    qc_rules = pd.read_csv(rules_file, sep='\t', comment='#')
+    missing_columns = [x for x in cramino_qc_rule_columns if x not in qc_rules.columns]
+    if len(missing_columns) > 0:
+        raise ValueError(f"missing columns: {', '.join(missing_columns)}")
+    qc_rules = qc_rules[cramino_qc_rule_columns].copy()
+    unknown_properties = [x for x in qc_rules['Property'] if x not in cramino_summary_statistics_property_names]
+    if len(unknown_properties) > 0:
+        raise ValueError(f"unknown properties: {', '.join(unknown_properties)}")
+    unknown_types = [x for x in qc_rules['Type'] if x not in cramino_qc_rule_types]
+    if len(unknown_types) > 0:
+        raise ValueError(f"unknown rule types (use {', '.join(cramino_qc_rule_types)}): {', '.join(unknown_types)}")
+    if qc_rules['Rule'].duplicated().any():
+        raise ValueError('rule names must be unique')
+    qc_rules['Threshold'] = pd.to_numeric(qc_rules['Threshold'], errors='raise')
+    return qc_rules
+
+# get robust z-scores (modified z-score, 0.6745 (x - median) / MAD) of every property within each group
+# groups with zero MAD give missing scores (no outliers flagged)
+def get_robust_z_scores(values, group_codes):
+    group_values = pd.DataFrame(values).groupby(group_codes)
+    group_medians = group_values.median().reindex(np.arange(group_codes.max() + 1)).to_numpy()
+    deviations = values - group_medians[group_codes]
+    group_mads = pd.DataFrame(np.abs(deviations)).groupby(group_codes).median().reindex(np.arange(group_codes.max() + 1)).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        robust_z_scores = 0.6745 * deviations / group_mads[group_codes]
+    robust_z_scores[~np.isfinite(robust_z_scores)] = np.nan
+    return robust_z_scores
+
+# evaluate QC rules for every sample
+# threshold rules fail if value is below (min) or above (max) threshold; robust_z rules fail if absolute robust
+# z-score within group is above threshold; missing values never fail
+# returns per-sample flags (status, number of failed rules and one column per rule) and
+# index of failures (one row per failed rule and sample, in rule then sample order)
+def evaluate_qc_rules(cramino_extract, qc_rules, group_variable=None):
+    rule_properties = list(qc_rules['Property'])
+    rule_types = qc_rules['Type'].to_numpy()
+    thresholds = qc_rules['Threshold'].to_numpy(dtype=float)
+    # property value of every rule for every sample (rows are samples, columns are rules)
+    values = get_cramino_property_values(cramino_extract, rule_properties)
+    if group_variable is None:
+        group_codes = np.zeros(len(cramino_extract), dtype=np.int64)
+    else:
+        group_codes = pd.factorize(cramino_extract[group_variable])[0]
+    # scores compared with thresholds: values for threshold rules, absolute robust z-scores for outlier rules
+    scores = values.copy()
+    robust_z_rules = rule_types == 'robust_z'
+    if robust_z_rules.any() and (len(cramino_extract) > 0):
+        scores[:, robust_z_rules] = get_robust_z_scores(values[:, robust_z_rules], group_codes)
+    with np.errstate(invalid='ignore'):
+        failed = np.where(rule_types == 'min', scores < thresholds, np.where(rule_types == 'max', scores > thresholds, np.abs(scores) > thresholds))
+    # per-sample flags
+    qc_flags = pd.DataFrame(index=cramino_extract.index)
+    if 'Filename' in cramino_extract.columns:
+        qc_flags['Filename'] = cramino_extract['Filename']
+    if group_variable is not None:
+        qc_flags['Group'] = cramino_extract[group_variable]
+    qc_flags['QC status'] = np.where(failed.any(axis=1), 'FAIL', 'PASS')
+    qc_flags['Failed rules'] = failed.sum(axis=1)
+    qc_flags = pd.concat([qc_flags, pd.DataFrame(failed, columns=list(qc_rules['Rule']), index=cramino_extract.index)], axis=1)
+    # failure index in rule order (transpose so that failures of each rule are together)
+    rule_indices, sample_indices = np.nonzero(failed.T)
+    qc_failures = pd.DataFrame({'Rule': qc_rules['Rule'].to_numpy()[rule_indices],
+                                'Property': np.asarray(rule_properties, dtype=object)[rule_indices],
+                                'Type': rule_types[rule_indices],
+                                'Threshold': thresholds[rule_indices]})
+    # sample number in dashboard table (counted from 1), filename and group
+    qc_failures['Sample'] = sample_indices + 1
+    if 'Filename' in cramino_extract.columns:
+        qc_failures['Filename'] = cramino_extract['Filename'].to_numpy()[sample_indices]
+    if group_variable is not None:
+        qc_failures['Group'] = np.asarray(cramino_extract[group_variable])[sample_indices]
+    qc_failures['Value'] = values[sample_indices, rule_indices]
+    qc_failures['Robust z'] = np.where(robust_z_rules[rule_indices], scores[sample_indices, rule_indices], np.nan)
+    return qc_flags, qc_failures
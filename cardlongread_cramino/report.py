@@ -0,0 +1,533 @@
+# long read sequencing cramino QC report parsing
+# convert cramino reports into single summary table per cohort
+import re
+import glob
+import pandas as pd
+import numpy as np
+import dataclasses
+# for gzip-compressed reports
+import gzip
+# for report creation time
+import datetime
+from dateutil.parser import isoparse
+# for parallel report ingestion
+from concurrent.futures import ThreadPoolExecutor
+# for incremental mode report cache
+import os
+import json
+import sqlite3
+
+# example cramino output
+# File name	Chile_404.sorted_meth.bam
+# Number of alignments	7876502
+# % from total reads	77.57
+# Yield [Gb]	147.44
+# Mean coverage	47.56
+# Yield [Gb] (>25kb)	65.65
+# N50	23260
+# N75	16395
+# Median length	16935.00
+# Mean length	18718
+# Median identity	99.47
+# Mean identity	97.80
+# Path	/data/CARD_AUX/LRS_temp/CHILE/MAPPED_BAM/Chile_404.sorted_meth.bam
+# Creation time	NA
+
+
+# cramino report fields
+# instantiated once per report (reports are parsed by several threads at once)
+@dataclasses.dataclass
+class fields_from_cramino:
+    file_name : str = ''
+    number_of_alignments : float = 0
+    percent_of_total_reads : float = 0
+    yield_gb : float = 0
+    mean_coverage : float = 0
+    yield_gb_over_25kb : float = 0
+    n50 : float = 0
+    n75 : float = 0
+    median_length : float = 0
+    mean_length : float = 0
+    median_identity : float = 0
+    mean_identity : float = 0
+    median_identity_q_score : float = 0
+    mean_identity_q_score : float = 0
+    creation_time : str = None
+
+# function to pull fields out of cramino output dataframe
+def get_fields_from_cramino(input_cramino_df,bam_type):
+    # get values from each consecutive field in the cramino output dataframe
+    # what to do if data frame is empty (all values left at 0)
+    if (len(input_cramino_df[1])==1):
+        current_fields = fields_from_cramino(file_name=input_cramino_df[1][0])
+    # as shown above, these are just sequential values (row by row) in the table
+    else:
+        current_fields = fields_from_cramino(file_name=input_cramino_df[1][0],
+                                             number_of_alignments=input_cramino_df[1][1],
+                                             percent_of_total_reads=input_cramino_df[1][2],
+                                             yield_gb=input_cramino_df[1][3],
+                                             mean_coverage=input_cramino_df[1][4],
+                                             yield_gb_over_25kb=input_cramino_df[1][5],
+                                             n50=input_cramino_df[1][6],
+                                             n75=input_cramino_df[1][7],
+                                             median_length=input_cramino_df[1][8],
+                                             mean_length=input_cramino_df[1][9])
+        if (bam_type == "mapped_bam"):
+            current_fields.median_identity = input_cramino_df[1][10]
+            current_fields.mean_identity = input_cramino_df[1][11]
+            current_fields.median_identity_q_score = round(-10*np.log10((100-float(current_fields.median_identity))/100),2)
+            current_fields.mean_identity_q_score = round(-10*np.log10((100-float(current_fields.mean_identity))/100),2)
+        # identity values not provided for cramino run with --ubam option (left at 0)
+    # creation time looked up by name (follows identity fields only in mapped BAM reports)
+    if 'Creation time' in input_cramino_df[0]:
+        current_fields.creation_time = get_creation_time(input_cramino_df[1][input_cramino_df[0].index('Creation time')])
+    return current_fields
+
+# strings that pandas read_csv treats as missing by default (kept so lightweight reader output matches)
+cramino_na_values = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+# read whole report file as text (gzip-compressed if name ends with .gz)
+def read_cramino_report_file(cramino_path):
+    if cramino_path.lower().endswith('.gz'):
+        with gzip.open(cramino_path, 'rt') as infile:
+            return infile.read()
+    with open(cramino_path, 'r') as infile:
+        return infile.read()
+
+# lightweight key/value reader for cramino reports
+# returns {0: keys, 1: values} so it can be indexed like the pandas data frame used previously
+def read_cramino_report(cramino_path):
+    return read_cramino_report_text(read_cramino_report_file(cramino_path))
+
+# key/value reader for cramino report already read into memory
+def read_cramino_report_text(cramino_text):
+    lines = cramino_text.splitlines()
+    cramino_keys = []
+    cramino_values = []
+    expected_fields = None
+    for line_number, line in enumerate(lines, start=1):
+        # skip blank lines as read_csv does
+        if line == '':
+            continue
+        # histogram sections (cramino --hist) follow summary fields and are read separately (see histograms module)
+        if re.match(r'#\s*histogram', line, re.IGNORECASE):
+            break
+        fields = line.split('\t')
+        # first line sets number of fields, as with read_csv(header=None)
+        if expected_fields is None:
+            expected_fields = len(fields)
+        elif len(fields) > expected_fields:
+            raise ValueError(f'Error tokenizing data. Expected {expected_fields} fields in line {line_number}, saw {len(fields)}')
+        # pad short lines with missing values
+        fields = fields + [''] * (expected_fields - len(fields))
+        fields = [np.nan if x in cramino_na_values else x for x in fields]
+        cramino_keys.append(fields[0])
+        cramino_values.append(fields[1] if expected_fields > 1 else np.nan)
+    # empty file
+    if expected_fields is None:
+        raise ValueError('No columns to parse from file')
+    return {0: cramino_keys, 1: cramino_values}
+
+# normalize cramino field name for lookup by name (lower case, words joined by underscores)
+# e.g., '% from total reads' -> 'from_total_reads', 'Yield [Gb] (>25kb)' -> 'yield_gb_25kb'
+def normalize_cramino_field_name(field_name):
+    return re.sub('[^a-z0-9]+', '_', str(field_name).lower()).strip('_')
+
+# get summary table column for normalized field name (None if not a summary field)
+def get_cramino_field_column(field_name):
+    return cramino_field_name_lookup.get(normalize_cramino_field_name(field_name))
+
+# flatten nested JSON report into single dictionary of summary table columns
+# fields are matched by name at any nesting level (first occurrence kept); lists are skipped
+def flatten_cramino_json(json_value, record=None):
+    if record is None:
+        record = {}
+    for key, value in json_value.items():
+        if isinstance(value, dict):
+            flatten_cramino_json(value, record)
+        elif not isinstance(value, list):
+            column_name = get_cramino_field_column(key)
+            if (column_name is not None) and (column_name not in record):
+                record[column_name] = value
+    return record
+
+# read cramino JSON report (cramino --format json) into dictionary of summary table columns
+def read_cramino_json_report(cramino_path):
+    return read_cramino_json_report_text(read_cramino_report_file(cramino_path), cramino_path)
+
+# JSON reader for cramino report already read into memory
+def read_cramino_json_report_text(cramino_text, cramino_name):
+    json_value = json.loads(cramino_text)
+    if not isinstance(json_value, dict):
+        raise ValueError(f'Expected JSON object in cramino report {cramino_name}')
+    return flatten_cramino_json(json_value)
+
+# get identity Q score (Phred-scaled) from percent identity
+def get_identity_q_score(identity):
+    if identity is None:
+        return None
+    return round(-10*np.log10((100-float(identity))/100),2)
+
+# cramino creation time formats other than ISO 8601 (day first, as written by cramino)
+cramino_creation_time_formats = ['%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y']
+
+# normalize report creation time to ISO 8601 (local time of report, time zone dropped)
+# returns None if missing (NA) or not a recognized date
+def get_creation_time(creation_time):
+    if isinstance(creation_time, datetime.datetime):
+        return creation_time.replace(tzinfo=None).isoformat()
+    if not isinstance(creation_time, str):
+        return None
+    creation_time = creation_time.strip()
+    try:
+        return isoparse(creation_time).replace(tzinfo=None).isoformat()
+    except ValueError:
+        pass
+    for creation_time_format in cramino_creation_time_formats:
+        try:
+            return datetime.datetime.strptime(creation_time, creation_time_format).isoformat()
+        except ValueError:
+            continue
+    return None
+
+# get summary table row from report fields mapped by name (JSON or Arrow input)
+# missing fields are left empty, instead of shifting later fields as with positional text reports
+def get_fields_from_cramino_record(cramino_record, bam_type):
+    # report with file name only (empty BAM) gets zeros, as for text reports
+    if set(cramino_record) <= {'Filename'}:
+        return [cramino_record.get('Filename')] + [0] * len(cramino_report_property_names) + [None]
+    current_row = [cramino_record.get(x) for x in cramino_report_column_names[:10]]
+    if (bam_type == "mapped_bam"):
+        median_identity = cramino_record.get('Median identity')
+        mean_identity = cramino_record.get('Mean identity')
+        current_row += [median_identity, mean_identity, get_identity_q_score(median_identity), get_identity_q_score(mean_identity)]
+    # identity information not provided for cramino run with --ubam option
+    elif (bam_type == "unmapped_bam"):
+        current_row += [0, 0, 0, 0]
+    current_row.append(get_creation_time(cramino_record.get('Creation time')))
+    return current_row
+
+# parse single cramino report into list of summary table fields
+# text reports are read by position; JSON reports by field name
+# return exception instead of raising so that errors can be printed in file order
+def parse_cramino_report(cramino_path, bam_type, input_format='text'):
+    try:
+        cramino_text = read_cramino_report_file(cramino_path)
+    # undecodable report
+    except ValueError as e:
+        return e
+    return parse_cramino_report_text(cramino_text, bam_type, input_format, cramino_path)
+
+# parse single cramino report already read into memory (e.g., from archive)
+def parse_cramino_report_text(cramino_text, bam_type, input_format='text', cramino_name=''):
+    try:
+        if input_format == 'json':
+            return get_fields_from_cramino_record(read_cramino_json_report_text(cramino_text, cramino_name), bam_type)
+        data = read_cramino_report_text(cramino_text)
+        # get important information
+        current_data_fields = get_fields_from_cramino(data,bam_type)
+        return [current_data_fields.file_name,current_data_fields.number_of_alignments,current_data_fields.percent_of_total_reads,current_data_fields.yield_gb,current_data_fields.mean_coverage,current_data_fields.yield_gb_over_25kb,current_data_fields.n50,current_data_fields.n75,current_data_fields.median_length,current_data_fields.mean_length,current_data_fields.median_identity,current_data_fields.mean_identity,current_data_fields.median_identity_q_score,current_data_fields.mean_identity_q_score,current_data_fields.creation_time]
+    except ValueError as e:
+        return e
+
+# parse Arrow reports in one batch
+# each Arrow IPC (feather) file holds one summary record with fields as named columns;
+# files (or in-memory buffers) are memory mapped, columns renamed to summary table columns and combined into one table
+# yields rows (or errors) in file order
+def parse_cramino_arrow_reports(files, bam_type):
+    # pyarrow is only needed for Arrow input
+    try:
+        import pyarrow
+        import pyarrow.feather
+    except ImportError:
+        quit('ERROR: Arrow input requires the pyarrow module.')
+    arrow_tables = []
+    file_errors = {}
+    for idx, x in enumerate(files):
+        try:
+            arrow_table = pyarrow.feather.read_table(x, memory_map=True)
+        except (ValueError, OSError) as e:
+            file_errors[idx] = e
+            continue
+        if arrow_table.num_rows != 1:
+            file_errors[idx] = ValueError(f'Expected one summary record per Arrow file, found {arrow_table.num_rows}')
+            continue
+        # keep summary fields only (first matching column of each), named by summary table column
+        column_indices = {}
+        for column_idx, column_name in enumerate(arrow_table.column_names):
+            summary_column_name = get_cramino_field_column(column_name)
+            if (summary_column_name is not None) and (summary_column_name not in column_indices):
+                column_indices[summary_column_name] = column_idx
+        arrow_tables.append(arrow_table.select(list(column_indices.values())).rename_columns(list(column_indices)))
+    # combine all files into one table (columns missing from some files filled with nulls)
+    if len(arrow_tables) > 0:
+        cramino_records = pyarrow.concat_tables(arrow_tables, promote_options='default').to_pylist()
+    else:
+        cramino_records = []
+    cramino_records = iter(cramino_records)
+    for idx in range(len(files)):
+        if idx in file_errors:
+            yield file_errors[idx]
+        else:
+            # drop null fields so they are treated as missing
+            yield get_fields_from_cramino_record({key: value for key, value in next(cramino_records).items() if value is not None}, bam_type)
+
+# parse list of cramino reports with thread pool (Arrow reports in one batch)
+# yields rows (or errors) in file order
+def parse_cramino_reports(files, bam_type, workers, input_format='text'):
+    if input_format == 'arrow':
+        yield from parse_cramino_arrow_reports(files, bam_type)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(parse_cramino_report, files, [bam_type] * len(files), [input_format] * len(files))
+
+# open SQLite cache of parsed report fields for incremental mode
+# reports are keyed by absolute path, modification time and size
+def open_report_cache(cache_path, bam_type, input_format='text'):
+    connection = sqlite3.connect(cache_path)
+    connection.execute('CREATE TABLE IF NOT EXISTS cache_info (key TEXT PRIMARY KEY, value TEXT)')
+    connection.execute('CREATE TABLE IF NOT EXISTS reports (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, row TEXT, error TEXT)')
+    # cached fields depend on report type, input format and summary table columns, so start over if any changed
+    cached_bam_type = connection.execute("SELECT value FROM cache_info WHERE key = 'bam_type'").fetchone()
+    cached_input_format = connection.execute("SELECT value FROM cache_info WHERE key = 'input_format'").fetchone()
+    cached_column_names = connection.execute("SELECT value FROM cache_info WHERE key = 'columns'").fetchone()
+    # caches made before input format option are text report caches
+    cached_input_format = 'text' if cached_input_format is None else cached_input_format[0]
+    if (cached_bam_type is None) or (cached_bam_type[0] != bam_type) or (cached_input_format != input_format) or (cached_column_names is None) or (json.loads(cached_column_names[0]) != cramino_report_column_names):
+        connection.execute('DELETE FROM reports')
+        connection.execute("INSERT OR REPLACE INTO cache_info VALUES ('bam_type', ?)", (bam_type,))
+    connection.execute("INSERT OR REPLACE INTO cache_info VALUES ('input_format', ?)", (input_format,))
+    connection.execute("INSERT OR REPLACE INTO cache_info VALUES ('columns', ?)", (json.dumps(cramino_report_column_names),))
+    return connection
+
+# incremental version of parse_cramino_reports
+# only new or changed reports are parsed; reports no longer listed are evicted from cache
+def parse_cramino_reports_incremental(files, bam_type, workers, cache_path, input_format='text'):
+    connection = open_report_cache(cache_path, bam_type, input_format)
+    cached_reports = {x[0]: x[1:] for x in connection.execute('SELECT path, mtime_ns, size, row, error FROM reports')}
+    # get cache keys for current files
+    file_keys = []
+    for x in files:
+        file_stat = os.stat(x)
+        file_keys.append((os.path.abspath(x), file_stat.st_mtime_ns, file_stat.st_size))
+    # find new or changed reports
+    stale_indices = [idx for idx, key in enumerate(file_keys) if (key[0] not in cached_reports) or (cached_reports[key[0]][0:2] != key[1:])]
+    stale_files = [files[idx] for idx in stale_indices]
+    stale_keys = [file_keys[idx] for idx in stale_indices]
+    # parse new or changed reports and store in cache
+    for key, current_row in zip(stale_keys, parse_cramino_reports(stale_files, bam_type, workers, input_format)):
+        if isinstance(current_row, ValueError):
+            cached_reports[key[0]] = (key[1], key[2], None, str(current_row))
+        else:
+            # numpy floats (identity Q scores) stored as plain floats
+            current_row = [float(x) if isinstance(x, np.floating) else x for x in current_row]
+            cached_reports[key[0]] = (key[1], key[2], json.dumps(current_row), None)
+        connection.execute('INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)', (key[0],) + cached_reports[key[0]])
+    # evict reports no longer present
+    current_paths = set(key[0] for key in file_keys)
+    for path in set(cached_reports) - current_paths:
+        connection.execute('DELETE FROM reports WHERE path = ?', (path,))
+    connection.commit()
+    connection.close()
+    # return merged rows (or errors) from cache in file order
+    for key in file_keys:
+        cached_row, cached_error = cached_reports[key[0]][2:]
+        if cached_error is not None:
+            yield ValueError(cached_error)
+        else:
+            yield json.loads(cached_row)
+
+# get output format from --format or output file extension
+def get_output_format(output_file, output_format=None):
+    if output_format is not None:
+        return output_format
+    # tab-delimited to stdout if no output file
+    elif output_file is None:
+        return 'tsv'
+    elif output_file.lower().endswith(('.parquet','.pq')):
+        return 'parquet'
+    elif output_file.lower().endswith(('.feather','.arrow')):
+        return 'feather'
+    else:
+        return 'tsv'
+
+# write summary table in columnar format (parquet or feather) with numeric column types
+def write_columnar_summary_table(cramino_report_df, output_file, output_format):
+    # convert report fields to numbers and compact schema types (filename kept as categorical strings, creation time as timestamps)
+    typed_cramino_report_df = cramino_report_df.copy()
+    typed_cramino_report_df['Filename'] = typed_cramino_report_df['Filename'].astype('string')
+    for name in cramino_report_property_names:
+        typed_cramino_report_df[name] = pd.to_numeric(typed_cramino_report_df[name], errors='coerce')
+    apply_cramino_report_schema(typed_cramino_report_df)
+    # pyarrow is only needed for columnar output
+    try:
+        if output_format == 'parquet':
+            typed_cramino_report_df.to_parquet(output_file, index=False)
+        elif output_format == 'feather':
+            typed_cramino_report_df.to_feather(output_file)
+    except ImportError:
+        quit(f'ERROR: {output_format} output requires the pyarrow module.')
+
+# set column names
+cramino_report_column_names = ['Filename','Number of alignments','Percent of total reads','Yield (Gb)','Mean Coverage','Yield (Gb) [>25kb]','N50','N75','Median length','Mean length','Median identity','Mean identity','Median identity Q score','Mean identity Q score','Creation time']
+# numeric report properties (all columns except filename and creation time)
+cramino_report_property_names = cramino_report_column_names[1:-1]
+
+# compact in-memory schema of typed summary table columns (columnar output and dashboard)
+# counts and lengths are stored as smallest integer type holding all values (if none missing and all integer-valued),
+# otherwise properties are stored as float32 if every value is restored exactly by rounding to its decimal places,
+# and as float64 if not
+# filenames and group labels are categorical; N50 (kb) and group columns are added by the dashboard
+cramino_report_column_types = {'Filename': 'category',
+                               'Number of alignments': 'integer',
+                               'Percent of total reads': 'float',
+                               'Yield (Gb)': 'float',
+                               'Mean Coverage': 'float',
+                               'Yield (Gb) [>25kb]': 'float',
+                               'N50': 'integer',
+                               'N50 (kb)': 'float',
+                               'N75': 'integer',
+                               'Median length': 'integer',
+                               'Mean length': 'integer',
+                               'Median identity': 'float',
+                               'Mean identity': 'float',
+                               'Median identity Q score': 'float',
+                               'Mean identity Q score': 'float',
+                               'Creation time': 'datetime',
+                               'Group': 'category',
+                               'Group and count': 'category'}
+# decimal places of properties (as written by cramino, identity Q scores as rounded by parser)
+cramino_report_column_decimals = {'Number of alignments': 0,
+                                  'Percent of total reads': 2,
+                                  'Yield (Gb)': 2,
+                                  'Mean Coverage': 2,
+                                  'Yield (Gb) [>25kb]': 2,
+                                  'N50': 0,
+                                  'N50 (kb)': 3,
+                                  'N75': 0,
+                                  'Median length': 2,
+                                  'Mean length': 2,
+                                  'Median identity': 2,
+                                  'Mean identity': 2,
+                                  'Median identity Q score': 2,
+                                  'Mean identity Q score': 2}
+
+# restore float64 values of float32 property (exact if values were stored from numbers with at most given decimal places)
+def restore_float32_values(values, decimals):
+    restored_values = np.round(values.astype(float), decimals)
+    # leave values unrounded if not all stored from such numbers (e.g., float32 column from other source)
+    if np.array_equal(restored_values.astype(np.float32), values, equal_nan=True):
+        return restored_values
+    return values.astype(float)
+
+# convert numeric summary table columns to compact types of schema (in place)
+# categories are kept in order of first appearance, so plots and group tables keep input order
+def apply_cramino_report_schema(cramino_report_df):
+    for name, column_type in cramino_report_column_types.items():
+        if name not in cramino_report_df.columns:
+            continue
+        values = cramino_report_df[name]
+        if column_type == 'category':
+            cramino_report_df[name] = pd.Categorical(values, categories=pd.unique(values.dropna()))
+        elif column_type == 'datetime':
+            # ISO 8601 text as written by parser (unrecognized values missing)
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                cramino_report_df[name] = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        elif (column_type == 'integer') and values.notna().all() and (values == values.round()).all():
+            cramino_report_df[name] = pd.to_numeric(values, downcast='integer')
+        elif values.dtype == np.float64:
+            float32_values = values.to_numpy(dtype=np.float32)
+            if np.array_equal(restore_float32_values(float32_values, cramino_report_column_decimals[name]), values.to_numpy(), equal_nan=True):
+                cramino_report_df[name] = float32_values
+    return cramino_report_df
+
+# get shallow copy of summary table with float32 properties restored to exact float64 values (e.g., for plotting)
+def restore_cramino_property_columns(cramino_report_df, property_names):
+    restored_names = [x for x in property_names if (x in cramino_report_df.columns) and (cramino_report_df[x].dtype == np.float32) and (x in cramino_report_column_decimals)]
+    if len(restored_names) == 0:
+        return cramino_report_df
+    restored_df = cramino_report_df.copy(deep=False)
+    for name in restored_names:
+        restored_df[name] = restore_float32_values(cramino_report_df[name].to_numpy(), cramino_report_column_decimals[name])
+    return restored_df
+
+# get property values of typed (or untyped) summary table as float64 array (rows are samples, columns are properties)
+# float32 columns are restored to exact values, so statistics do not depend on storage type
+def get_cramino_property_values(cramino_report_df, property_names):
+    values = np.empty((len(cramino_report_df), len(property_names)))
+    for idx, name in enumerate(property_names):
+        column = cramino_report_df[name]
+        if (column.dtype == np.float32) and (name in cramino_report_column_decimals):
+            values[:, idx] = restore_float32_values(column.to_numpy(), cramino_report_column_decimals[name])
+        else:
+            values[:, idx] = pd.to_numeric(column, errors='coerce').to_numpy(dtype=float)
+    return values
+
+# field names accepted for each summary table column in JSON and Arrow reports (normalized, see normalize_cramino_field_name)
+# includes cramino text report names, summary table column names and common JSON/Arrow spellings
+cramino_field_aliases = {'Filename': ['file_name','filename','name','file'],
+                         'Number of alignments': ['number_of_alignments','num_alignments','n_alignments','alignments'],
+                         'Percent of total reads': ['from_total_reads','percent_of_total_reads','percent_from_total_reads','percent_from_total','pct_from_total','pct_from_total_reads'],
+                         'Yield (Gb)': ['yield_gb','yield','total_yield_gb'],
+                         'Mean Coverage': ['mean_coverage','coverage','mean_cov'],
+                         'Yield (Gb) [>25kb]': ['yield_gb_25kb','yield_gb_over_25kb','yield_gb_above_25kb','yield_over_25kb','yield_above_25kb','yield_25kb'],
+                         'N50': ['n50','read_n50'],
+                         'N75': ['n75','read_n75'],
+                         'Median length': ['median_length','median_read_length'],
+                         'Mean length': ['mean_length','mean_read_length'],
+                         'Median identity': ['median_identity'],
+                         'Mean identity': ['mean_identity'],
+                         'Creation time': ['creation_time','created','creation_date']}
+cramino_field_name_lookup = {alias: column_name for column_name, aliases in cramino_field_aliases.items() for alias in aliases}
+
+# report file extensions for each input format (used when listing report directory or archive)
+# text and JSON reports may be gzip-compressed
+cramino_report_extensions = {'text': ['txt', 'txt.gz'], 'json': ['json', 'json.gz'], 'arrow': ['arrow', 'feather']}
+
+# get cramino report file list from directory (all files with report extension, sorted by path) or text file list (one path per line, in list order)
+def list_cramino_reports(cramino_dir=None, filelist=None, input_format='text'):
+    if cramino_dir is not None:
+        # sorted, since glob order differs between file systems and runs (shards of different nodes must see same list)
+        return sorted(x for extension in cramino_report_extensions[input_format] for x in glob.glob(f'{cramino_dir}/*.{extension}'))
+    elif filelist is not None:
+        with open(filelist, 'r') as infile:
+            return [x.strip() for x in infile.readlines()]
+    raise ValueError('No directory (cramino_dir) or file list (filelist) provided!')
+
+# build summary table from list of cramino reports (text, JSON or Arrow)
+# incremental mode if cache file provided
+def make_cramino_report_data_frame(files, bam_type, workers=1, cache=None, input_format='text'):
+    # main loop to process files
+    # reports are read by a thread pool (cramino reports are small, so reading is I/O latency bound)
+    # results are returned in file order so output matches serial processing
+    if cache is not None:
+        cramino_report_rows = parse_cramino_reports_incremental(files, bam_type, workers, cache, input_format)
+    else:
+        cramino_report_rows = parse_cramino_reports(files, bam_type, workers, input_format)
+    return make_cramino_report_data_frame_from_rows(cramino_report_rows)
+
+# build summary table from parsed report rows (or errors, printed and kept as empty rows)
+def make_cramino_report_data_frame_from_rows(cramino_report_rows):
+    # columnar buffer with one list per output column
+    # converted into a data frame once all reports are read
+    cramino_report_columns = {name: [] for name in cramino_report_column_names}
+    for current_row in cramino_report_rows:
+        if isinstance(current_row, ValueError):
+            print(current_row)
+            # keep empty row for unreadable report
+            current_row = [None] * len(cramino_report_column_names)
+        for name, value in zip(cramino_report_column_names, current_row):
+            cramino_report_columns[name].append(value)
+    # initialize data frame with said column names
+    # object dtype keeps field values exactly as written in the reports
+    return pd.DataFrame(cramino_report_columns, columns=cramino_report_column_names, dtype=object)
+
+# write summary table in tab-delimited or columnar format
+def write_cramino_report_data_frame(cramino_report_df, output_file, output_format=None):
+    # print output data frame to tab delimited tsv file
+    # or typed parquet/feather file if requested
+    output_format = get_output_format(output_file, output_format)
+    if output_format == 'tsv':
+        cramino_report_df.to_csv(output_file,sep='\t',index=False)
+    else:
+        write_columnar_summary_table(cramino_report_df, output_file, output_format)
@@ -0,0 +1,115 @@
+# sharded cramino report parsing for multi-node runs
+# each shard parses a contiguous slice of the report list and writes its rows (tab-delimited)
+# plus mergeable aggregates (<shard output>.shard.json) for every summary statistics property
+# merging concatenates shard rows in shard order (same table as unsharded run) and combines aggregates
+# into summary statistics without reading any report again
+import json
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import get_cramino_property_values
+from cardlongread_cramino.summary import load_cramino_summary_tables, cramino_summary_statistics_property_names, cramino_summary_statistics_column_names
+from cardlongread_cramino.streaming import StreamingPropertyStatistics
+from cardlongread_cramino.files import write_file_atomically
+
+# parse shard specification 'i/N' (shard i of N, counted from 1)
+def parse_shard_spec(shard_spec):
+    try:
+        shard_index, shard_count = [int(x) for x in shard_spec.split('/')]
+    except ValueError:
+        raise ValueError(f'Shard must be given as i/N (e.g., 2/8), not {shard_spec}')
+    if (shard_count < 1) or (shard_index < 1) or (shard_index > shard_count):
+        raise ValueError(f'Shard index must be between 1 and number of shards, not {shard_spec}')
+    return shard_index, shard_count
+
+# get contiguous slice of report list for shard i of N
+# slices of all shards cover list in order, so merged rows are in same order as unsharded run
+# (report list must be same on every node: directory listings are sorted, file lists keep their order)
+def get_shard_files(files, shard_index, shard_count):
+    return files[(shard_index - 1) * len(files) // shard_count : shard_index * len(files) // shard_count]
+
+# get mergeable aggregates of shard summary table
+# same rows and properties as dashboard summary statistics: runs below run cutoff (Gb) removed, N50 (kb) added
+# every property keeps streaming accumulators (count, mean, M2, min, max, KLL sketch for median and
+# Misra-Gries counters for mode; see StreamingPropertyStatistics), so aggregate size does not grow with shard size
+def make_shard_aggregates(cramino_report_df, shard_index, shard_count, bam_type, number_of_files, run_cutoff=1, sketch_size=200, mode_counters=1000):
+    cramino_extract, grouped = load_cramino_summary_tables([cramino_report_df], run_cutoff=run_cutoff)
+    values = get_cramino_property_values(cramino_extract, cramino_summary_statistics_property_names)
+    shard_aggregates = {'shard': shard_index,
+                        'shards': shard_count,
+                        'bam_type': bam_type,
+                        'files': number_of_files,
+                        'run_cutoff': run_cutoff,
+                        'rows': len(cramino_extract),
+                        'properties': {}}
+    for idx, name in enumerate(cramino_summary_statistics_property_names):
+        property_statistics = StreamingPropertyStatistics(sketch_size, mode_counters)
+        property_statistics.update(values[:, idx])
+        shard_aggregates['properties'][name] = property_statistics.to_dict()
+    return shard_aggregates
+
+# get shard aggregate file name from shard summary table file name
+def get_shard_aggregate_file(shard_output_file):
+    return shard_output_file + '.shard.json'
+
+# write shard summary table (tab-delimited) and aggregates
+def write_cramino_report_shard(cramino_report_df, output_file, shard_index, shard_count, bam_type, number_of_files, run_cutoff=1):
+    cramino_report_df.to_csv(output_file, sep='\t', index=False)
+    with open(get_shard_aggregate_file(output_file), 'w') as outfile:
+        json.dump(make_shard_aggregates(cramino_report_df, shard_index, shard_count, bam_type, number_of_files, run_cutoff), outfile)
+
+# make summary statistics data frame (as in dashboard summary statistics sheet) from merged accumulators
+# returns data frame and properties whose mode was left blank (see StreamingPropertyStatistics.get_mode)
+def make_summary_statistics_from_aggregates(property_statistics, total):
+    summary_statistics_rows = []
+    uncertain_modes = []
+    for name, x in property_statistics.items():
+        summary_statistics_rows.append([name, total, x.min, x.max, x.mean if x.count > 0 else np.nan, x.sketch.get_quantile(0.5), x.get_mode(), x.get_standard_deviation()])
+        if x.is_mode_uncertain():
+            uncertain_modes.append(name)
+    return pd.DataFrame(summary_statistics_rows, columns=cramino_summary_statistics_column_names), uncertain_modes
+
+# merge shard summary tables and aggregates
+# shard rows are concatenated as text in shard order, so merged table matches unsharded parser output
+# returns merged summary statistics data frame and properties whose mode was left blank
+def merge_cramino_report_shards(shard_files, output_file):
+    shard_aggregates = []
+    for x in shard_files:
+        with open(get_shard_aggregate_file(x), 'r') as infile:
+            shard_aggregates.append((json.load(infile), x))
+    shard_aggregates.sort(key=lambda x: x[0]['shard'])
+    # check shards are complete and from same run type
+    shard_count = shard_aggregates[0][0]['shards']
+    if [x[0]['shard'] for x in shard_aggregates] != list(range(1, shard_count + 1)) or any(x[0]['shards'] != shard_count for x in shard_aggregates):
+        raise ValueError(f"Expected shards 1 to {shard_count} once each, got {', '.join(str(x[0]['shard']) + '/' + str(x[0]['shards']) for x in shard_aggregates)}")
+    if len(set(x[0]['bam_type'] for x in shard_aggregates)) > 1:
+        raise ValueError('Shards have different report types (--bam_type)')
+    # aggregates of earlier parser versions (value counts of unfiltered rows) cannot be merged
+    if any('run_cutoff' not in x[0] for x in shard_aggregates):
+        raise ValueError('Shard aggregates written by earlier parser version; run shards again')
+    if len(set(x[0]['run_cutoff'] for x in shard_aggregates)) > 1:
+        raise ValueError('Shards have different run cutoffs (--run_cutoff)')
+    # shards cut from different report lists would give missing or duplicate reports
+    if len(set(x[0]['files'] for x in shard_aggregates)) > 1:
+        raise ValueError(f"Shards were cut from report lists of different lengths ({', '.join(str(x[0]['shard']) + '/' + str(x[0]['shards']) + ': ' + str(x[0]['files']) + ' reports' for x in shard_aggregates)})")
+    # concatenate shard rows (header from first shard), moving merged table into place when complete
+    def write_merged_table(temporary_file):
+        header = None
+        with open(temporary_file, 'w') as outfile:
+            for current_aggregates, shard_file in shard_aggregates:
+                with open(shard_file, 'r') as infile:
+                    shard_header = infile.readline()
+                    if header is None:
+                        header = shard_header
+                        outfile.write(header)
+                    elif shard_header != header:
+                        raise ValueError(f'Shard {shard_file} has different columns')
+                    for line in infile:
+                        outfile.write(line)
+    write_file_atomically(output_file, write_merged_table)
+    # combine aggregates in shard order
+    property_statistics = {}
+    for name in cramino_summary_statistics_property_names:
+        property_statistics[name] = StreamingPropertyStatistics.from_dict(shard_aggregates[0][0]['properties'][name])
+        for current_aggregates, shard_file in shard_aggregates[1:]:
+            property_statistics[name].merge(StreamingPropertyStatistics.from_dict(current_aggregates['properties'][name]))
+    return make_summary_statistics_from_aggregates(property_statistics, sum(x[0]['rows'] for x in shard_aggregates))
@@ -0,0 +1,280 @@
+# bounded memory streaming summary statistics for very large summary tables
+# inputs are read in chunks, run cutoff applied to each chunk, and every property/group keeps one-pass accumulators:
+# count, mean and standard deviation (Welford/Chan updates), min/max, KLL quantile sketch (median),
+# and Misra-Gries heavy hitter counters (mode)
+# accumulators are mergeable and can be saved as JSON-compatible dictionaries (e.g., for shard aggregates)
+# plots are drawn from fixed-size random sample of samples per group (bottom-k sampling)
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import apply_cramino_report_schema
+from cardlongread_cramino.summary import cramino_summary_statistics_property_names, get_cramino_summary_table_read_columns
+
+# KLL quantile sketch (Karnin, Lang and Liberty 2016)
+# keeps about 3k values in levels of compactors; values at level h stand for 2^h samples
+# normalized rank error of quantiles is about 1.7% or less for k = 200 (99% confidence), independent of sample count
+class KLLSketch:
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.compactors = [np.empty(0)]
+        self.count = 0
+        # fixed seed so every run gives same estimates
+        self.rng = np.random.default_rng(seed)
+
+    # capacity of compactor level (smaller for lower levels)
+    def get_capacity(self, level):
+        return max(2, int(np.ceil(self.k * (2/3) ** (len(self.compactors) - level - 1))))
+
+    # add array of values
+    def update(self, values):
+        if len(values) == 0:
+            return
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.count += len(values)
+        self.compress()
+
+    # merge other sketch (e.g., of another shard) into this sketch: combine levels, then compact
+    def merge(self, other):
+        for level, compactor in enumerate(other.compactors):
+            if level == len(self.compactors):
+                self.compactors.append(np.empty(0))
+            self.compactors[level] = np.concatenate([self.compactors[level], compactor])
+        self.count += other.count
+        self.compress()
+
+    # save sketch as JSON-compatible dictionary
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'compactors': [x.tolist() for x in self.compactors]}
+
+    # load sketch saved with to_dict
+    @classmethod
+    def from_dict(cls, sketch_dict):
+        sketch = cls(sketch_dict['k'])
+        sketch.count = sketch_dict['count']
+        sketch.compactors = [np.array(x, dtype=float) for x in sketch_dict['compactors']]
+        return sketch
+
+    # compact full levels: sort, keep every other value (random offset) and promote kept values to next level
+    def compress(self):
+        level = 0
+        while level < len(self.compactors):
+            if len(self.compactors[level]) > self.get_capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                compactor = np.sort(self.compactors[level])
+                # odd value left at current level
+                if len(compactor) % 2 == 1:
+                    self.compactors[level] = compactor[-1:]
+                    compactor = compactor[:-1]
+                else:
+                    self.compactors[level] = np.empty(0)
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], compactor[self.rng.integers(2)::2]])
+            level += 1
+
+    # estimate quantile (0 to 1) from weighted retained values
+    # interpolated between neighbouring ranks as in numpy/pandas, so result is exact until first compaction
+    def get_quantile(self, quantile):
+        if self.count == 0:
+            return np.nan
+        values = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(x), 2**level) for level, x in enumerate(self.compactors)])
+        sort_order = np.argsort(values, kind='stable')
+        values = values[sort_order]
+        cumulative_weights = np.cumsum(weights[sort_order])
+        # 1-based ranks below and above quantile position
+        position = (cumulative_weights[-1] - 1) * quantile
+        lower_value = values[np.searchsorted(cumulative_weights, np.floor(position) + 1)]
+        upper_value = values[np.searchsorted(cumulative_weights, np.ceil(position) + 1)]
+        return lower_value + (position - np.floor(position)) * (upper_value - lower_value)
+
+# one-pass accumulators for one property of one group
+class StreamingPropertyStatistics:
+    def __init__(self, sketch_size=200, mode_counters=1000):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.sketch = KLLSketch(sketch_size)
+        self.mode_counters = mode_counters
+        # Misra-Gries counters, and total subtracted from every counter (upper bound on count underestimate)
+        self.mode_values = np.empty(0)
+        self.mode_counts = np.empty(0, dtype=np.int64)
+        self.mode_error = 0
+
+    # add chunk of values (missing values skipped)
+    def update(self, values):
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        chunk_mean = values.mean()
+        self.combine_moments(len(values), chunk_mean, ((values - chunk_mean)**2).sum(), values.min(), values.max())
+        self.sketch.update(values)
+        self.update_mode_counters(values, np.ones(len(values), dtype=np.int64))
+
+    # combine count, mean, sum of squared deviations, min and max of other values with running values (Chan et al.)
+    def combine_moments(self, other_count, other_mean, other_m2, other_min, other_max):
+        count = self.count + other_count
+        delta = other_mean - self.mean
+        self.mean = self.mean + delta * other_count / count
+        self.m2 = self.m2 + other_m2 + delta**2 * self.count * other_count / count
+        self.count = count
+        self.min = np.fmin(self.min, other_min)
+        self.max = np.fmax(self.max, other_max)
+
+    # Misra-Gries update with value counts (error: total already subtracted from counts, when merging other counters)
+    # counters kept as value and count arrays in order of first occurrence (earlier values win mode ties)
+    def update_mode_counters(self, values, counts, error=0):
+        value_codes, unique_values = pd.factorize(np.concatenate([self.mode_values, values]))
+        self.mode_values = unique_values
+        self.mode_counts = np.bincount(value_codes, weights=np.concatenate([self.mode_counts, counts])).astype(np.int64)
+        self.mode_error += error
+        if len(self.mode_values) > self.mode_counters:
+            # subtract (counters + 1)-th largest count from every counter and drop counters at or below zero
+            threshold = np.partition(self.mode_counts, len(self.mode_counts) - self.mode_counters - 1)[len(self.mode_counts) - self.mode_counters - 1]
+            keep = self.mode_counts > threshold
+            self.mode_values = self.mode_values[keep]
+            self.mode_counts = self.mode_counts[keep] - threshold
+            self.mode_error += threshold
+
+    # most common value among counters, ties broken by first occurrence (exact if counters never saturated)
+    # once counters saturate (more distinct values than counters), counts are underestimated by up to mode_error,
+    # so mode is only returned if top count beats every other value's largest possible count; otherwise NaN (left blank)
+    def get_mode(self):
+        if len(self.mode_values) == 0:
+            return np.nan
+        top_idx = np.argmax(self.mode_counts)
+        if self.mode_error == 0:
+            return self.mode_values[top_idx]
+        other_counts = np.delete(self.mode_counts, top_idx)
+        if self.mode_counts[top_idx] > max(other_counts.max() if len(other_counts) > 0 else 0, 0) + self.mode_error:
+            return self.mode_values[top_idx]
+        return np.nan
+
+    # merge accumulators of other values (e.g., of another shard) into these accumulators
+    def merge(self, other):
+        if other.count == 0:
+            return
+        self.combine_moments(other.count, other.mean, other.m2, other.min, other.max)
+        self.sketch.merge(other.sketch)
+        self.update_mode_counters(other.mode_values, other.mode_counts, other.mode_error)
+
+    # save accumulators as JSON-compatible dictionary (missing min/max as None)
+    def to_dict(self):
+        return {'count': self.count,
+                'mean': float(self.mean),
+                'm2': float(self.m2),
+                'min': None if np.isnan(self.min) else float(self.min),
+                'max': None if np.isnan(self.max) else float(self.max),
+                'sketch': self.sketch.to_dict(),
+                'mode_counters': self.mode_counters,
+                'mode_values': self.mode_values.tolist(),
+                'mode_counts': self.mode_counts.tolist(),
+                'mode_error': int(self.mode_error)}
+
+    # load accumulators saved with to_dict
+    @classmethod
+    def from_dict(cls, statistics_dict):
+        statistics = cls(statistics_dict['sketch']['k'], statistics_dict['mode_counters'])
+        statistics.count = statistics_dict['count']
+        statistics.mean = statistics_dict['mean']
+        statistics.m2 = statistics_dict['m2']
+        statistics.min = np.nan if statistics_dict['min'] is None else statistics_dict['min']
+        statistics.max = np.nan if statistics_dict['max'] is None else statistics_dict['max']
+        statistics.sketch = KLLSketch.from_dict(statistics_dict['sketch'])
+        statistics.mode_values = np.array(statistics_dict['mode_values'], dtype=float)
+        statistics.mode_counts = np.array(statistics_dict['mode_counts'], dtype=np.int64)
+        statistics.mode_error = statistics_dict['mode_error']
+        return statistics
+
+    # whether mode was left blank because counters saturated
+    def is_mode_uncertain(self):
+        return (self.mode_error > 0) and np.isnan(self.get_mode())
+
+    def get_standard_deviation(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+# read summary table in chunks (tab-delimited, parquet row group batches, or feather record batches)
+def iter_cramino_summary_table_chunks(input_file, columns=None, chunk_size=100000):
+    if input_file.lower().endswith(('.parquet','.pq','.feather','.arrow')):
+        # pyarrow is only needed for columnar input
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            import pyarrow.ipc
+        except ImportError:
+            quit('ERROR: Parquet/feather input requires the pyarrow module.')
+        if input_file.lower().endswith(('.parquet','.pq')):
+            for batch in pyarrow.parquet.ParquetFile(input_file, memory_map=True).iter_batches(batch_size=chunk_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            with pyarrow.memory_map(input_file) as source:
+                reader = pyarrow.ipc.open_file(source)
+                for idx in range(reader.num_record_batches):
+                    batch = reader.get_batch(idx)
+                    if columns is not None:
+                        batch = batch.select(columns)
+                    yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_file, sep='\t', usecols=columns, chunksize=chunk_size)
+
+# stream one or more summary tables into summary statistics and plot sample
+# runs below run cutoff (Gb) are removed from each chunk; multiple inputs are labeled by group name
+# plot sample keeps at most sample_size samples per group with smallest fixed-seed random keys,
+# which is a uniform random sample of each group whatever the chunk size
+# returns plot sample data frame, whether grouped, summary statistics worksheet names and tables, samples per group,
+# and (group, property) pairs whose mode was left blank (more distinct values than mode counters, see get_mode)
+def stream_cramino_summary_tables(input_files, names=None, run_cutoff=1, show_group_count=False, chunk_size=100000, sample_size=100000, sketch_size=200, mode_counters=1000):
+    grouped = len(input_files) > 1
+    group_names = names if grouped is True else [None]
+    group_statistics = {x: {y: StreamingPropertyStatistics(sketch_size, mode_counters) for y in cramino_summary_statistics_property_names} for x in group_names}
+    group_totals = {x: 0 for x in group_names}
+    rng = np.random.default_rng(0)
+    plot_samples = []
+    for input_file, group_name in zip(input_files, group_names):
+        group_sample = None
+        rows_read = 0
+        for chunk in iter_cramino_summary_table_chunks(input_file, get_cramino_summary_table_read_columns(input_file), chunk_size):
+            # filter out low output runs
+            chunk = chunk[chunk['Yield (Gb)'] > run_cutoff].copy()
+            # skip empty chunks (e.g., header-only input, or all runs below cutoff)
+            if len(chunk) == 0:
+                continue
+            # add N50 (kb) column
+            chunk['N50 (kb)'] = round(chunk['N50']/1000,3)
+            group_totals[group_name] += len(chunk)
+            for name in cramino_summary_statistics_property_names:
+                group_statistics[group_name][name].update(chunk[name].to_numpy(dtype=float))
+            # keep samples with smallest random keys (and input order, restored below)
+            chunk['Sample key'] = rng.random(len(chunk))
+            chunk['Sample order'] = np.arange(rows_read, rows_read + len(chunk))
+            rows_read += len(chunk)
+            group_sample = chunk if group_sample is None else pd.concat([group_sample, chunk], ignore_index=True)
+            if len(group_sample) > sample_size:
+                group_sample = group_sample.nsmallest(sample_size, 'Sample key')
+        if group_sample is not None:
+            group_sample = group_sample.sort_values('Sample order', kind='stable').drop(columns=['Sample key', 'Sample order'])
+            if grouped is True:
+                group_sample['Group'] = group_name
+                if show_group_count is True:
+                    # group count from all samples, not just plot sample
+                    group_sample['Group and count'] = group_name + "\nn=" + str(group_totals[group_name])
+            plot_samples.append(group_sample)
+    # no rows in any input (nothing to plot)
+    if len(plot_samples) == 0:
+        quit('ERROR: No runs above run cutoff (-run_cutoff) in input tables.')
+    cramino_extract = apply_cramino_report_schema(pd.concat(plot_samples, ignore_index=True))
+    # summary statistics tables in same layout as exact summary statistics
+    column_names = ['Property', 'Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']
+    table_sheet_names = []
+    tables = []
+    uncertain_modes = []
+    for group_name in group_names:
+        summary_statistics_rows = []
+        for name in cramino_summary_statistics_property_names:
+            x = group_statistics[group_name][name]
+            summary_statistics_rows.append([name, group_totals[group_name], x.min, x.max, x.mean if x.count > 0 else np.nan, x.sketch.get_quantile(0.5), x.get_mode(), x.get_standard_deviation()])
+            if x.is_mode_uncertain():
+                uncertain_modes.append((group_name, name))
+        table_sheet_names.append('Summary statistics report' if group_name is None else group_name + ' statistics')
+        tables.append(pd.DataFrame(summary_statistics_rows, columns=column_names))
+    return cramino_extract, grouped, table_sheet_names, tables, group_totals, uncertain_modes
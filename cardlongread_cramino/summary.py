@@ -0,0 +1,297 @@
+# long read sequencing cramino QC summary table loading and summary statistics
+# summary table generated by cramino report parser
+import pandas as pd
+import numpy as np
+from cardlongread_cramino.report import apply_cramino_report_schema, get_cramino_property_values
+
+# columns of summary table used by dashboard
+cramino_summary_input_columns = ['Number of alignments','Percent of total reads','Yield (Gb)','Mean Coverage','Yield (Gb) [>25kb]','N50','N75','Median length','Mean length','Median identity','Mean identity','Median identity Q score','Mean identity Q score']
+# columns of summary table used by dashboard if present (not in summary tables from earlier parser versions or other tools)
+# filenames identify samples in QC flags
+cramino_summary_optional_columns = ['Filename','Creation time']
+# properties with summary statistics and plots (summary table columns plus N50 in kb)
+cramino_summary_statistics_property_names = ['Number of alignments','Percent of total reads','Yield (Gb)','Mean Coverage','Yield (Gb) [>25kb]','N50','N50 (kb)','N75','Median length','Mean length','Median identity','Mean identity','Median identity Q score','Mean identity Q score']
+
+# read summary table generated by cramino report parser
+# tab-delimited tsv, or typed parquet/feather (only requested columns read, memory mapped)
+def read_cramino_summary_table(input_file, columns=None):
+    if input_file.lower().endswith(('.parquet','.pq','.feather','.arrow')):
+        # pyarrow is only needed for columnar input
+        try:
+            import pyarrow.parquet
+            import pyarrow.feather
+        except ImportError:
+            quit('ERROR: Parquet/feather input requires the pyarrow module.')
+        if input_file.lower().endswith(('.parquet','.pq')):
+            summary_table = pyarrow.parquet.read_table(input_file, columns=columns, memory_map=True)
+        else:
+            summary_table = pyarrow.feather.read_table(input_file, columns=columns, memory_map=True)
+        return summary_table.to_pandas()
+    else:
+        return pd.read_csv(input_file, sep='\t', usecols=columns)
+
+# get column names of summary table file (header or columnar schema only)
+def get_cramino_summary_table_columns(input_file):
+    if input_file.lower().endswith(('.parquet','.pq','.feather','.arrow')):
+        try:
+            import pyarrow.parquet
+            import pyarrow.ipc
+        except ImportError:
+            quit('ERROR: Parquet/feather input requires the pyarrow module.')
+        if input_file.lower().endswith(('.parquet','.pq')):
+            return pyarrow.parquet.read_schema(input_file).names
+        with pyarrow.memory_map(input_file) as source:
+            return pyarrow.ipc.open_file(source).schema.names
+    return list(pd.read_csv(input_file, sep='\t', nrows=0).columns)
+
+# get columns to read from summary table file or data frame: required columns, plus optional columns present
+def get_cramino_summary_table_read_columns(input_table, columns=cramino_summary_input_columns, optional_columns=cramino_summary_optional_columns):
+    if isinstance(input_table, pd.DataFrame):
+        available_columns = input_table.columns
+    else:
+        available_columns = get_cramino_summary_table_columns(input_table)
+    return columns + [x for x in optional_columns if x in available_columns]
+
+# get dashboard columns from summary table file or data frame (e.g., parser output in same process)
+def get_cramino_summary_table(input_table, columns=cramino_summary_input_columns, optional_columns=cramino_summary_optional_columns):
+    read_columns = get_cramino_summary_table_read_columns(input_table, columns, optional_columns)
+    if isinstance(input_table, pd.DataFrame):
+        # parser output keeps report field values as written, so convert to numbers as read_csv would
+        # (creation time converted with other schema types after loading)
+        summary_table = input_table[read_columns].copy()
+        summary_table[columns] = summary_table[columns].apply(pd.to_numeric, errors='coerce')
+        return summary_table
+    return read_cramino_summary_table(input_table, read_columns)
+
+# load one or more summary tables (files or data frames) for dashboard
+# runs below run cutoff (Gb) are removed; multiple inputs are labeled by group name and combined
+# alternatively, groups of single combined input are read from group_column (missing groups labeled NA)
+# combined table is stored with compact schema types (integer counts, float32 where lossless, categorical groups)
+# returns combined data frame and whether it is grouped
+def load_cramino_summary_tables(input_tables, names=None, run_cutoff=1, show_group_count=False, group_column=None):
+    # case if groups in column of one combined input table
+    if group_column is not None:
+        if group_column not in get_cramino_summary_table_read_columns(input_tables[0], [], [group_column]):
+            quit('ERROR: Group column ' + group_column + ' not found in input table.')
+        # group column read in addition to dashboard columns (unless it is one of them)
+        group_read_columns=[] if group_column in cramino_summary_input_columns + cramino_summary_optional_columns else [group_column]
+        cramino_extract_initial=get_cramino_summary_table(input_tables[0], optional_columns=cramino_summary_optional_columns + group_read_columns)
+        # first filter out low output runs
+        cramino_extract = cramino_extract_initial[cramino_extract_initial['Yield (Gb)'] > run_cutoff].copy()
+        # group labels as text, then group counts of all groups from one value count
+        cramino_extract['Group']=cramino_extract[group_column].astype(str).where(cramino_extract[group_column].notna(),'NA')
+        if (group_column != 'Group') and (len(group_read_columns) > 0):
+            cramino_extract.drop(columns=group_column,inplace=True)
+        if show_group_count is True:
+            group_counts=cramino_extract['Group'].map(cramino_extract['Group'].value_counts())
+            cramino_extract['Group and count']=cramino_extract['Group'] + "\nn=" + group_counts.astype(str)
+        grouped=True
+    # case if just one input table provided
+    elif len(input_tables)==1:
+        cramino_extract_initial=get_cramino_summary_table(input_tables[0])
+        # first filter out low output runs
+        cramino_extract = cramino_extract_initial[cramino_extract_initial['Yield (Gb)'] > run_cutoff].copy()
+        # set grouped variable
+        grouped=False
+    # what if multiple input tables provided
+    else:
+        # store input tables in list as long input table set
+        cramino_extract_initial_list=[0] * len(input_tables)
+        for idx, i in enumerate(input_tables):
+            cramino_extract_initial_list[idx]=get_cramino_summary_table(i)
+            # first filter out low output runs
+            cramino_extract_initial_list[idx]=cramino_extract_initial_list[idx][cramino_extract_initial_list[idx]['Yield (Gb)'] > run_cutoff].copy()
+            # add group name to each table in list
+            cramino_extract_initial_list[idx]['Group']=names[idx]
+            if show_group_count is True:
+                # if group count specified, add group count to group name
+                # in this way, show n=717 or similar below group names in all plots
+                cramino_extract_initial_list[idx]['Group and count']=names[idx] + "\nn=" + str(len(cramino_extract_initial_list[idx]))
+        # combine groups into single concatenated data table
+        cramino_extract=pd.concat(cramino_extract_initial_list[:],ignore_index=True)
+        # set group variable
+        grouped=True
+    # add N50 (kb) column
+    cramino_extract['N50 (kb)']=round(cramino_extract['N50']/1000,3)
+    # fix indices
+    cramino_extract.reset_index(drop=True,inplace=True)
+    apply_cramino_report_schema(cramino_extract)
+    return cramino_extract, grouped
+
+# summary statistics table columns
+cramino_summary_statistics_column_names = ['Property', 'Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']
+
+# get summary statistics (total, min, max, mean, median, mode, and standard deviation) for every property and group at once
+# vectorized replacement for per-column statistics module calls
+# returns groups (in order of appearance; [None] if no group variable), sample count per group,
+# min/max/mean/median/std per group (rows are group codes, columns are (property, statistic)) and mode per property and group
+def get_grouped_summary_statistics(input_data_frame, property_names, group_variable=None):
+    # integer group codes (all zero if no group variable)
+    if group_variable is None:
+        group_codes = np.zeros(len(input_data_frame), dtype=np.int64)
+        group_uniques = [None]
+    else:
+        group_codes, group_uniques = pd.factorize(input_data_frame[group_variable])
+        group_uniques = list(group_uniques)
+    number_of_groups = len(group_uniques)
+    # property values as single float64 array (rows are samples, columns are properties)
+    values = get_cramino_property_values(input_data_frame, property_names)
+    # single groupby pass for all properties and groups
+    # note that total is the total run count (across experiments and samples)
+    grouped_statistics = pd.DataFrame(values, columns=property_names).groupby(group_codes).agg(['min', 'max', 'mean', 'median', 'std'])
+    group_totals = np.bincount(group_codes, minlength=number_of_groups)
+    # mode as in statistics.mode: most common value, ties broken by first occurrence
+    # label each value with its (property, group) cell, then count values per cell in one pass
+    flat_values = values.ravel(order='F')
+    flat_cells = np.repeat(np.arange(len(property_names)), len(values)) * number_of_groups + np.tile(group_codes, len(property_names))
+    value_codes, unique_values = pd.factorize(flat_values)
+    not_missing = value_codes >= 0
+    # factorize keeps order of first occurrence
+    cell_value_codes, unique_cell_values = pd.factorize(flat_cells[not_missing] * len(unique_values) + value_codes[not_missing])
+    cell_value_counts = np.bincount(cell_value_codes)
+    cells = unique_cell_values // len(unique_values)
+    # sort by cell, then count (descending), then first occurrence, and take first entry per cell
+    mode_order = np.lexsort((np.arange(len(cells)), -cell_value_counts, cells))
+    mode_order = mode_order[np.r_[True, cells[mode_order][1:] != cells[mode_order][:-1]]]
+    modes = np.full(len(property_names) * number_of_groups, np.nan)
+    modes[cells[mode_order]] = unique_values[unique_cell_values[mode_order] % len(unique_values)]
+    modes = modes.reshape(len(property_names), number_of_groups)
+    return group_uniques, group_totals, grouped_statistics, modes
+
+# get summary statistics for every property and group at once (see get_grouped_summary_statistics)
+# returns dictionary of summary statistics data frames keyed by group name (single None key if no group variable)
+def make_grouped_summary_statistics_data_frames(input_data_frame, property_names, group_variable=None, group_names=None):
+    # set column names
+    column_names = cramino_summary_statistics_column_names
+    group_uniques, group_totals, grouped_statistics, modes = get_grouped_summary_statistics(input_data_frame, property_names, group_variable)
+    if group_variable is None:
+        group_names = [None]
+    elif group_names is None:
+        group_names = group_uniques
+    # split into one data frame per group with properties in input order
+    summary_statistics_dfs = {}
+    for name in group_names:
+        summary_statistics_df = pd.DataFrame(index=property_names, columns=column_names)
+        summary_statistics_df['Property'] = property_names
+        if name in group_uniques:
+            group_code = group_uniques.index(name)
+            summary_statistics_df['Total'] = group_totals[group_code]
+            for column_name, statistic in zip(['Min', 'Max', 'Mean', 'Median', 'Standard Deviation'], ['min', 'max', 'mean', 'median', 'std']):
+                summary_statistics_df[column_name] = [grouped_statistics.loc[group_code, (i, statistic)] for i in property_names]
+            summary_statistics_df['Mode'] = modes[:, group_code]
+        else:
+            # no samples in group
+            summary_statistics_df['Total'] = 0
+        summary_statistics_dfs[name] = summary_statistics_df
+    # return populated summary statistics data frames
+    return summary_statistics_dfs
+
+# make long-format summary statistics table of all groups (one row per group and property, groups in group name order)
+# built from single groupby pass without splitting data by group, so cost does not grow with number of groups
+def make_long_summary_statistics_data_frame(input_data_frame, property_names, group_variable, group_names=None):
+    group_uniques, group_totals, grouped_statistics, modes = get_grouped_summary_statistics(input_data_frame, property_names, group_variable)
+    if group_names is None:
+        group_names = group_uniques
+    # group code of each group name (-1 for groups without samples)
+    group_code_lookup = {name: code for code, name in enumerate(group_uniques)}
+    group_codes = np.array([group_code_lookup.get(name, -1) for name in group_names], dtype=np.int64)
+    # statistics as (group, property) arrays, flattened group by group
+    long_statistics_df = pd.DataFrame({'Group': np.repeat(np.asarray(group_names, dtype=object), len(property_names)),
+                                       'Property': np.tile(np.asarray(property_names, dtype=object), len(group_names)),
+                                       'Total': np.repeat(np.where(group_codes >= 0, group_totals[group_codes], 0), len(property_names))})
+    for column_name, statistic in zip(['Min', 'Max', 'Mean', 'Median'], ['min', 'max', 'mean', 'median']):
+        long_statistics_df[column_name] = grouped_statistics.xs(statistic, axis=1, level=1)[property_names].reindex(group_codes).to_numpy().ravel()
+    long_statistics_df['Mode'] = np.where(group_codes >= 0, modes[:, group_codes], np.nan).T.ravel()
+    long_statistics_df['Standard Deviation'] = grouped_statistics.xs('std', axis=1, level=1)[property_names].reindex(group_codes).to_numpy().ravel()
+    return long_statistics_df
+
+# combine summary statistics tables of each group (e.g., from streaming mode) into long-format table
+def combine_summary_statistics_tables(group_names, tables):
+    return pd.concat([table.assign(Group=name)[['Group'] + cramino_summary_statistics_column_names] for name, table in zip(group_names, tables)], ignore_index=True)
+
+# make summary statistic data frame
+def make_summary_statistics_data_frame(input_data_frame, property_names):
+    return make_grouped_summary_statistics_data_frames(input_data_frame, property_names)[None]
+
+# make summary statistics tables for dashboard workbook
+# one table for all samples, or one table per group (in group name order) if grouped
+# (single long-format Group statistics table of all groups if long_format set, e.g., for hundreds of groups)
+# returns worksheet names and tables
+def make_summary_statistics_tables(cramino_extract, grouped=False, names=None, property_names=cramino_summary_statistics_property_names, long_format=False):
+    if grouped is False:
+        return ['Summary statistics report'], [make_summary_statistics_data_frame(cramino_extract, property_names)]
+    if long_format is True:
+        return ['Group statistics'], [make_long_summary_statistics_data_frame(cramino_extract, property_names, 'Group', names)]
+    # make data frames for all groups in single pass
+    cramino_summary_statistics_dfs = make_grouped_summary_statistics_data_frames(cramino_extract, property_names, 'Group', names)
+    return [i + ' statistics' for i in names], [cramino_summary_statistics_dfs[i] for i in names]
+
+# two-sided 95% Student t quantile for given degrees of freedom (without scipy)
+# exact for 1 and 2 degrees of freedom, Cornish-Fisher expansion otherwise (within 0.2%)
+def get_t_quantile_95(degrees_of_freedom):
+    degrees_of_freedom = np.asarray(degrees_of_freedom, dtype=float)
+    z = 1.959963984540054
+    t_quantile = z + (z**3+z)/(4*degrees_of_freedom) + (5*z**5+16*z**3+3*z)/(96*degrees_of_freedom**2) + (3*z**7+19*z**5+17*z**3-15*z)/(384*degrees_of_freedom**3) + (79*z**9+776*z**7+1482*z**5-1920*z**3-945*z)/(92160*degrees_of_freedom**4)
+    t_quantile = np.where(degrees_of_freedom == 1, 12.706204736174707, t_quantile)
+    t_quantile = np.where(degrees_of_freedom == 2, 4.302652729749464, t_quantile)
+    return t_quantile
+
+# least squares regression of y on x for every group at once
+# sums for all groups are accumulated in one vectorized pass, then slope, intercept, r squared and
+# residual standard error follow analytically (no bootstrap); samples missing x or y are skipped
+# groups in order of appearance (single 'All samples' group if no group variable)
+# returns data frame with one row per group, including x mean/sum of squares/range for confidence bands
+def make_regression_fits(input_data_frame, x_variable, y_variable, group_variable=None):
+    x_values = get_cramino_property_values(input_data_frame, [x_variable])[:, 0]
+    y_values = get_cramino_property_values(input_data_frame, [y_variable])[:, 0]
+    if group_variable is None:
+        group_codes = np.zeros(len(input_data_frame), dtype=np.int64)
+        group_keys = ['All samples']
+    else:
+        group_codes, group_keys = pd.factorize(input_data_frame[group_variable])
+        group_keys = list(group_keys)
+    # keep complete pairs only
+    complete = np.isfinite(x_values) & np.isfinite(y_values) & (group_codes >= 0)
+    x_values = x_values[complete]
+    y_values = y_values[complete]
+    group_codes = group_codes[complete]
+    # centre on overall means before summing to limit rounding error
+    x_offset = x_values.mean() if len(x_values) > 0 else 0
+    y_offset = y_values.mean() if len(y_values) > 0 else 0
+    x_values = x_values - x_offset
+    y_values = y_values - y_offset
+    number_of_groups = len(group_keys)
+    n = np.bincount(group_codes, minlength=number_of_groups).astype(float)
+    sum_x = np.bincount(group_codes, weights=x_values, minlength=number_of_groups)
+    sum_y = np.bincount(group_codes, weights=y_values, minlength=number_of_groups)
+    sum_xx = np.bincount(group_codes, weights=x_values*x_values, minlength=number_of_groups)
+    sum_xy = np.bincount(group_codes, weights=x_values*y_values, minlength=number_of_groups)
+    sum_yy = np.bincount(group_codes, weights=y_values*y_values, minlength=number_of_groups)
+    # group x ranges (for drawing fitted line)
+    x_min = np.full(number_of_groups, np.nan)
+    x_max = np.full(number_of_groups, np.nan)
+    np.fmin.at(x_min, group_codes, x_values)
+    np.fmax.at(x_max, group_codes, x_values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = sum_x / n
+        y_mean = sum_y / n
+        # centered sums of squares and cross products
+        sxx = sum_xx - n * x_mean**2
+        sxy = sum_xy - n * x_mean * y_mean
+        syy = sum_yy - n * y_mean**2
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        r_squared = np.where((sxx > 0) & (syy > 0), sxy**2 / (sxx * syy), np.nan)
+        residual_sum_of_squares = np.maximum(syy - slope * sxy, 0)
+        residual_standard_error = np.where(n > 2, np.sqrt(residual_sum_of_squares / (n - 2)), np.nan)
+    # shift back from centered coordinates
+    intercept = (y_mean + y_offset) - slope * (x_mean + x_offset)
+    return pd.DataFrame({'Group': group_keys,
+                         'n': n.astype(np.int64),
+                         'Slope': slope,
+                         'Intercept': intercept,
+                         'R squared': r_squared,
+                         'Residual standard error': residual_standard_error,
+                         'X mean': x_mean + x_offset,
+                         'X sum of squares': sxx,
+                         'X min': x_min + x_offset,
+                         'X max': x_max + x_offset})
@@ -0,0 +1,70 @@
+# run date trends for cramino QC dashboard
+# runs are binned by report creation time into weekly or monthly periods per group, and each period is summarized
+# (runs, median, mean and trailing rolling mean of selected properties), so trend plots draw one point per period
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.report import get_cramino_property_values
+
+# properties with trend plots
+cramino_trend_property_names = ['Yield (Gb)','N50 (kb)','Median identity Q score']
+# trend periods: pandas period frequency, rolling mean window (periods) and worksheet label
+cramino_trend_periods = {
+    'weekly': {'frequency': 'W-SUN', 'rolling_window': 4, 'label': 'Weekly'},
+    'monthly': {'frequency': 'M', 'rolling_window': 3, 'label': 'Monthly'},
+}
+
+# check whether summary table has any runs with creation time
+def has_creation_times(cramino_extract):
+    return ('Creation time' in cramino_extract.columns) and (cramino_extract['Creation time'].notna().any())
+
+# summarize runs per group and period (runs without creation time skipped)
+# columns: Group (if group variable), Period start, Runs, and median, mean and rolling mean of each property,
+# where rolling mean is mean of all runs in current and previous periods of rolling window (empty periods included)
+# groups in order of group variable (categories if categorical), periods in time order
+# returns None if no run has creation time
+def make_trend_aggregates(cramino_extract, period='monthly', group_variable=None, property_names=cramino_trend_property_names):
+    if not has_creation_times(cramino_extract):
+        return None
+    period_settings = cramino_trend_periods[period]
+    dated = cramino_extract['Creation time'].notna().to_numpy()
+    period_starts = cramino_extract.loc[dated, 'Creation time'].dt.to_period(period_settings['frequency']).dt.start_time.to_numpy()
+    values = get_cramino_property_values(cramino_extract.loc[dated], property_names)
+    if group_variable is None:
+        group_codes = np.zeros(len(values), dtype=np.int64)
+        group_names = [None]
+    else:
+        group_values = cramino_extract.loc[dated, group_variable]
+        if isinstance(group_values.dtype, pd.CategoricalDtype):
+            group_codes = group_values.cat.codes.to_numpy()
+            group_names = list(group_values.cat.categories)
+        else:
+            group_codes, group_names = pd.factorize(group_values)
+            group_names = list(group_names)
+    # one groupby pass for period statistics of all properties and groups
+    period_values = pd.DataFrame(values, columns=property_names)
+    period_values['Group code'] = group_codes
+    period_values['Period start'] = period_starts
+    period_groups = period_values.groupby(['Group code', 'Period start'], sort=True)
+    period_statistics = period_groups[property_names].agg(['median', 'mean', 'sum', 'count'])
+    runs = period_groups.size()
+    trend_tables = []
+    for group_code, group_runs in runs.groupby(level=0, sort=True):
+        group_statistics = period_statistics.loc[group_code]
+        # every period between first and last run of group, so rolling window covers fixed time span
+        all_period_starts = pd.period_range(group_statistics.index.min(), group_statistics.index.max(), freq=period_settings['frequency']).start_time
+        trend_table = pd.DataFrame({'Period start': group_statistics.index, 'Runs': group_runs.to_numpy()})
+        for name in property_names:
+            rolling_sum = group_statistics[(name, 'sum')].reindex(all_period_starts, fill_value=0).rolling(period_settings['rolling_window'], min_periods=1).sum()
+            rolling_count = group_statistics[(name, 'count')].reindex(all_period_starts, fill_value=0).rolling(period_settings['rolling_window'], min_periods=1).sum()
+            trend_table[name + ' median'] = group_statistics[(name, 'median')].to_numpy()
+            trend_table[name + ' mean'] = group_statistics[(name, 'mean')].to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                trend_table[name + ' rolling mean'] = (rolling_sum / rolling_count).reindex(group_statistics.index).to_numpy()
+        if group_variable is not None:
+            trend_table.insert(0, 'Group', group_names[group_code])
+        trend_tables.append(trend_table)
+    trend_table = pd.concat(trend_tables, ignore_index=True)
+    if group_variable is not None:
+        # all groups kept as categories (also groups without dated runs), so plot colors match other figures
+        trend_table['Group'] = pd.Categorical(trend_table['Group'], categories=group_names)
+    return trend_table
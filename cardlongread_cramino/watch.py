@@ -0,0 +1,156 @@
+# long read sequencing cramino QC watch mode
+# polls cramino report directory and keeps summary table (and optionally dashboard) up to date
+# only new or changed reports are parsed (report cache), outputs are only rewritten when their data changed,
+# and figures whose plotted columns and options are unchanged are reused (figure cache)
+import os
+import sys
+import time
+import argparse
+from cardlongread_cramino.report import list_cramino_reports, make_cramino_report_data_frame, write_cramino_report_data_frame, get_output_format
+from cardlongread_cramino.summary import load_cramino_summary_tables
+from cardlongread_cramino.dashboard import make_dashboard
+from cardlongread_cramino.files import write_file_atomically
+
+# print timestamped progress message
+def print_watch_message(message):
+    print(time.strftime('%Y-%m-%d %H:%M:%S') + ' ' + message, file=sys.stderr, flush=True)
+
+# get completed reports with their modification time and size
+# report counts as complete once unchanged for settle_time seconds (debounce for reports still being written)
+def get_completed_reports(cramino_dir, input_format='text', settle_time=30):
+    completed_reports = {}
+    current_time = time.time()
+    for x in list_cramino_reports(cramino_dir, input_format=input_format):
+        try:
+            file_stat = os.stat(x)
+        except FileNotFoundError:
+            # removed since listing
+            continue
+        if current_time - file_stat.st_mtime >= settle_time:
+            completed_reports[x] = (file_stat.st_mtime_ns, file_stat.st_size)
+    return completed_reports
+
+# write summary table atomically, so readers never see partial table
+def write_summary_table_atomically(cramino_report_df, output_file):
+    write_file_atomically(output_file, lambda temporary_file: write_cramino_report_data_frame(cramino_report_df, temporary_file, get_output_format(output_file)))
+
+# get dashboard data columns that differ between previous and current dashboard data (all columns if no previous data)
+def get_changed_columns(previous_extract, cramino_extract):
+    if previous_extract is None:
+        return list(cramino_extract.columns)
+    return [x for x in cramino_extract.columns if (x not in previous_extract.columns) or (not cramino_extract[x].equals(previous_extract[x]))] + [x for x in previous_extract.columns if x not in cramino_extract.columns]
+
+# get order of completed reports in summary table
+# reports of previous update keep their position (also when rewritten), and new reports are appended in order of
+# modification time, so rewriting report does not reorder summary table and dashboard data
+def get_report_order(completed_reports, previous_files=None):
+    if previous_files is None:
+        previous_files = []
+    files = [x for x in previous_files if x in completed_reports]
+    known_files = set(files)
+    return files + sorted((x for x in completed_reports if x not in known_files), key=lambda x: (completed_reports[x][0], x))
+
+# update summary table (and dashboard) from completed reports (in summary table order, see get_report_order)
+# summary table only rewritten if its rows changed, and dashboard only if its data (runs above run cutoff) changed
+# (e.g., nothing rewritten for reports rewritten with same values, and no dashboard rebuild for new runs below cutoff);
+# in rebuilt dashboard, figures of unchanged columns come from figure cache
+# returns summary table, dashboard data (None without dashboard) and changed dashboard data columns
+def update_cramino_outputs(files, bam_type, output_file, cache, input_format='text', workers=1, dashboard_file=None, run_cutoff=1, dashboard_options=None, previous_report_df=None, previous_extract=None):
+    cramino_report_df = make_cramino_report_data_frame(files, bam_type, workers, cache, input_format)
+    if (previous_report_df is None) or (not cramino_report_df.equals(previous_report_df)):
+        write_summary_table_atomically(cramino_report_df, output_file)
+    cramino_extract = None
+    changed_columns = []
+    if dashboard_file is not None:
+        cramino_extract, grouped = load_cramino_summary_tables([cramino_report_df], run_cutoff=run_cutoff)
+        changed_columns = get_changed_columns(previous_extract, cramino_extract)
+        if len(changed_columns) > 0:
+            make_dashboard(cramino_extract, dashboard_file, grouped, **(dashboard_options or {}))
+    return cramino_report_df, cramino_extract, changed_columns
+
+# watch report directory, updating outputs whenever completed reports are added, changed or removed
+# outputs are left untouched until at least one report is complete
+# failed polls (e.g., report removed while parsed, unreadable file, no samples above run cutoff) are logged and
+# retried on next poll; outputs are written atomically, so previous outputs are kept
+# returns whether last poll succeeded
+def watch_cramino_reports(cramino_dir, bam_type, output_file, cache, input_format='text', workers=1, dashboard_file=None, run_cutoff=1, dashboard_options=None, poll_interval=60, settle_time=30, once=False):
+    previous_reports = None
+    # outputs of last successful update (compared with new outputs, so unchanged outputs are not rewritten)
+    previous_files = None
+    previous_report_df = None
+    previous_extract = None
+    while True:
+        try:
+            completed_reports = get_completed_reports(cramino_dir, input_format, settle_time)
+            if (completed_reports != previous_reports) and (len(completed_reports) > 0):
+                if previous_reports is None:
+                    previous_reports = {}
+                changed_reports = sum(1 for x in completed_reports if previous_reports.get(x) != completed_reports[x])
+                removed_reports = len(set(previous_reports) - set(completed_reports))
+                files = get_report_order(completed_reports, previous_files)
+                cramino_report_df, cramino_extract, changed_columns = update_cramino_outputs(files, bam_type, output_file, cache, input_format, workers, dashboard_file, run_cutoff, dashboard_options, previous_report_df, previous_extract)
+                if dashboard_file is None:
+                    dashboard_message = ''
+                elif len(changed_columns) == 0:
+                    dashboard_message = '; dashboard data unchanged'
+                else:
+                    dashboard_message = f'; dashboard updated ({len(changed_columns)} of {len(cramino_extract.columns)} columns changed)'
+                print_watch_message(f'{changed_reports} new or changed and {removed_reports} removed reports; summary table has {len(cramino_report_df)} reports' + dashboard_message)
+                previous_reports = completed_reports
+                previous_files = files
+                previous_report_df = cramino_report_df
+                previous_extract = cramino_extract
+            poll_succeeded = True
+        # library code stops with quit() on some input errors, so SystemExit is caught as well (not KeyboardInterrupt)
+        except (Exception, SystemExit) as e:
+            print_watch_message(f'ERROR: Update failed, keeping previous outputs and retrying on next poll ({type(e).__name__}: {e})')
+            poll_succeeded = False
+        if once is True:
+            return poll_succeeded
+        time.sleep(poll_interval)
+
+# command line interface
+def main(argv=None):
+    inparser = argparse.ArgumentParser(description = 'Watch directory of long read cramino QC reports and keep summary table and dashboard up to date')
+    inparser.add_argument('--bam_type', default=None, choices=['mapped_bam','unmapped_bam'], required=True, type=str, help = 'cramino report type (mapped BAM report includes identity values).')
+    inparser.add_argument('--cramino_dir', default=None, required=True, type=str, help = 'path to directory containing cramino files')
+    inparser.add_argument('--input_format', default='text', choices=['text','json','arrow'], type=str, help = 'cramino report format (optional; default text)')
+    inparser.add_argument('--output', action="store", required=True, type=str, dest="output_file", help="Output summary table (tab-delimited, or parquet/feather by extension), replaced atomically on every update")
+    inparser.add_argument('--dashboard', default=None, type=str, dest="dashboard_file", help = 'output dashboard XLSX, replaced atomically on every update (optional)')
+    inparser.add_argument('--cache', default=None, type=str, help = 'SQLite report cache (optional; default <output>.cache.sqlite)')
+    inparser.add_argument('--figure_cache', default=None, type=str, help = 'dashboard figure cache directory; figures whose plotted columns and options are unchanged are reused, and figures no longer used are removed (optional; default <dashboard>.figures)')
+    inparser.add_argument('--interval', default=60, type=float, help = 'seconds between directory polls (optional; default 60)')
+    inparser.add_argument('--settle', default=30, type=float, help = 'seconds a report must be unchanged before it is parsed, so reports still being written are skipped (optional; default 30)')
+    inparser.add_argument('--workers', default=1, type=int, help = 'number of threads used to read cramino reports in parallel (optional; default 1)')
+    inparser.add_argument('--threads', default=1, type=int, help = 'number of processes used to render dashboard figures in parallel (optional; default 1)')
+    inparser.add_argument('--run_cutoff', default=1, type=float, help = 'minimum data output per flow cell run to include in dashboard (optional, 1 Gb default)')
+    inparser.add_argument('--plot_title', default=None, type=str, help = 'title for each dashboard plot (optional)')
+    inparser.add_argument('--output_profile', default='standard', choices=['draft','standard','publication'], type=str, help = 'dashboard figure output profile (optional; default standard)')
+    inparser.add_argument('--max_swarm_points', default=1000, type=int, help = 'maximum points per group overlaid on dashboard violin plots (optional; default 1000)')
+    inparser.add_argument('--once', action=argparse.BooleanOptionalAction, default=False, help = 'update outputs once and exit, e.g., from cron (optional; default false)')
+    args = inparser.parse_args(argv)
+    if args.workers < 1:
+        quit('ERROR: Number of workers (--workers) must be at least 1.')
+    if args.threads < 1:
+        quit('ERROR: Number of threads (--threads) must be at least 1.')
+    if (args.interval <= 0) or (args.settle < 0):
+        quit('ERROR: Poll interval (--interval) must be positive and settle time (--settle) not negative.')
+    if args.cache is None:
+        args.cache = args.output_file + '.cache.sqlite'
+    dashboard_options = None
+    if args.dashboard_file is not None:
+        if args.figure_cache is None:
+            args.figure_cache = args.dashboard_file + '.figures'
+        dashboard_options = dict(plot_title=args.plot_title, threads=args.threads, output_profile=args.output_profile, figure_cache=args.figure_cache, max_swarm_points=args.max_swarm_points)
+    print_watch_message(f'Watching {args.cramino_dir} every {args.interval:g} s')
+    try:
+        poll_succeeded = watch_cramino_reports(args.cramino_dir, args.bam_type, args.output_file, args.cache, args.input_format, args.workers, args.dashboard_file, args.run_cutoff, dashboard_options, args.interval, args.settle, args.once)
+    except KeyboardInterrupt:
+        print_watch_message('Stopped')
+        return
+    # single update (--once) failed
+    if poll_succeeded is False:
+        quit('ERROR: Update failed.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# long read sequencing cramino QC dashboard workbook
+# summary statistics tables and figure worksheets written with xlsxwriter (imported by pandas when workbook is written)
+# for reading PNG resolution
+import struct
+import pandas as pd
+from cardlongread_cramino.files import write_file_atomically
+
+# get resolution (dots per inch) stored in PNG pHYs chunk
+# returns (x dpi, y dpi), or None if not set
+def get_png_dpi(imgdata):
+    png = imgdata.getvalue()
+    # skip PNG signature, then walk through chunks
+    position = 8
+    while position + 8 <= len(png):
+        chunk_length, chunk_type = struct.unpack('>I4s', png[position:position+8])
+        if chunk_type == b'pHYs':
+            x_pixels_per_unit, y_pixels_per_unit, unit = struct.unpack('>IIB', png[position+8:position+17])
+            # unit 1 is pixels per meter
+            if unit == 1:
+                return (x_pixels_per_unit * 0.0254, y_pixels_per_unit * 0.0254)
+            return None
+        # pHYs must come before image data
+        elif chunk_type == b'IDAT':
+            return None
+        position += chunk_length + 12
+    return None
+
+# get image height (pixels) from PNG header
+def get_png_height(imgdata):
+    return struct.unpack('>I', imgdata.getvalue()[20:24])[0]
+
+# insert rendered figure (PNG buffer) into worksheet at given row, with optional note above figure
+# returns first free row below figure (for figures stacked on same worksheet)
+def insert_worksheet_image(worksheet,worksheet_name,imgdata,note=None,row=0):
+    # xlsxwriter shrinks images by their stored dpi
+    # scale back so figures are shown at full pixel size
+    image_options = {'image_data': imgdata}
+    png_dpi = get_png_dpi(imgdata)
+    if png_dpi is not None:
+        image_options['x_scale'] = png_dpi[0] / 96
+        image_options['y_scale'] = png_dpi[1] / 96
+    # set location of image in worksheet (A1, or A3 below note, on first figure of worksheet)
+    if note is None:
+        worksheet.insert_image(row, 0, worksheet_name + '.png', image_options)
+        image_row = row
+    else:
+        worksheet.write(row, 0, note)
+        worksheet.insert_image(row + 2, 0, worksheet_name + '.png', image_options)
+        image_row = row + 2
+    # figure shown at full pixel size over default rows (20 pixels), one blank row below
+    return image_row + -(-get_png_height(imgdata) // 20) + 1
+
+# write summary statistics tables and figure worksheets to output workbook in single pass
+# workbook is written atomically, so failed run never leaves partial workbook
+def write_dashboard_workbook(output_file,table_sheet_names,tables,image_sheet_names,images,image_notes):
+    def write_workbook(temporary_file):
+        writer = pd.ExcelWriter(temporary_file, engine='xlsxwriter')
+        # write summary statistics tables
+        for sheet_name, table in zip(table_sheet_names, tables):
+            table.to_excel(writer, startrow=0, index=False, sheet_name=sheet_name)
+        # pipe image data into new worksheets
+        # figures with same worksheet name as previous figure (e.g., pages of groups) stacked below it
+        for idx, (sheet_name, imgdata, note) in enumerate(zip(image_sheet_names, images, image_notes)):
+            if (idx == 0) or (sheet_name != image_sheet_names[idx - 1]):
+                worksheet = writer.book.add_worksheet(sheet_name)
+                row = 0
+            row = insert_worksheet_image(worksheet,sheet_name,imgdata,note,row)
+        # close writer and save workbook
+        writer.close()
+    write_file_atomically(output_file, write_workbook, '.xlsx')
@@ -0,0 +1,25 @@
+# shared test fixtures for cardlongread_cramino tests
+# run from repository root: python -m pytest tests
+import os
+import sys
+import pytest
+
+# repository root on module path, so package is importable without installing
+repository_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_dir)
+
+from cardlongread_cramino.benchmark import make_synthetic_cohort
+
+# example summary table shipped with repository (15 mapped BAM runs)
+@pytest.fixture
+def example_summary_table():
+    return os.path.join(repository_dir, 'example_cramino_summary.tsv')
+
+# synthetic cohort of mapped BAM cramino reports (fixed seed) and file list in temporary directory
+# returns report paths and file list path
+@pytest.fixture
+def synthetic_reports(tmp_path):
+    files = make_synthetic_cohort(str(tmp_path / 'reports'), 60, 'mapped_bam')
+    filelist = tmp_path / 'reports.txt'
+    filelist.write_text(''.join(x + '\n' for x in files))
+    return files, str(filelist)
@@ -0,0 +1,55 @@
+# QC rules (min, max and robust z-score within group) on crafted summary table
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.qc import evaluate_qc_rules, get_robust_z_scores, cramino_qc_rule_columns
+
+# crafted table: two groups of five runs with known medians and MADs
+# group A yields 10, 20, 30, 40, 200 (median 30, MAD 10), group B yields all 50 (MAD 0, so no outliers)
+def make_qc_table():
+    return pd.DataFrame({'Filename': [f'S{x}.bam' for x in range(10)],
+                         'Yield (Gb)': [10, 20, 30, 40, 200, 50, 50, 50, 50, 50],
+                         'Mean Coverage': [5, 25, 35, 45, 55, 30, 31, np.nan, 29, 30],
+                         'Group': ['A'] * 5 + ['B'] * 5})
+
+def make_qc_rules(qc_rules):
+    return pd.DataFrame(qc_rules, columns=cramino_qc_rule_columns)
+
+def test_min_and_max_rules():
+    qc_rules = make_qc_rules([('Low coverage', 'Mean Coverage', 'min', 30), ('High yield', 'Yield (Gb)', 'max', 100)])
+    qc_flags, qc_failures = evaluate_qc_rules(make_qc_table(), qc_rules, 'Group')
+    # values equal to threshold pass, missing values never fail
+    assert list(qc_flags['Low coverage']) == [True, True, False, False, False, False, False, False, True, False]
+    assert list(qc_flags['High yield']) == [False, False, False, False, True, False, False, False, False, False]
+    assert list(qc_flags['QC status']) == ['FAIL', 'FAIL', 'PASS', 'PASS', 'FAIL', 'PASS', 'PASS', 'PASS', 'FAIL', 'PASS']
+    assert list(qc_flags['Failed rules']) == [1, 1, 0, 0, 1, 0, 0, 0, 1, 0]
+    # failure index in rule then sample order, samples counted from 1
+    assert list(qc_failures['Rule']) == ['Low coverage', 'Low coverage', 'Low coverage', 'High yield']
+    assert list(qc_failures['Sample']) == [1, 2, 9, 5]
+    assert list(qc_failures['Filename']) == ['S0.bam', 'S1.bam', 'S8.bam', 'S4.bam']
+    assert list(qc_failures['Group']) == ['A', 'A', 'B', 'A']
+    assert list(qc_failures['Value']) == [5, 25, 29, 200]
+    assert qc_failures['Robust z'].isna().all()
+
+def test_robust_z_rule_within_groups():
+    qc_rules = make_qc_rules([('Yield outlier', 'Yield (Gb)', 'robust_z', 3.5)])
+    qc_flags, qc_failures = evaluate_qc_rules(make_qc_table(), qc_rules, 'Group')
+    # group A: 0.6745 * (200 - 30) / 10 = 11.47 fails, 0.6745 * (10 - 30) / 10 = -1.35 passes
+    assert list(qc_flags['Yield outlier']) == [False, False, False, False, True] + [False] * 5
+    assert list(qc_failures['Sample']) == [5]
+    np.testing.assert_allclose(qc_failures['Robust z'], [0.6745 * 170 / 10])
+
+def test_robust_z_rule_without_groups():
+    qc_rules = make_qc_rules([('Yield outlier', 'Yield (Gb)', 'robust_z', 3.5)])
+    qc_flags, qc_failures = evaluate_qc_rules(make_qc_table(), qc_rules)
+    # all runs: median 50, MAD 5, so low yields of group A are outliers too (robust z -5.4 and -4.0)
+    assert 'Group' not in qc_flags.columns
+    assert list(qc_flags['Yield outlier']) == [True, True, False, False, True] + [False] * 5
+    np.testing.assert_allclose(qc_failures['Robust z'], 0.6745 * (np.array([10, 20, 200]) - 50) / 5)
+
+def test_robust_z_scores():
+    values = np.array([[10.0], [20.0], [30.0], [40.0], [200.0], [50.0], [50.0], [50.0]])
+    group_codes = np.array([0, 0, 0, 0, 0, 1, 1, 1])
+    robust_z_scores = get_robust_z_scores(values, group_codes)
+    np.testing.assert_allclose(robust_z_scores[:5, 0], 0.6745 * (values[:5, 0] - 30) / 10)
+    # zero MAD gives missing scores
+    assert np.isnan(robust_z_scores[5:, 0]).all()
@@ -0,0 +1,70 @@
+# incremental parsing cache: reports parsed again only if modification time or size changed
+import os
+import sqlite3
+from cardlongread_cramino.report import make_cramino_report_data_frame
+
+# rewrite yield of cramino report (same number of characters if new yield has same number of digits)
+def set_report_yield(cramino_path, yield_gb):
+    with open(cramino_path, 'r') as infile:
+        report_lines = infile.readlines()
+    report_lines = [f'Yield [Gb]\t{yield_gb}\n' if x.startswith('Yield [Gb]\t') else x for x in report_lines]
+    with open(cramino_path, 'w') as outfile:
+        outfile.write(''.join(report_lines))
+
+# get other yield with same number of digits as yield of cramino report (all nines)
+def get_same_size_yield(cramino_path):
+    with open(cramino_path, 'r') as infile:
+        old_yield = [x for x in infile if x.startswith('Yield [Gb]\t')][0].split('\t')[1].strip()
+    return ''.join('.' if x == '.' else '9' for x in old_yield)
+
+# set modification time of file (nanoseconds since epoch)
+def set_mtime_ns(cramino_path, mtime_ns):
+    os.utime(cramino_path, ns=(mtime_ns, mtime_ns))
+
+def test_unchanged_reports_read_from_cache(synthetic_reports, tmp_path):
+    files, filelist = synthetic_reports
+    cache = str(tmp_path / 'cache.db')
+    first_df = make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    # changed content with same modification time and size is not seen, so cached row is used
+    file_stat = os.stat(files[0])
+    set_report_yield(files[0], get_same_size_yield(files[0]))
+    set_mtime_ns(files[0], file_stat.st_mtime_ns)
+    assert os.stat(files[0]).st_size == file_stat.st_size
+    assert make_cramino_report_data_frame(files, 'mapped_bam', cache=cache).equals(first_df)
+
+def test_changed_mtime_invalidates_cached_report(synthetic_reports, tmp_path):
+    files, filelist = synthetic_reports
+    cache = str(tmp_path / 'cache.db')
+    make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    # same size, later modification time
+    new_yield = get_same_size_yield(files[1])
+    file_stat = os.stat(files[1])
+    set_report_yield(files[1], new_yield)
+    set_mtime_ns(files[1], file_stat.st_mtime_ns + 10**9)
+    assert os.stat(files[1]).st_size == file_stat.st_size
+    cramino_report_df = make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    assert float(cramino_report_df['Yield (Gb)'][1]) == float(new_yield)
+    # other reports unchanged
+    assert cramino_report_df.drop(index=1).equals(make_cramino_report_data_frame(files, 'mapped_bam').drop(index=1))
+
+def test_changed_size_invalidates_cached_report(synthetic_reports, tmp_path):
+    files, filelist = synthetic_reports
+    cache = str(tmp_path / 'cache.db')
+    make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    # different size, same modification time
+    file_stat = os.stat(files[2])
+    set_report_yield(files[2], '1234.567')
+    set_mtime_ns(files[2], file_stat.st_mtime_ns)
+    assert os.stat(files[2]).st_size != file_stat.st_size
+    cramino_report_df = make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    assert float(cramino_report_df['Yield (Gb)'][2]) == 1234.567
+
+def test_removed_reports_evicted_from_cache(synthetic_reports, tmp_path):
+    files, filelist = synthetic_reports
+    cache = str(tmp_path / 'cache.db')
+    make_cramino_report_data_frame(files, 'mapped_bam', cache=cache)
+    cramino_report_df = make_cramino_report_data_frame(files[10:], 'mapped_bam', cache=cache)
+    assert cramino_report_df.equals(make_cramino_report_data_frame(files[10:], 'mapped_bam'))
+    connection = sqlite3.connect(cache)
+    assert connection.execute('SELECT COUNT(*) FROM reports').fetchone()[0] == len(files) - 10
+    connection.close()
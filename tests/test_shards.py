@@ -0,0 +1,59 @@
+# sharded parsing: merged shards give same summary table and summary statistics as unsharded run, in any order
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from cardlongread_cramino import parser
+from cardlongread_cramino.shards import merge_cramino_report_shards
+from cardlongread_cramino.summary import load_cramino_summary_tables, make_summary_statistics_tables
+
+# parse synthetic reports unsharded and in three shards
+# returns unsharded summary table path and shard summary table paths (in shard order)
+@pytest.fixture
+def shard_outputs(synthetic_reports, tmp_path):
+    files, filelist = synthetic_reports
+    unsharded_file = str(tmp_path / 'unsharded.tsv')
+    parser.main(['--bam_type', 'mapped_bam', '--filelist', filelist, '--output', unsharded_file])
+    shard_files = []
+    for shard_index in [1, 2, 3]:
+        shard_files.append(str(tmp_path / f'shard_{shard_index}.tsv'))
+        parser.main(['--bam_type', 'mapped_bam', '--filelist', filelist, '--output', shard_files[-1], '--shard', f'{shard_index}/3', '--run_cutoff', '50'])
+    return unsharded_file, shard_files
+
+@pytest.mark.parametrize('shard_order', list(itertools.permutations(range(3))))
+def test_merged_shards_match_unsharded_run(shard_outputs, tmp_path, shard_order):
+    unsharded_file, shard_files = shard_outputs
+    merged_file = tmp_path / 'merged.tsv'
+    summary_statistics_df, uncertain_modes = merge_cramino_report_shards([shard_files[x] for x in shard_order], str(merged_file))
+    # merged rows in shard order, byte for byte as unsharded parser output
+    with open(unsharded_file, 'rb') as infile:
+        assert merged_file.read_bytes() == infile.read()
+    # merged summary statistics as dashboard summary statistics of unsharded table with same run cutoff
+    cramino_extract, grouped = load_cramino_summary_tables([unsharded_file], run_cutoff=50)
+    sheet_names, tables = make_summary_statistics_tables(cramino_extract)
+    assert uncertain_modes == []
+    assert list(summary_statistics_df['Property']) == list(tables[0]['Property'])
+    for column_name in ['Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']:
+        np.testing.assert_allclose(summary_statistics_df[column_name].to_numpy(dtype=float), tables[0][column_name].to_numpy(dtype=float), rtol=1e-9, err_msg=column_name)
+
+def test_merge_rejects_incomplete_shards(shard_outputs, tmp_path):
+    unsharded_file, shard_files = shard_outputs
+    with pytest.raises(ValueError, match='Expected shards 1 to 3'):
+        merge_cramino_report_shards(shard_files[:2], str(tmp_path / 'merged.tsv'))
+    # no partial merged table left behind
+    assert not (tmp_path / 'merged.tsv').exists()
+
+def test_merge_rejects_different_run_cutoffs(shard_outputs, synthetic_reports, tmp_path):
+    unsharded_file, shard_files = shard_outputs
+    files, filelist = synthetic_reports
+    parser.main(['--bam_type', 'mapped_bam', '--filelist', filelist, '--output', shard_files[1], '--shard', '2/3', '--run_cutoff', '1'])
+    with pytest.raises(ValueError, match='different run cutoffs'):
+        merge_cramino_report_shards(shard_files, str(tmp_path / 'merged.tsv'))
+
+def test_merged_summary_statistics_written_by_parser(shard_outputs, tmp_path):
+    unsharded_file, shard_files = shard_outputs
+    merged_file = str(tmp_path / 'merged.tsv')
+    parser.main(['--merge_shards'] + shard_files[::-1] + ['--output', merged_file])
+    summary_statistics_df = pd.read_csv(tmp_path / 'merged_summary_statistics.tsv', sep='\t')
+    cramino_extract, grouped = load_cramino_summary_tables([unsharded_file], run_cutoff=50)
+    assert (summary_statistics_df['Total'] == len(cramino_extract)).all()
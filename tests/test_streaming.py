@@ -0,0 +1,81 @@
+# streaming accumulators: KLL sketch median within its error bound, and merged accumulators as single pass
+import numpy as np
+import pytest
+from cardlongread_cramino.streaming import KLLSketch, StreamingPropertyStatistics
+
+# normalized rank of estimate among values (fraction of values below estimate, ties counted half)
+def get_normalized_rank(values, estimate):
+    return (np.sum(values < estimate) + 0.5 * np.sum(values == estimate)) / len(values)
+
+def test_kll_median_exact_below_sketch_size():
+    values = np.random.default_rng(1).normal(20, 4, 150)
+    sketch = KLLSketch(200)
+    sketch.update(values)
+    assert sketch.get_quantile(0.5) == np.median(values)
+
+# rank error of median about 1.7% or less at k = 200 (99% confidence), falling in proportion to 1/k
+@pytest.mark.parametrize('k, rank_error', [(200, 0.017), (400, 0.0085)])
+@pytest.mark.parametrize('distribution', ['normal', 'lognormal', 'sorted'])
+def test_kll_median_within_error_bound(k, rank_error, distribution):
+    rng = np.random.default_rng(2)
+    if distribution == 'normal':
+        values = rng.normal(20, 4, 200000)
+    elif distribution == 'lognormal':
+        values = rng.lognormal(3, 1, 200000)
+    else:
+        # adversarial input order for compaction
+        values = np.sort(rng.uniform(0, 160, 200000))
+    sketch = KLLSketch(k)
+    # chunks as in streaming mode
+    for chunk in np.array_split(values, 17):
+        sketch.update(chunk)
+    assert sketch.count == len(values)
+    # retained values bounded by sketch size, not sample count
+    assert sum(len(x) for x in sketch.compactors) < 4 * k
+    assert abs(get_normalized_rank(values, sketch.get_quantile(0.5)) - 0.5) <= rank_error
+
+def test_merged_kll_median_within_error_bound():
+    values = np.random.default_rng(3).lognormal(3, 1, 200000)
+    sketches = []
+    for part in np.array_split(values, 5):
+        sketches.append(KLLSketch(200))
+        sketches[-1].update(part)
+    # merge in other order than parts, through saved dictionaries (as shard aggregates)
+    merged_sketch = KLLSketch.from_dict(sketches[3].to_dict())
+    for idx in [0, 4, 1, 2]:
+        merged_sketch.merge(KLLSketch.from_dict(sketches[idx].to_dict()))
+    assert merged_sketch.count == len(values)
+    assert abs(get_normalized_rank(values, merged_sketch.get_quantile(0.5)) - 0.5) <= 0.017
+
+def test_merged_statistics_match_single_pass():
+    rng = np.random.default_rng(4)
+    # few distinct values, so mode is exact
+    values = np.round(rng.normal(20, 4, 5000), 1)
+    values[rng.integers(0, len(values), 50)] = np.nan
+    single_pass = StreamingPropertyStatistics()
+    single_pass.update(values)
+    merged = StreamingPropertyStatistics.from_dict(StreamingPropertyStatistics().to_dict())
+    for part in np.array_split(values, 4)[::-1]:
+        part_statistics = StreamingPropertyStatistics()
+        part_statistics.update(part)
+        merged.merge(StreamingPropertyStatistics.from_dict(part_statistics.to_dict()))
+    finite_values = values[np.isfinite(values)]
+    assert merged.count == single_pass.count == len(finite_values)
+    assert merged.min == single_pass.min == finite_values.min()
+    assert merged.max == single_pass.max == finite_values.max()
+    np.testing.assert_allclose(merged.mean, finite_values.mean(), rtol=1e-12)
+    np.testing.assert_allclose(merged.get_standard_deviation(), finite_values.std(ddof=1), rtol=1e-12)
+    unique_values, counts = np.unique(finite_values, return_counts=True)
+    assert merged.get_mode() == single_pass.get_mode() == unique_values[np.argmax(counts)]
+
+def test_mode_left_blank_when_counters_cannot_certify_it():
+    # all values distinct and more values than counters: no value can be certified as mode
+    statistics = StreamingPropertyStatistics(mode_counters=10)
+    statistics.update(np.arange(1000, dtype=float))
+    assert np.isnan(statistics.get_mode())
+    assert statistics.is_mode_uncertain()
+    # clear mode certified despite saturated counters
+    statistics = StreamingPropertyStatistics(mode_counters=10)
+    statistics.update(np.r_[np.arange(1000, dtype=float), np.full(500, 7.0)])
+    assert statistics.get_mode() == 7.0
+    assert not statistics.is_mode_uncertain()
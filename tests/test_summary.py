@@ -0,0 +1,54 @@
+# summary statistics engine (get_grouped_summary_statistics) against per-column statistics module calls
+# of earlier dashboard versions (get_summary_statistics)
+import statistics
+import numpy as np
+import pandas as pd
+from cardlongread_cramino.summary import load_cramino_summary_tables, make_summary_statistics_tables, cramino_summary_statistics_property_names
+
+# summary statistics of one property as computed before vectorized engine
+def get_reference_summary_statistics(column):
+    column = list(column)
+    return [len(column), min(column), max(column), statistics.mean(column), statistics.median(column), statistics.mode(column), statistics.stdev(column)]
+
+# summary statistics table as computed before vectorized engine and typed schema (one row per property)
+# table read as float64 by pandas, runs of 1 Gb or less removed and N50 (kb) added as in earlier dashboard versions
+def make_reference_summary_statistics(summary_table):
+    cramino_extract = summary_table[summary_table['Yield (Gb)'] > 1].copy()
+    cramino_extract['N50 (kb)'] = round(cramino_extract['N50']/1000,3)
+    return pd.DataFrame([[x] + get_reference_summary_statistics(cramino_extract[x]) for x in cramino_summary_statistics_property_names],
+                        columns=['Property', 'Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation'])
+
+def test_summary_statistics_match_statistics_module(example_summary_table):
+    cramino_extract, grouped = load_cramino_summary_tables([example_summary_table])
+    sheet_names, tables = make_summary_statistics_tables(cramino_extract)
+    assert sheet_names == ['Summary statistics report']
+    reference = make_reference_summary_statistics(pd.read_csv(example_summary_table, sep='\t'))
+    assert list(tables[0]['Property']) == list(reference['Property'])
+    for column_name in ['Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']:
+        np.testing.assert_allclose(tables[0][column_name].to_numpy(dtype=float), reference[column_name].to_numpy(dtype=float), rtol=1e-12, err_msg=column_name)
+
+def test_grouped_summary_statistics_match_statistics_module(example_summary_table, tmp_path):
+    # split example table into two cohorts of different sizes
+    example_table = pd.read_csv(example_summary_table, sep='\t')
+    example_table.iloc[:6].to_csv(tmp_path / 'cohort_a.tsv', sep='\t', index=False)
+    example_table.iloc[6:].to_csv(tmp_path / 'cohort_b.tsv', sep='\t', index=False)
+    cramino_extract, grouped = load_cramino_summary_tables([str(tmp_path / 'cohort_a.tsv'), str(tmp_path / 'cohort_b.tsv')], names=['A', 'B'])
+    sheet_names, tables = make_summary_statistics_tables(cramino_extract, grouped, ['A', 'B'])
+    assert sheet_names == ['A statistics', 'B statistics']
+    for table, reference_table in zip(tables, [example_table.iloc[:6], example_table.iloc[6:]]):
+        reference = make_reference_summary_statistics(reference_table)
+        for column_name in ['Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']:
+            np.testing.assert_allclose(table[column_name].to_numpy(dtype=float), reference[column_name].to_numpy(dtype=float), rtol=1e-12, err_msg=column_name)
+
+def test_long_summary_statistics_match_group_tables(example_summary_table, tmp_path):
+    example_table = pd.read_csv(example_summary_table, sep='\t')
+    example_table.iloc[:6].to_csv(tmp_path / 'cohort_a.tsv', sep='\t', index=False)
+    example_table.iloc[6:].to_csv(tmp_path / 'cohort_b.tsv', sep='\t', index=False)
+    cramino_extract, grouped = load_cramino_summary_tables([str(tmp_path / 'cohort_a.tsv'), str(tmp_path / 'cohort_b.tsv')], names=['A', 'B'])
+    sheet_names, tables = make_summary_statistics_tables(cramino_extract, grouped, ['A', 'B'])
+    long_sheet_names, long_tables = make_summary_statistics_tables(cramino_extract, grouped, ['A', 'B'], long_format=True)
+    assert long_sheet_names == ['Group statistics']
+    for name, table in zip(['A', 'B'], tables):
+        long_table = long_tables[0][long_tables[0]['Group'] == name]
+        for column_name in ['Total', 'Min', 'Max', 'Mean', 'Median', 'Mode', 'Standard Deviation']:
+            np.testing.assert_array_equal(long_table[column_name].to_numpy(dtype=float), table[column_name].to_numpy(dtype=float))